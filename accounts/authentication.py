@@ -1,24 +1,124 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
-from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import (
+    BaseAuthentication,
+    BasicAuthentication,
+    SessionAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import cache_user, get_cached_user
+from .utils import normalize_identifier
 
 UserModel = get_user_model()
 
 
 class MultiFieldModelBackend(ModelBackend):
+    """
+    username / email / telefon orqali login. Identifikator turi oldindan aniqlanadi,
+    shuning uchun har bir urinish bitta indeks (lower() yoki unique phone) bo‘yicha qidiradi.
+    """
+
     def authenticate(self, request, username=None, password=None, **kwargs):
         if username is None:
             username = kwargs.get(UserModel.USERNAME_FIELD)
 
-        try:
-            user = UserModel.objects.get(
-                Q(username__iexact=username) |
-                Q(email__iexact=username) |
-                Q(phone_number__iexact=username)
-            )
-        except UserModel.DoesNotExist:
+        user = self.get_user_by_identifier(username)
+        if user is None:
+            # Foydalanuvchi yo‘qligini vaqt bo‘yicha bilib bo‘lmasligi uchun (ModelBackend kabi)
+            UserModel().set_password(password)
             return None
 
         if user.check_password(password) and self.user_can_authenticate(user):
             return user
         return None
+
+    def get_user_by_identifier(self, identifier):
+        kind, value = normalize_identifier(identifier)
+        raw = (identifier or "").strip()
+
+        match kind:
+            case "email":
+                candidates = [("email_lower", value), ("username_lower", value)]
+            case "phone":
+                candidates = [("phone_number", value), ("username_lower", raw.lower())]
+            case _:
+                candidates = [("username_lower", value), ("phone_number", raw)]
+
+        queryset = UserModel._default_manager.alias(
+            username_lower=Lower("username"),
+            email_lower=Lower("email"),
+        )
+        for field, lookup_value in candidates:
+            try:
+                return queryset.get(**{field: lookup_value})
+            except UserModel.DoesNotExist:
+                continue
+            except UserModel.MultipleObjectsReturned:
+                return None
+        return None
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT autentifikatsiyasi: user platform_profile bilan qisqa muddatli cache'dan
+    (accounts.cache) olinadi, cache bo‘sh bo‘lsa — bitta select_related so‘rov.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token tarkibida foydalanuvchi identifikatori yo‘q."))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            user = self._load_user(user_id)
+            cache_user(user)
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("Foydalanuvchi faol emas."), code="user_inactive")
+
+        return user
+
+    def _load_user(self, user_id):
+        queryset = self.user_model.objects.select_related('platform_profile')
+        try:
+            return queryset.get(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("Foydalanuvchi topilmadi."), code="user_not_found")
+
+
+class HeaderSchemeAuthentication(BaseAuthentication):
+    """
+    Authorization sarlavhasidagi sxema bo‘yicha faqat bitta autentifikatorni ishlatadi:
+    Bearer -> JWT, Token -> DRF token, Basic -> Basic, sarlavha yo‘q -> session.
+    """
+
+    def __init__(self):
+        self.jwt = CachedJWTAuthentication()
+        self.schemes = {
+            b'bearer': self.jwt,
+            b'token': TokenAuthentication(),
+            b'basic': BasicAuthentication(),
+        }
+        self.session = SessionAuthentication()
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth:
+            return self.session.authenticate(request)
+
+        authenticator = self.schemes.get(auth[0].lower())
+        if authenticator is None:
+            return None
+        return authenticator.authenticate(request)
+
+    def authenticate_header(self, request):
+        return self.jwt.authenticate_header(request)
@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import DEFAULT_DB_ALIAS
+
+AUTH_USER_CACHE_TIMEOUT = 60 * 5
+
+# Cache'da faqat shu ustunlar (parol xeshi yo‘q); qolganlari deferred — o‘qilganda DB'dan
+AUTH_USER_FIELDS = (
+    "id", "username", "first_name", "last_name", "email", "phone_number",
+    "is_active", "is_staff", "is_superuser",
+)
+PROFILE_FIELDS = ("id", "user_id", "chief_id", "is_verified", "created_at")
+
+
+def auth_user_key(user_id):
+    # eski kalit (butun CustomUser pickle) bilan aralashmasin
+    return f"auth_user_fields_{user_id}"
+
+
+def _values(instance, names):
+    return [getattr(instance, field.attname) for field in instance._meta.concrete_fields if field.attname in names]
+
+
+def _from_values(model, names, values):
+    # from_db: ro‘yxatda yo‘q maydonlar deferred, save() faqat yuklanganlarini yozadi
+    names = [field.attname for field in model._meta.concrete_fields if field.attname in names]
+    return model.from_db(DEFAULT_DB_ALIAS, names, values)
+
+
+def get_cached_user(user_id):
+    """
+    Autentifikatsiya uchun user (platform_profile bilan birga) qisqa muddatli cache'dan.
+    Topilmasa None qaytadi.
+    """
+    data = cache.get(auth_user_key(user_id))
+    if data is None:
+        return None
+
+    from platform_user.models import PlatformUser
+
+    user = _from_values(get_user_model(), AUTH_USER_FIELDS, data["user"])
+    profile = None
+    if data["profile"] is not None:
+        profile = _from_values(PlatformUser, PROFILE_FIELDS, data["profile"])
+        PlatformUser.user.field.set_cached_value(profile, user)
+    # profil yo‘q bo‘lsa ham keshlanadi — user.platform_profile so‘rovsiz DoesNotExist beradi
+    PlatformUser.user.field.remote_field.set_cached_value(user, profile)
+    return user
+
+
+def cache_user(user):
+    """`user` platform_profile bilan (select_related) yuklangan bo‘lishi kerak."""
+    try:
+        profile = user.platform_profile
+    except ObjectDoesNotExist:
+        profile = None
+    cache.set(auth_user_key(user.pk), {
+        "user": _values(user, AUTH_USER_FIELDS),
+        "profile": _values(profile, PROFILE_FIELDS) if profile is not None else None,
+    }, AUTH_USER_CACHE_TIMEOUT)
+
+
+def invalidate_user(user_id):
+    cache.delete(auth_user_key(user_id))
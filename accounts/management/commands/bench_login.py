@@ -0,0 +1,95 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Lower
+
+from accounts.authentication import MultiFieldModelBackend
+
+User = get_user_model()
+
+BENCH_PREFIX = "bench_login_"
+
+
+class Command(BaseCommand):
+    help = "Login identifikator qidiruvini N ta foydalanuvchida o‘lchaydi (default 1 000 000)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1_000_000)
+        parser.add_argument("--lookups", type=int, default=2000)
+        parser.add_argument("--batch", type=int, default=10_000)
+        parser.add_argument("--with-password", action="store_true",
+                            help="To‘liq authenticate() (parol hash bilan) o‘lchash")
+        parser.add_argument("--explain", action="store_true")
+
+    def handle(self, *args, **opts):
+        total = self._seed(opts["users"], opts["batch"])
+        backend = MultiFieldModelBackend()
+
+        for kind in ("username", "email", "phone"):
+            timings = []
+            for _ in range(opts["lookups"]):
+                identifier = self._identifier(kind, random.randrange(total))
+                started = time.perf_counter()
+                if opts["with_password"]:
+                    backend.authenticate(None, username=identifier, password="bench-password")
+                else:
+                    backend.get_user_by_identifier(identifier)
+                timings.append((time.perf_counter() - started) * 1000)
+            self._report(kind, timings)
+
+        if opts["explain"]:
+            self._explain()
+
+    def _seed(self, users, batch):
+        existing = User.objects.filter(username__startswith=BENCH_PREFIX).count()
+        if existing >= users:
+            return existing
+
+        password = make_password("bench-password")
+        self.stdout.write(f"Creating {users - existing} users…")
+        for start in range(existing, users, batch):
+            User.objects.bulk_create(
+                [
+                    User(
+                        username=f"{BENCH_PREFIX}{i}",
+                        email=f"{BENCH_PREFIX}{i}@example.com",
+                        phone_number=f"+99870{i:07d}",
+                        password=password,
+                    )
+                    for i in range(start, min(start + batch, users))
+                ],
+                batch_size=batch,
+            )
+        return users
+
+    @staticmethod
+    def _identifier(kind, i):
+        match kind:
+            case "email":
+                return f"{BENCH_PREFIX.upper()}{i}@Example.com"
+            case "phone":
+                return f"+998 70 {i:07d}"
+            case _:
+                return f"{BENCH_PREFIX.upper()}{i}"
+
+    def _report(self, kind, timings):
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(
+            f"{kind:<9} n={len(timings)} p50={statistics.median(timings):.2f}ms "
+            f"p95={p95:.2f}ms max={timings[-1]:.2f}ms"
+        )
+
+    def _explain(self):
+        queryset = User.objects.alias(username_lower=Lower("username"), email_lower=Lower("email"))
+        plans = {
+            "username": queryset.filter(username_lower=f"{BENCH_PREFIX}1"),
+            "email": queryset.filter(email_lower=f"{BENCH_PREFIX}1@example.com"),
+            "phone": queryset.filter(phone_number="+998700000001"),
+        }
+        for kind, qs in plans.items():
+            self.stdout.write(f"-- {kind}\n{qs.explain()}")
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:36
+
+import re
+
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+# accounts.utils.normalize_phone nusxasi — migratsiya joriy kodga bog‘lanmasin
+_PHONE_JUNK = re.compile(r"[\s\-().]")
+_PHONE_RE = re.compile(r"^\+?\d{7,15}$")
+
+
+def normalize_phone(value):
+    if not value:
+        return None
+    phone = _PHONE_JUNK.sub("", str(value).strip())
+    if phone.startswith("00"):
+        phone = "+" + phone[2:]
+    if not _PHONE_RE.match(phone):
+        return None
+    if not phone.startswith("+") and len(phone) >= 12:
+        phone = "+" + phone
+    return phone
+
+
+def normalize_phone_numbers(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    taken = set(CustomUser.objects.values_list('phone_number', flat=True))
+    changed = []
+    for user in CustomUser.objects.only('id', 'phone_number').iterator(chunk_size=2000):
+        phone = normalize_phone(user.phone_number)
+        # Boshqa foydalanuvchida shu raqam bo‘lsa, tegmaymiz (unique)
+        if not phone or phone == user.phone_number or phone in taken:
+            continue
+        taken.add(phone)
+        user.phone_number = phone
+        changed.append(user)
+    CustomUser.objects.bulk_update(changed, ['phone_number'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_phone_numbers, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='customuser',
+            index=models.Index(django.db.models.functions.text.Lower('username'), name='user_username_lower_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='customuser',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='user_email_lower_idx'),
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
+from .utils import normalize_phone
+
 
 def user_profile_path(instance, filename):
     return f'users/{instance.username}/profiles/{filename}'
@@ -24,5 +27,14 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.get_full_name() or self.username
 
+    def save(self, *args, **kwargs):
+        # Login bitta indeks orqali topishi uchun telefon normallashtirilgan holda saqlanadi
+        self.phone_number = normalize_phone(self.phone_number) or self.phone_number
+        super().save(*args, **kwargs)
+
     class Meta:
-        ordering = ['-id']
\ No newline at end of file
+        ordering = ['-id']
+        indexes = [
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+        ]
\ No newline at end of file
@@ -1,10 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils.translation import gettext_lazy as _
 from accounts.models import CustomUser
 from device.models import Device
 
+from .tokens import PlatformRefreshToken
+
 
 class UserInfoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -43,21 +44,23 @@ class LoginSerializer(serializers.Serializer):
         if not user or not user.is_active:
             raise serializers.ValidationError("Login ma'lumotlari noto‘g‘ri.")
 
-        refresh = RefreshToken.for_user(user)
+        refresh = PlatformRefreshToken.for_user(user)
 
+        attrs = {
+            'device_type': device_info.get('device_type', 'unknown'),
+            'os': device_info.get('os', 'unknown'),
+            'browser': device_info.get('browser', 'unknown'),
+            'brand': device_info.get('brand'),
+            'model': device_info.get('model'),
+            'ip_address': device_info.get('ip_address'),
+            'where': device_info.get('where', 'platform'),
+        }
+        # Yetti ustun o‘rniga (user, fingerprint) indeksi bo‘yicha qidiriladi
         Device.objects.update_or_create(
             user=user,
-            device_type=device_info.get('device_type', 'unknown'),
-            os=device_info.get('os', 'unknown'),
-            browser=device_info.get('browser', 'unknown'),
-            brand=device_info.get('brand'),
-            model=device_info.get('model'),
-            ip_address=device_info.get('ip_address'),
-            where=device_info.get('where', 'platform'),
+            fingerprint=Device.make_fingerprint(**attrs),
             is_active=True,
-            defaults={
-                'refresh_token': str(refresh)
-            }
+            defaults={**attrs, 'refresh_token': str(refresh)},
         )
 
         return {
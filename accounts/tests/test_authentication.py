@@ -0,0 +1,69 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIRequestFactory
+
+from accounts.authentication import HeaderSchemeAuthentication, MultiFieldModelBackend
+from accounts.tokens import PlatformRefreshToken
+from platform_user.models import PlatformUser
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def test_bearer_token_authenticates_without_queries_when_warm(django_assert_num_queries):
+    cache.clear()
+    user = User.objects.create_user(username="pos", password="x", phone_number="+998900000010")
+    profile = PlatformUser.objects.create(user=user)
+    access = str(PlatformRefreshToken.for_user(user).access_token)
+
+    factory = APIRequestFactory()
+    auth = HeaderSchemeAuthentication()
+    request = factory.get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+    authed_user, token = auth.authenticate(request)
+    assert token["platform_user_id"] == profile.pk
+
+    with django_assert_num_queries(0):
+        request = factory.get("/", HTTP_AUTHORIZATION=f"Bearer {access}")
+        authed_user, _ = auth.authenticate(request)
+        assert authed_user.platform_profile.pk == profile.pk
+
+
+def test_unknown_scheme_is_ignored():
+    request = APIRequestFactory().get("/", HTTP_AUTHORIZATION="Digest abc")
+    assert HeaderSchemeAuthentication().authenticate(request) is None
+
+
+def test_login_identifier_is_normalized():
+    user = User.objects.create_user(
+        username="Aziz", email="Aziz@Mail.uz", password="secure1234", phone_number="+998 (90) 765-43-21"
+    )
+    assert user.phone_number == "+998907654321"
+
+    backend = MultiFieldModelBackend()
+    for identifier in ("aziz", "AZIZ@mail.UZ", "998907654321", "+998 90 765 43 21"):
+        assert backend.authenticate(None, username=identifier, password="secure1234") == user
+
+
+@pytest.mark.django_db(databases=[])
+def test_cached_user_has_real_profile_and_no_password(settings):
+    from datetime import datetime, timezone
+
+    from accounts.cache import auth_user_key, cache_user, get_cached_user
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    user = User(id=5, username="pos", phone_number="+998900000011", is_active=True, password="pbkdf2$secret")
+    created = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    profile = PlatformUser(id=9, user=user, chief_id=3, is_verified=True, created_at=created)
+    PlatformUser.user.field.remote_field.set_cached_value(user, profile)
+
+    cache_user(user)
+    assert "pbkdf2$secret" not in repr(cache.get(auth_user_key(5)))
+
+    restored = get_cached_user(5)
+    assert (restored.pk, restored.username, restored._state.adding) == (5, "pos", False)
+    assert "password" in restored.get_deferred_fields()
+    assert (restored.platform_profile.pk, restored.platform_profile.chief_id) == (9, 3)
+    assert (restored.platform_profile.is_verified, restored.platform_profile.created_at) == (True, created)
+    assert not restored.platform_profile.get_deferred_fields()
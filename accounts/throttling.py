@@ -0,0 +1,18 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+from .utils import normalize_identifier
+
+
+class LoginRateThrottle(SimpleRateThrottle):
+    """
+    Login urinishlarini (normallashtirilgan identifikator + IP) bo‘yicha cheklaydi.
+    Hisoblagich default cache'da (Redis) saqlanadi.
+    """
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        _, identifier = normalize_identifier(request.data.get('identifier'))
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': f"{identifier}:{self.get_ident(request)}",
+        }
@@ -0,0 +1,33 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from staffs.cache import get_roles_version
+
+PLATFORM_USER_CLAIM = "platform_user_id"
+CHIEF_CLAIM = "chief_id"
+ROLES_VERSION_CLAIM = "roles_version"
+
+
+def add_platform_claims(token, user):
+    """
+    POS so‘rovlarida profilni DB'dan o‘qimaslik uchun kerakli claim'lar.
+    Access token refresh token'dan yaratilganda bu claim'lar ko‘chiriladi.
+    """
+    platform_user = getattr(user, 'platform_profile', None)
+    if platform_user is None:
+        token[PLATFORM_USER_CLAIM] = None
+        token[CHIEF_CLAIM] = None
+        token[ROLES_VERSION_CLAIM] = 0
+        return token
+
+    token[PLATFORM_USER_CLAIM] = platform_user.pk
+    token[CHIEF_CLAIM] = platform_user.chief_id
+    token[ROLES_VERSION_CLAIM] = get_roles_version(platform_user.pk)
+    return token
+
+
+class PlatformRefreshToken(RefreshToken):
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        return add_platform_claims(token, user)
@@ -0,0 +1,32 @@
+import re
+
+_PHONE_JUNK = re.compile(r"[\s\-().]")
+_PHONE_RE = re.compile(r"^\+?\d{7,15}$")
+
+
+def normalize_phone(value):
+    """
+    Telefon raqamni yagona ko‘rinishga keltiradi: "+998 (90) 123-45-67" -> "+998901234567".
+    Telefon raqamga o‘xshamasa None qaytadi.
+    """
+    if not value:
+        return None
+    phone = _PHONE_JUNK.sub("", str(value).strip())
+    if phone.startswith("00"):
+        phone = "+" + phone[2:]
+    if not _PHONE_RE.match(phone):
+        return None
+    if not phone.startswith("+") and len(phone) >= 12:
+        phone = "+" + phone
+    return phone
+
+
+def normalize_identifier(value):
+    """Login identifikatori: (turi, qiymati) — 'email', 'phone' yoki 'username'."""
+    value = str(value or "").strip()
+    if "@" in value:
+        return "email", value.lower()
+    phone = normalize_phone(value)
+    if phone:
+        return "phone", phone
+    return "username", value.lower()
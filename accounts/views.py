@@ -11,10 +11,14 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework.exceptions import AuthenticationFailed
 from device.models import Device
 
+from .throttling import LoginRateThrottle
+from .tokens import add_platform_claims
+
 
 class LoginView(generics.GenericAPIView):
     serializer_class = LoginSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [LoginRateThrottle]
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -65,7 +69,7 @@ class CustomTokenRefreshView(APIView):
             return Response({"detail": _("Refresh token yuborilmadi.")}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            device = Device.objects.get(refresh_token=refresh_token)
+            device = Device.objects.select_related('user__platform_profile').get(refresh_token=refresh_token)
         except Device.DoesNotExist:
             raise AuthenticationFailed(_("Bunday refresh token mavjud emas yoki qurilmaga bog‘lanmagan."))
 
@@ -74,6 +78,9 @@ class CustomTokenRefreshView(APIView):
         except TokenError:
             raise AuthenticationFailed(_("Refresh token noto‘g‘ri yoki muddati tugagan."))
 
+        # Claim'lar (chief_id, roles_version) yangilanadi
+        add_platform_claims(refresh, device.user)
+
         new_refresh_token = str(refresh)
         new_access_token = str(refresh.access_token)
 
@@ -1,12 +1,15 @@
 from typing import List, Optional
-from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils.dateparse import parse_datetime, parse_date
 from django.utils import timezone
 from datetime import timedelta, datetime, time
 
-from .services.sales import sales_metrics, sales_timeseries, top_products, payment_split
+from config.async_views import AsyncAPIView
+from config.replicas import ReplicaReadMixin
+
+from .services.sales import sales_metrics, sales_timeseries, payment_split
+from .services.sales import top_products as top_sold_products
 
 from analytics.services.debt import (
     debt_metrics,
@@ -92,10 +95,10 @@ def resolve_accessible_store_id(user) -> list[int]:
     return []
 
 
-class SalesAnalyticsView(APIView):
+class SalesAnalyticsView(ReplicaReadMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         store_id = kwargs.get("store_id") or request.query_params.get("store_id")
         if store_id is None:
             return Response({"detail": "store_id majburiy (path yoki query orqali)."}, status=400)
@@ -114,22 +117,24 @@ class SalesAnalyticsView(APIView):
             return Response({"detail": "start < end bo‘lishi kerak."}, status=400)
 
         data = {
-            "metrics": sales_metrics(store_id, start, end),
-            "timeseries": sales_timeseries(store_id, start, end, interval),
-            "top_products_by_revenue": top_products(store_id, start, end, by="revenue", limit=10),
-            "top_products_by_profit": top_products(store_id, start, end, by="profit", limit=10),
-            "payment_split": payment_split(store_id, start, end),
+            "metrics": await sales_metrics(store_id, start, end),
+            "timeseries": await sales_timeseries(store_id, start, end, interval),
+            "top_products_by_revenue": await top_sold_products(store_id, start, end, by="revenue", limit=10),
+            "top_products_by_profit": await top_sold_products(store_id, start, end, by="profit", limit=10),
+            "payment_split": await payment_split(store_id, start, end),
+        }
+        data.update({
             "start": start,
             "end": end,
             "interval": interval,
-        }
+        })
         return Response(data)
 
 
-class ExpenseAnalyticsView(APIView):
+class ExpenseAnalyticsView(ReplicaReadMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         store_id = kwargs.get("store_id") or request.query_params.get("store_id")
         if store_id is None:
             return Response({"detail": "store_id majburiy (path yoki query)."}, status=400)
@@ -154,21 +159,23 @@ class ExpenseAnalyticsView(APIView):
             return Response({"detail": "top_n butun son bo‘lishi kerak."}, status=400)
 
         data = {
-            "metrics": expense_metrics(store_id, start, end),
-            "timeseries": expense_timeseries(store_id, start, end, interval),
-            "by_reason": expense_breakdown_by_reason(store_id, start, end, limit=top_n),
-            "other_top_custom": expense_other_top_custom_reasons(store_id, start, end, limit=10),
+            "metrics": await expense_metrics(store_id, start, end),
+            "timeseries": await expense_timeseries(store_id, start, end, interval),
+            "by_reason": await expense_breakdown_by_reason(store_id, start, end, limit=top_n),
+            "other_top_custom": await expense_other_top_custom_reasons(store_id, start, end, limit=10),
+        }
+        data.update({
             "start": start,
             "end": end,
             "interval": interval,
-        }
+        })
         return Response(data)
 
 
-class CashAnalyticsView(APIView):
+class CashAnalyticsView(ReplicaReadMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         store_id = kwargs.get("store_id") or request.query_params.get("store_id")
         if store_id is None:
             return Response({"detail": "store_id majburiy (path yoki query)."}, status=400)
@@ -193,22 +200,24 @@ class CashAnalyticsView(APIView):
             return Response({"detail": "top_n butun son."}, status=400)
 
         data = {
-            "metrics": cash_metrics(store_id, start, end),
-            "timeseries": cash_timeseries(store_id, start, end, interval),
-            "by_source": cash_breakdown_by_source(store_id, start, end, limit=top_n),
-            "recent": recent_transactions(store_id, start, end, limit=20),
-            "largest": largest_transactions(store_id, start, end, limit=10),
+            "metrics": await cash_metrics(store_id, start, end),
+            "timeseries": await cash_timeseries(store_id, start, end, interval),
+            "by_source": await cash_breakdown_by_source(store_id, start, end, limit=top_n),
+            "recent": await recent_transactions(store_id, start, end, limit=20),
+            "largest": await largest_transactions(store_id, start, end, limit=10),
+        }
+        data.update({
             "start": start,
             "end": end,
             "interval": interval,
-        }
+        })
         return Response(data)
 
 
-class DebtAnalyticsView(APIView):
+class DebtAnalyticsView(ReplicaReadMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         store_id = kwargs.get("store_id") or request.query_params.get("store_id")
         if store_id is None:
             return Response({"detail": "store_id majburiy (path yoki query)."}, status=400)
@@ -244,24 +253,26 @@ class DebtAnalyticsView(APIView):
             buckets = None
 
         data = {
-            "metrics": debt_metrics(store_id, start, end, include_mirror),
-            "timeseries": debt_timeseries(store_id, start, end, interval, include_mirror),
-            "top_debtors": top_debtors(store_id, limit=top_n),
-            "ageing": debt_ageing(store_id, as_of=end, buckets=buckets),
-            "breakdown": debt_breakdown(store_id, start, end, include_mirror),
-            "recent": recent_debt_documents(store_id, start, end, limit=20, include_mirror=include_mirror),
+            "metrics": await debt_metrics(store_id, start, end, include_mirror),
+            "timeseries": await debt_timeseries(store_id, start, end, interval, include_mirror),
+            "top_debtors": await top_debtors(store_id, limit=top_n),
+            "ageing": await debt_ageing(store_id, as_of=end, buckets=buckets),
+            "breakdown": await debt_breakdown(store_id, start, end, include_mirror),
+            "recent": await recent_debt_documents(store_id, start, end, limit=20, include_mirror=include_mirror),
+        }
+        data.update({
             "start": start,
             "end": end,
             "interval": interval,
             "include_mirror": include_mirror,
-        }
+        })
         return Response(data)
 
 
-class ProductAnalyticsView(APIView):
+class ProductAnalyticsView(ReplicaReadMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         store_id = kwargs.get("store_id") or request.query_params.get("store_id")
         if store_id is None:
             return Response({"detail": "store_id majburiy (path yoki query)."}, status=400)
@@ -291,26 +302,28 @@ class ProductAnalyticsView(APIView):
         cover_days = int(request.query_params.get("cover_days", 7))
 
         data = {
-            "inventory": inventory_metrics(store_id),
-            "movements": movement_timeseries(store_id, start, end, interval, include_debt),
-            "tops": top_products(store_id, start, end, limit=top_n, include_debt=include_debt),
-            "waste_by_reason": waste_breakdown(store_id, start, end),
-            "slow_movers": slow_movers(store_id, as_of=end, min_days=min_days, top_n=top_n, include_debt=include_debt),
-            "low_cover": low_cover(store_id, start, end, cover_days=cover_days, top_n=top_n, include_debt=include_debt),
-            "recent_entries": recent_stock_entries(store_id, start, end, limit=20),
+            "inventory": await inventory_metrics(store_id),
+            "movements": await movement_timeseries(store_id, start, end, interval, include_debt),
+            "tops": await top_products(store_id, start, end, limit=top_n, include_debt=include_debt),
+            "waste_by_reason": await waste_breakdown(store_id, start, end),
+            "slow_movers": await slow_movers(store_id, as_of=end, min_days=min_days, top_n=top_n, include_debt=include_debt),
+            "low_cover": await low_cover(store_id, start, end, cover_days=cover_days, top_n=top_n, include_debt=include_debt),
+            "recent_entries": await recent_stock_entries(store_id, start, end, limit=20),
+        }
+        data.update({
             "start": start,
             "end": end,
             "interval": interval,
             "include_debt": include_debt,
-        }
+        })
         return Response(data)
 
 
 
-class RefundAnalyticsView(APIView):
+class RefundAnalyticsView(ReplicaReadMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         store_id = kwargs.get("store_id") or request.query_params.get("store_id")
         if store_id is None:
             return Response({"detail": "store_id majburiy (path yoki query)."}, status=400)
@@ -335,21 +348,23 @@ class RefundAnalyticsView(APIView):
             return Response({"detail": "top_n butun son."}, status=400)
 
         data = {
-            "metrics": refund_metrics(store_id, start, end),
-            "timeseries": refund_timeseries(store_id, start, end, interval),
-            "by_reason": refund_breakdown_by_reason(store_id, start, end),
-            "by_source": refund_breakdown_by_source(store_id, start, end),
-            "top_products": top_refunded_products(store_id, start, end, limit=top_n),
-            "other_top_custom": other_top_custom_reasons(store_id, start, end, limit=top_n),
-            "recent": recent_refunds(store_id, start, end, limit=20),
+            "metrics": await refund_metrics(store_id, start, end),
+            "timeseries": await refund_timeseries(store_id, start, end, interval),
+            "by_reason": await refund_breakdown_by_reason(store_id, start, end),
+            "by_source": await refund_breakdown_by_source(store_id, start, end),
+            "top_products": await top_refunded_products(store_id, start, end, limit=top_n),
+            "other_top_custom": await other_top_custom_reasons(store_id, start, end, limit=top_n),
+            "recent": await recent_refunds(store_id, start, end, limit=20),
+        }
+        data.update({
             "start": start,
             "end": end,
             "interval": interval,
-        }
+        })
         return Response(data)
 
 
-class PlatformAnalyticsView(APIView):
+class PlatformAnalyticsView(ReplicaReadMixin, AsyncAPIView):
     """
     Path-based store konteksti:
       GET /platform/<store_id>/analytics/overview/?start=...&end=...&interval=day&top_n=10&store_ids=1,2,3
@@ -359,7 +374,7 @@ class PlatformAnalyticsView(APIView):
     """
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         # 1) Majburiy: pathdagi store_id
         store_id = kwargs.get("store_id")
         if store_id is None:
@@ -404,14 +419,16 @@ class PlatformAnalyticsView(APIView):
             return Response({"detail": "top_n butun son."}, status=400)
 
         data = {
-            "overview": platform_overview(store_ids, start, end),
-            "timeseries": platform_timeseries(store_ids, start, end, interval),
-            "top_stores": top_stores(store_ids, start, end, limit=top_n),
-            "payment_split": payment_split_multi(store_ids, start, end),
+            "overview": await platform_overview(store_ids, start, end),
+            "timeseries": await platform_timeseries(store_ids, start, end, interval),
+            "top_stores": await top_stores(store_ids, start, end, limit=top_n),
+            "payment_split": await payment_split_multi(store_ids, start, end),
+        }
+        data.update({
             "store_ids": store_ids,
             "start": start,
             "end": end,
             "interval": interval,
-        }
+        })
         return Response(data)
 
@@ -9,8 +9,11 @@ from .turnover import compute_turnover
 from .gross_profit import compute_gross_profit
 from .debts import compute_debts
 
-def _sum_usd_qs(qs, field_name, currency='currency', rate='exchange_rate'):
+def _sum_usd_qs(qs, field_name, currency='currency', rate='exchange_rate', usd_field=None):
     Model = qs.model
+    if usd_field and find_field(Model, [usd_field]):
+        # yozishda saqlangan USD ustun — qator bo‘yicha Case yo‘q
+        return _sum(qs, usd_field)
     if find_field(Model, [currency]) and find_field(Model, [rate]):
         qs = qs.annotate(val_usd=as_usd(field_name, currency, rate))
         return qs.aggregate(
@@ -47,15 +50,18 @@ def _docs_profit(date_from, date_to, store_id=None, upto=False):
     # 2) Liniyalar (faqat transfer hujjatlar)
     lines = DocumentProduct.objects.filter(document__in=docs)
 
-    # revenue_usd
-    has_fx_line = find_field(DocumentProduct, ['currency']) and find_field(DocumentProduct, ['exchange_rate'])
-    price_usd = as_usd('price', 'currency', 'exchange_rate') if has_fx_line else ExpressionWrapper(
-        F('price'), output_field=DecimalField(max_digits=20, decimal_places=6)
-    )
-    lines = lines.annotate(
-        revenue_usd=ExpressionWrapper(price_usd * F('quantity'),
-                                      output_field=DecimalField(max_digits=20, decimal_places=6))
-    )
+    # revenue_usd (amount = price * quantity; amount_usd yozishda saqlanadi)
+    if find_field(DocumentProduct, ['amount_usd']):
+        lines = lines.annotate(revenue_usd=F('amount_usd'))
+    else:
+        has_fx_line = find_field(DocumentProduct, ['currency']) and find_field(DocumentProduct, ['exchange_rate'])
+        price_usd = as_usd('price', 'currency', 'exchange_rate') if has_fx_line else ExpressionWrapper(
+            F('price'), output_field=DecimalField(max_digits=20, decimal_places=6)
+        )
+        lines = lines.annotate(
+            revenue_usd=ExpressionWrapper(price_usd * F('quantity'),
+                                          output_field=DecimalField(max_digits=20, decimal_places=6))
+        )
 
     # cogs_usd = product__avg_cost * qty
     avg_cost_name = None
@@ -92,9 +98,9 @@ def _docs_profit(date_from, date_to, store_id=None, upto=False):
         )
 
         # USD normalize
-        t_total = _sum_usd_qs(transfers_all, 'total_amount', 'currency', 'exchange_rate')
+        t_total = _sum_usd_qs(transfers_all, 'total_amount', 'currency', 'exchange_rate', usd_field='total_usd')
         t_income = _sum_usd_qs(transfers_all, 'income', 'currency', 'exchange_rate') if find_field(DebtDocument, ['income']) else D0
-        a_total = _sum_usd_qs(accepts_all, 'total_amount', 'currency', 'exchange_rate')
+        a_total = _sum_usd_qs(accepts_all, 'total_amount', 'currency', 'exchange_rate', usd_field='total_usd')
 
         unpaid = (t_total - t_income) - a_total
         if unpaid < D0:
@@ -23,8 +23,12 @@ from ..utils.model_helpers import get_model, find_field, date_range_kwargs, try_
 from ..utils.money import as_usd, D0
 
 
-def _sum_usd(qs, field_name, currency='currency', rate='exchange_rate'):
+def _sum_usd(qs, field_name, currency='currency', rate='exchange_rate', usd_field=None):
     Model = qs.model
+    if usd_field and find_field(Model, [usd_field]):
+        # yozishda saqlangan USD ustun — qator bo‘yicha Case yo‘q
+        return qs.aggregate(v=Coalesce(Sum(usd_field), Value(D0),
+                                       output_field=DecimalField(max_digits=20, decimal_places=6)))['v'] or D0
     if find_field(Model, [currency]) and find_field(Model, [rate]):
         qs = qs.annotate(val_usd=as_usd(field_name, currency, rate))
         return qs.aggregate(v=Coalesce(Sum('val_usd'), Value(D0),
@@ -69,8 +73,8 @@ def compute_debts(date_from, date_to, store_id=None, source='auto'):
             store_id, ['store_id', 'store__id']
         )
 
-        out['debt_given_usd'] = _sum_usd(transfers, 'total_amount')
-        out['debt_taken_usd'] = _sum_usd(accepts,   'total_amount')
+        out['debt_given_usd'] = _sum_usd(transfers, 'total_amount', usd_field='total_usd')
+        out['debt_taken_usd'] = _sum_usd(accepts, 'total_amount', usd_field='total_usd')
         out['sources']['given'] = 'DebtDocument.transfer.total_amount (normalized)'
         out['sources']['taken'] = 'DebtDocument.accept.total_amount (normalized)'
 
@@ -85,8 +89,8 @@ def compute_debts(date_from, date_to, store_id=None, source='auto'):
             store_id, ['store_id', 'store__id']
         )
 
-        t_total_to = _sum_usd(transfers_to, 'total_amount')
-        a_total_to = _sum_usd(accepts_to,   'total_amount')
+        t_total_to = _sum_usd(transfers_to, 'total_amount', usd_field='total_usd')
+        a_total_to = _sum_usd(accepts_to, 'total_amount', usd_field='total_usd')
         recv_out = t_total_to - a_total_to
         out['receivables_outstanding_usd'] = recv_out if recv_out > D0 else D0
         out['sources']['recv_out'] = 'Σtransfer.total − Σaccept.total (normalized)'
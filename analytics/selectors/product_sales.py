@@ -30,7 +30,7 @@ def compute_product_sales(date_from, date_to, store_id=None, *, order_by='quanti
 
     kwargs_ps = date_range_kwargs(ProductSale, date_from, date_to)
     qs = ProductSale.objects.filter(**kwargs_ps)
-    qs = try_filter_store(qs, store_id, ['order__store_id', 'store_id', 'order__store__id'])
+    qs = try_filter_store(qs, store_id, ['store_id', 'order__store_id', 'order__store__id'])
 
     # revenue: total_price agar bo‘lsa; aks holda unit_price * qty
     if total_field:
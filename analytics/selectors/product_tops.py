@@ -25,7 +25,7 @@ def compute_products_top_list(date_from, date_to, store_id, *, by='profit', limi
 
     kwargs_ps = date_range_kwargs(ProductSale, date_from, date_to)
     qs = ProductSale.objects.filter(**kwargs_ps)
-    qs = try_filter_store(qs, store_id, ['order__store_id', 'store_id', 'order__store__id'])
+    qs = try_filter_store(qs, store_id, ['store_id', 'order__store_id', 'order__store__id'])
 
     # soft-delete bo'lsa chiqaramiz
     for flag in ['is_deleted', 'deleted']:
@@ -65,7 +65,7 @@ def _products_sold_per_seller(date_from, date_to, store_id, seller_base_path: st
 
     kwargs_ps = date_range_kwargs(ProductSale, date_from, date_to)
     ps = ProductSale.objects.filter(**kwargs_ps)
-    ps = try_filter_store(ps, store_id, ['order__store_id', 'store_id', 'order__store__id'])
+    ps = try_filter_store(ps, store_id, ['store_id', 'order__store_id', 'order__store__id'])
 
     seller_path = f'{order_fk}__{seller_base_path}'
     try:
@@ -21,15 +21,15 @@ SOURCE_CASE = Case(
 )
 
 
-def _get_cashbox(store_id: int) -> Optional[Cashbox]:
+async def _get_cashbox(store_id: int) -> Optional[Cashbox]:
     try:
-        return Cashbox.objects.select_related("store").get(store_id=store_id)
+        return await Cashbox.objects.select_related("store").aget(store_id=store_id)
     except Cashbox.DoesNotExist:
         return None
 
 
-def cash_metrics(store_id: int, start, end) -> Dict[str, Any]:
-    cb = _get_cashbox(store_id)
+async def cash_metrics(store_id: int, start, end) -> Dict[str, Any]:
+    cb = await _get_cashbox(store_id)
 
     if not cb:
         return {
@@ -44,10 +44,10 @@ def cash_metrics(store_id: int, start, end) -> Dict[str, Any]:
             "first_tx_date": None,
         }
 
-    base = CashTransaction.objects.filter(cashbox=cb)
+    base = CashTransaction.objects.filter(store_id=cb.store_id)
 
     # Auditorlik: barcha tarix bo‘yicha qayta hisoblangan balans
-    agg_all = base.aggregate(
+    agg_all = await base.aaggregate(
         inflow=Sum("amount", filter=Q(is_out=False)) or Decimal("0"),
         outflow=Sum("amount", filter=Q(is_out=True)) or Decimal("0"),
     )
@@ -55,7 +55,7 @@ def cash_metrics(store_id: int, start, end) -> Dict[str, Any]:
 
     # Davr bo‘yicha oqimlar
     in_period = base.filter(created_at__gte=start, created_at__lt=end)
-    agg = in_period.aggregate(
+    agg = await in_period.aaggregate(
         inflow=Sum("amount", filter=Q(is_out=False)),
         outflow=Sum("amount", filter=Q(is_out=True)),
         inflow_count=Count("id", filter=Q(is_out=False)),
@@ -65,7 +65,7 @@ def cash_metrics(store_id: int, start, end) -> Dict[str, Any]:
     inflow = agg["inflow"] or Decimal("0")
     outflow = agg["outflow"] or Decimal("0")
 
-    first_tx = base.order_by("created_at").values_list("created_at", flat=True).first()
+    first_tx = await base.order_by("created_at").values_list("created_at", flat=True).afirst()
 
     return {
         "recorded_balance": cb.balance,
@@ -80,15 +80,15 @@ def cash_metrics(store_id: int, start, end) -> Dict[str, Any]:
     }
 
 
-def cash_timeseries(store_id: int, start, end, interval: Interval = "day") -> List[Dict[str, Any]]:
-    cb = _get_cashbox(store_id)
+async def cash_timeseries(store_id: int, start, end, interval: Interval = "day") -> List[Dict[str, Any]]:
+    cb = await _get_cashbox(store_id)
     if not cb:
         return []
 
     trunc = TRUNC[interval]
     qs = (
         CashTransaction.objects
-        .filter(cashbox=cb, created_at__gte=start, created_at__lt=end)
+        .filter(store_id=cb.store_id, created_at__gte=start, created_at__lt=end)
         .annotate(ts=trunc("created_at"))
         .values("ts")
         .annotate(
@@ -99,27 +99,27 @@ def cash_timeseries(store_id: int, start, end, interval: Interval = "day") -> Li
         .order_by("ts")
     )
     data = []
-    for r in qs:
+    async for r in qs:
         inflow = r["inflow"] or Decimal("0")
-    outflow = r["outflow"] or Decimal("0")
-    data.append({
-        "ts": r["ts"],
-        "inflow": inflow,
-        "outflow": outflow,
-        "net": inflow - outflow,
-        "tx_count": r["tx_count"],
-    })
+        outflow = r["outflow"] or Decimal("0")
+        data.append({
+            "ts": r["ts"],
+            "inflow": inflow,
+            "outflow": outflow,
+            "net": inflow - outflow,
+            "tx_count": r["tx_count"],
+        })
     return data
 
 
-def cash_breakdown_by_source(store_id: int, start, end, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-    cb = _get_cashbox(store_id)
+async def cash_breakdown_by_source(store_id: int, start, end, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    cb = await _get_cashbox(store_id)
     if not cb:
         return []
 
     qs = (
         CashTransaction.objects
-        .filter(cashbox=cb, created_at__gte=start, created_at__lt=end)
+        .filter(store_id=cb.store_id, created_at__gte=start, created_at__lt=end)
         .annotate(source=SOURCE_CASE)
         .values("source")
         .annotate(
@@ -131,7 +131,7 @@ def cash_breakdown_by_source(store_id: int, start, end, limit: Optional[int] = N
 
     data = []
 
-    for r in qs:
+    async for r in qs:
         inflow = r["inflow"] or Decimal("0")
         outflow = r["outflow"] or Decimal("0")
         data.append({
@@ -146,20 +146,20 @@ def cash_breakdown_by_source(store_id: int, start, end, limit: Optional[int] = N
     return data[:limit] if (limit and limit > 0) else data
 
 
-def recent_transactions(store_id: int, start, end, limit: int = 20) -> List[Dict[str, Any]]:
-    cb = _get_cashbox(store_id)
+async def recent_transactions(store_id: int, start, end, limit: int = 20) -> List[Dict[str, Any]]:
+    cb = await _get_cashbox(store_id)
     if not cb:
         return []
 
     qs = (
         CashTransaction.objects
-        .filter(cashbox=cb, created_at__gte=start, created_at__lt=end)
+        .filter(store_id=cb.store_id, created_at__gte=start, created_at__lt=end)
         .select_related("order", "expense", "entry_system", "debt_document")
         .order_by("-created_at")[:limit]
     )
 
     items = []
-    for t in qs:
+    async for t in qs:
         if t.order_id:
             src = "order"
             label = f"Order #{t.order_id}"
@@ -182,25 +182,25 @@ def recent_transactions(store_id: int, start, end, limit: int = 20) -> List[Dict
             src = "other"
             label = "Unknown"
 
-    items.append({
-        "id": t.id,
-        "created_at": t.created_at,
-        "amount": t.amount,
-        "direction": "out" if t.is_out else "in",
-        "source": src,
-        "label": label,
-    })
+        items.append({
+            "id": t.id,
+            "created_at": t.created_at,
+            "amount": t.amount,
+            "direction": "out" if t.is_out else "in",
+            "source": src,
+            "label": label,
+        })
     return items
 
 
-def largest_transactions(store_id: int, start, end, limit: int = 10) -> List[Dict[str, Any]]:
-    cb = _get_cashbox(store_id)
+async def largest_transactions(store_id: int, start, end, limit: int = 10) -> List[Dict[str, Any]]:
+    cb = await _get_cashbox(store_id)
     if not cb:
         return []
 
     qs = (
         CashTransaction.objects
-        .filter(cashbox=cb, created_at__gte=start, created_at__lt=end)
+        .filter(store_id=cb.store_id, created_at__gte=start, created_at__lt=end)
         .order_by("-amount")[:limit]
     )
     return [
@@ -210,5 +210,5 @@ def largest_transactions(store_id: int, start, end, limit: int = 10) -> List[Dic
             "amount": t.amount,
             "direction": "out" if t.is_out else "in",
         }
-        for t in qs
+        async for t in qs
     ]
@@ -1,12 +1,12 @@
 from decimal import Decimal
 from typing import Literal, List, Dict, Any, Optional
 
-from django.db.models import Sum, Count, Case, When, Value, Q, F, DecimalField
+from django.db.models import Sum, Count, Value, Q
 from django.db.models.functions import TruncDay, TruncWeek, TruncMonth, Coalesce
-from django.db.models import ExpressionWrapper as EW
 from django.utils import timezone
 
-from loan.models import DebtUser, DebtDocument
+from loan.ageing import BUCKETS as AGEING_BUCKETS
+from loan.models import DebtAgeing, DebtUser, DebtDocument
 
 Interval = Literal["day", "week", "month"]
 TRUNC = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
@@ -18,54 +18,20 @@ DOC_BASE = lambda store_id, start, end, include_mirror=False: (
     .filter(Q(is_mirror=False) | Q(is_mirror=True) if include_mirror else Q(is_mirror=False))
 )
 
-TOTAL_USD = lambda: EW(
-    Case(
-        When(currency='UZS', then=F('total_amount') / F('exchange_rate')),
-        default=F('total_amount'),
-        output_field=DecimalField(max_digits=20, decimal_places=6)
-    ),
-    output_field=DecimalField(max_digits=20, decimal_places=6)
-)
-
-CASH_USD = lambda: EW(
-    Case(
-        When(currency='UZS', then=F('cash_amount') / F('exchange_rate')),
-        default=F('cash_amount'),
-        output_field=DecimalField(max_digits=20, decimal_places=6)
-    ),
-    output_field=DecimalField(max_digits=20, decimal_places=6)
-)
-
-PROD_USD = lambda: EW(
-    Case(
-        When(currency='UZS', then=F('product_amount') / F('exchange_rate')),
-        default=F('product_amount'),
-        output_field=DecimalField(max_digits=20, decimal_places=6)
-    ),
-    output_field=DecimalField(max_digits=20, decimal_places=6)
-)
-
-BALANCE_USD = lambda: EW(
-    Case(
-        When(currency='UZS', then=F('balance') / F('exchange_rate')),
-        default=F('balance'),
-        output_field=DecimalField(max_digits=20, decimal_places=6)
-    ),
-    output_field=DecimalField(max_digits=20, decimal_places=6)
-)
-
+# USD summalar yozishda saqlanadi (loan.models.usd_generated): total_usd, cash_usd,
+# product_usd, DebtUser.balance_usd — agregatlar oddiy ustunlarni yig‘adi.
 
 
-def debt_metrics(store_id: int, start, end, include_mirror: bool = False) -> Dict[str, Any]:
+async def debt_metrics(store_id: int, start, end, include_mirror: bool = False) -> Dict[str, Any]:
     docs = DOC_BASE(store_id, start, end, include_mirror)
 
-    agg = docs.aggregate(
-        transferred=Sum(TOTAL_USD(), filter=Q(method='transfer')),
-        accepted=Sum(TOTAL_USD(), filter=Q(method='accept')),
-        cash_transferred=Sum(CASH_USD(), filter=Q(method='transfer')),
-        cash_accepted=Sum(CASH_USD(), filter=Q(method='accept')),
-        prod_transferred=Sum(PROD_USD(), filter=Q(method='transfer')),
-        prod_accepted=Sum(PROD_USD(), filter=Q(method='accept')),
+    agg = await docs.aaggregate(
+        transferred=Sum('total_usd', filter=Q(method='transfer')),
+        accepted=Sum('total_usd', filter=Q(method='accept')),
+        cash_transferred=Sum('cash_usd', filter=Q(method='transfer')),
+        cash_accepted=Sum('cash_usd', filter=Q(method='accept')),
+        prod_transferred=Sum('product_usd', filter=Q(method='transfer')),
+        prod_accepted=Sum('product_usd', filter=Q(method='accept')),
         transfer_count=Count('id', filter=Q(method='transfer')),
         accept_count=Count('id', filter=Q(method='accept')),
     )
@@ -75,8 +41,8 @@ def debt_metrics(store_id: int, start, end, include_mirror: bool = False) -> Dic
     net = transferred - accepted
 
     du_qs = DebtUser.objects.filter(store_id=store_id)
-    du_agg = du_qs.aggregate(
-        outstanding_usd=Sum(BALANCE_USD(), filter=Q(balance__gt=0)),
+    du_agg = await du_qs.aaggregate(
+        outstanding_usd=Sum('balance_usd', filter=Q(balance__gt=0)),
         debtors=Count('id', filter=Q(balance__gt=0)),
     )
 
@@ -102,22 +68,22 @@ def debt_metrics(store_id: int, start, end, include_mirror: bool = False) -> Dic
 
 # --- Time series ---
 
-def debt_timeseries(store_id: int, start, end, interval: Interval = 'day', include_mirror: bool = False) -> List[Dict[str, Any]]:
+async def debt_timeseries(store_id: int, start, end, interval: Interval = 'day', include_mirror: bool = False) -> List[Dict[str, Any]]:
     trunc = TRUNC[interval]
     docs = DOC_BASE(store_id, start, end, include_mirror).annotate(ts=trunc('date'))
 
     qs = (
         docs.values('ts')
         .annotate(
-            transferred=Sum(TOTAL_USD(), filter=Q(method='transfer')),
-            accepted=Sum(TOTAL_USD(), filter=Q(method='accept')),
+            transferred=Sum('total_usd', filter=Q(method='transfer')),
+            accepted=Sum('total_usd', filter=Q(method='accept')),
             tx_count=Count('id'),
         )
         .order_by('ts')
     )
 
     data = []
-    for r in qs:
+    async for r in qs:
         t = r['transferred'] or Decimal('0')
         a = r['accepted'] or Decimal('0')
         data.append({'ts': r['ts'], 'transferred_usd': t, 'accepted_usd': a, 'net_usd': t - a, 'tx_count': r['tx_count']})
@@ -126,45 +92,64 @@ def debt_timeseries(store_id: int, start, end, interval: Interval = 'day', inclu
 
 # --- Top debtors ---
 
-def top_debtors(store_id: int, limit: int = 10) -> List[Dict[str, Any]]:
-    from django.db.models import Max
-    du = (DebtUser.objects
-          .filter(store_id=store_id)
-          .annotate(balance_usd=BALANCE_USD(), last_activity=Max('documents__date'))
-          .filter(balance__gt=0)
-          .order_by('-balance_usd')[:limit])
+async def top_debtors(store_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+    # DebtAgeing: balance_usd va last_activity oldindan hisoblangan (loan.ageing)
+    rows = (DebtAgeing.objects
+            .filter(store_id=store_id, balance_usd__gt=0)
+            .select_related('debtuser')
+            .order_by('-balance_usd')[:limit])
 
     return [
         {
-            'id': d.id,
-            'phone_number': d.phone_number,
-            'first_name': d.first_name,
-            'last_name': d.last_name,
-            'balance': d.balance,
-            'currency': d.currency,
-            'exchange_rate': d.exchange_rate,
-            'balance_usd': d.balance_usd,
-            'last_activity': d.last_activity,
+            'id': r.debtuser_id,
+            'phone_number': r.debtuser.phone_number,
+            'first_name': r.debtuser.first_name,
+            'last_name': r.debtuser.last_name,
+            'balance': r.debtuser.balance,
+            'currency': r.debtuser.currency,
+            'exchange_rate': r.debtuser.exchange_rate,
+            'balance_usd': r.balance_usd,
+            'last_activity': r.last_activity,
         }
-        for d in du
+        async for r in rows
     ]
 
 
 # --- Ageing (balansning yoshi) ---
 
-def debt_ageing(store_id: int, as_of, buckets: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+async def debt_ageing(store_id: int, as_of, buckets: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Default: DebtAgeing'dan (0-30, 31-60, 61-90, >90; FIFO bo‘yicha ochiq qarz yoshi),
+    as_of — oxirgi hisoblash vaqti. Maxsus `buckets` berilsa — jonli hisob (oxirgi faoliyat bo‘yicha).
+    """
+    if buckets:
+        return await _live_debt_ageing(store_id, as_of, buckets)
+
+    agg = await DebtAgeing.objects.filter(store_id=store_id, balance_usd__gt=0).aaggregate(**{
+        key: agg_fn(field, filter=Q(**{f"{field}__gt": 0}))
+        for field, _, _ in AGEING_BUCKETS
+        for key, agg_fn in ((f"{field}_sum", Sum), (f"{field}_count", Count))
+    })
+    return [
+        {
+            'label': label,
+            'debtors': agg[f"{field}_count"] or 0,
+            'outstanding_usd': agg[f"{field}_sum"] or Decimal('0'),
+        }
+        for field, label, _ in AGEING_BUCKETS
+    ]
+
+
+async def _live_debt_ageing(store_id: int, as_of, buckets: List[int]) -> List[Dict[str, Any]]:
     """
     Buckets: [7, 30, 60, 90] => 0-7, 8-30, 31-60, 61-90, 90+
     Asos: debtor’ning oxirgi faoliyati (so‘nggi hujjat sanasi) va hozirgi balans.
     """
     from django.db.models import Max
 
-    if not buckets:
-        buckets = [7, 30, 60, 90]
-
     du = (DebtUser.objects
           .filter(store_id=store_id)
-          .annotate(balance_usd=BALANCE_USD(), last_activity=Max('documents__date'))
+          .annotate(last_activity=Max('documents__date'))
           .filter(balance__gt=0))
 
     now = as_of
@@ -173,7 +158,7 @@ def debt_ageing(store_id: int, as_of, buckets: Optional[List[int]] = None) -> Li
 
     init = [{'label': labels[i], 'debtors': 0, 'outstanding_usd': Decimal('0')} for i in range(len(labels))]
 
-    for d in du:
+    async for d in du:
         last = d.last_activity or d.created_at
         days = (now - last).days if last else 99999
         bal = d.balance_usd or Decimal('0')
@@ -189,37 +174,37 @@ def debt_ageing(store_id: int, as_of, buckets: Optional[List[int]] = None) -> Li
     return init
 
 
-def debt_breakdown(store_id: int, start, end, include_mirror: bool = False) -> Dict[str, Any]:
+async def debt_breakdown(store_id: int, start, end, include_mirror: bool = False) -> Dict[str, Any]:
     docs = DOC_BASE(store_id, start, end, include_mirror)
 
-    def agg_for(method: str):
+    async def agg_for(method: str):
         sub = docs.filter(method=method)
-        a = sub.aggregate(
-            total_usd=Sum(TOTAL_USD()),
-            cash_usd=Sum(CASH_USD()),
-            product_usd=Sum(PROD_USD()),
+        a = await sub.aaggregate(
+            total=Sum('total_usd'),
+            cash=Sum('cash_usd'),
+            product=Sum('product_usd'),
             count=Count('id')
         )
         return {
-            'total_usd': a['total_usd'] or Decimal('0'),
-            'cash_usd': a['cash_usd'] or Decimal('0'),
-            'product_usd': a['product_usd'] or Decimal('0'),
+            'total_usd': a['total'] or Decimal('0'),
+            'cash_usd': a['cash'] or Decimal('0'),
+            'product_usd': a['product'] or Decimal('0'),
             'count': a['count'] or 0,
         }
 
     return {
-        'transfer': agg_for('transfer'),
-        'accept': agg_for('accept'),
+        'transfer': await agg_for('transfer'),
+        'accept': await agg_for('accept'),
     }
 
 
-def recent_debt_documents(store_id: int, start, end, limit: int = 20, include_mirror: bool = False) -> List[Dict[str, Any]]:
+async def recent_debt_documents(store_id: int, start, end, limit: int = 20, include_mirror: bool = False) -> List[Dict[str, Any]]:
     qs = (DOC_BASE(store_id, start, end, include_mirror)
           .select_related('debtuser')
           .order_by('-date')[:limit])
 
     items = []
-    for d in qs:
+    async for d in qs:
         items.append({
             'id': d.id,
             'date': d.date,
@@ -229,7 +214,7 @@ def recent_debt_documents(store_id: int, start, end, limit: int = 20, include_mi
             'cash_amount': d.cash_amount,
             'product_amount': d.product_amount,
             'total_amount': d.total_amount,
-            'total_usd': (d.total_amount / d.exchange_rate if d.currency == 'UZS' else d.total_amount),
+            'total_usd': d.total_usd,
             'phone_number': d.phone_number or (d.debtuser.phone_number if d.debtuser else None),
             'name': (
                 f"{(d.first_name or (d.debtuser.first_name if d.debtuser else ''))} "
@@ -18,14 +18,14 @@ TRUNC = {
 REASON_LABELS = dict(EXPENSE_REASONS)
 
 
-def expense_metrics(store_id: int, start, end) -> Dict[str, Any]:
+async def expense_metrics(store_id: int, start, end) -> Dict[str, Any]:
     qs = Expense.objects.filter(
         store_id=store_id,
         is_deleted=False,
         date__gte=start,
         date__lt=end,
     )
-    agg = qs.aggregate(total=Sum("amount"), cnt=Count("id"))
+    agg = await qs.aaggregate(total=Sum("amount"), cnt=Count("id"))
     total = agg["total"] or Decimal("0")
     cnt = agg["cnt"] or 0
     days = max((end - start).days, 1)
@@ -38,7 +38,7 @@ def expense_metrics(store_id: int, start, end) -> Dict[str, Any]:
     }
 
 
-def expense_timeseries(store_id: int, start, end, interval: Interval = "day") -> List[Dict[str, Any]]:
+async def expense_timeseries(store_id: int, start, end, interval: Interval = "day") -> List[Dict[str, Any]]:
     trunc = TRUNC[interval]
     qs = (
         Expense.objects.filter(
@@ -49,10 +49,10 @@ def expense_timeseries(store_id: int, start, end, interval: Interval = "day") ->
         .annotate(total=Sum("amount"), count=Count("id"))
         .order_by("ts")
     )
-    return list(qs)
+    return [row async for row in qs]
 
 
-def expense_breakdown_by_reason(
+async def expense_breakdown_by_reason(
         store_id: int, start, end, limit: Optional[int] = None
 ) -> List[Dict[str, Any]]:
     qs = (
@@ -63,13 +63,13 @@ def expense_breakdown_by_reason(
         .annotate(total=Sum("amount"), count=Count("id"))
         .order_by("-total")
     )
-    data = list(qs)
+    data = [row async for row in qs]
     for row in data:
         row["label"] = REASON_LABELS.get(row["reason"], row["reason"])
     return data[:limit] if (limit and limit > 0) else data
 
 
-def expense_other_top_custom_reasons(
+async def expense_other_top_custom_reasons(
         store_id: int, start, end, limit: int = 10
 ) -> List[Dict[str, Any]]:
     qs = (
@@ -84,4 +84,4 @@ def expense_other_top_custom_reasons(
         .annotate(total=Sum("amount"), count=Count("id"))
         .order_by("-total")[:limit]
     )
-    return list(qs)
+    return [row async for row in qs]
@@ -28,46 +28,42 @@ def _stores_q(store_ids: List[int]):
 
 # ---- 1. Overview (asosiy KPI) ----
 
-def platform_overview(store_ids: List[int], start, end) -> Dict[str, Any]:
+async def platform_overview(store_ids: List[int], start, end) -> Dict[str, Any]:
     # Sales
     sales_qs = (Order.objects.active()
                 .filter(_stores_q(store_ids), created_at__gte=start, created_at__lt=end))
-    s = sales_qs.aggregate(
+    s = await sales_qs.aaggregate(
         revenue=Sum("total_price"),
         net_profit=Sum("total_profit"),
         orders=Count("id"),
         paid=Sum("paid_amount"),
         change=Sum("change_amount"),
     )
-    units = ProductOrder.objects.filter(
+    units = await ProductOrder.objects.filter(
         order__created_at__gte=start, order__created_at__lt=end,
         order__is_deleted=False, order__store_id__in=store_ids,
-    ).aggregate(units=Sum("quantity"))
+    ).aaggregate(units=Sum("quantity"))
 
     revenue = s["revenue"] or Decimal("0")
     orders_count = s["orders"] or 0
 
     # Expenses
-    e = Expense.objects.filter(store_id__in=store_ids, is_deleted=False, date__gte=start, date__lt=end)\
-                        .aggregate(total=Sum("amount"), count=Count("id"))
+    e = await Expense.objects.filter(store_id__in=store_ids, is_deleted=False, date__gte=start, date__lt=end)\
+                        .aaggregate(total=Sum("amount"), count=Count("id"))
 
     # Cash flows (period inflow/outflow)
-    c = CashTransaction.objects.filter(cashbox__store_id__in=store_ids, created_at__gte=start, created_at__lt=end)\
-                                .aggregate(inflow=Sum("amount", filter=Q(is_out=False)),
+    c = await CashTransaction.objects.filter(store_id__in=store_ids, created_at__gte=start, created_at__lt=end)\
+                                .aaggregate(inflow=Sum("amount", filter=Q(is_out=False)),
                                            outflow=Sum("amount", filter=Q(is_out=True)))
 
-    # Debts (period flow + outstanding)
-    # USD normalize: DebtDocument model saqlashi shart, bu yerda faqat total_amount ishlatamiz
-    dd = DebtDocument.objects.filter(store_id__in=store_ids, is_deleted=False, date__gte=start, date__lt=end)\
-                              .aggregate(
-                                  transferred=Sum("total_amount", filter=Q(method="transfer")),
-                                  accepted=Sum("total_amount", filter=Q(method="accept")),
+    # Debts (period flow + outstanding) — USD ustunlar yozishda saqlanadi
+    dd = await DebtDocument.objects.filter(store_id__in=store_ids, is_deleted=False, date__gte=start, date__lt=end)\
+                              .aaggregate(
+                                  transferred=Sum("total_usd", filter=Q(method="transfer")),
+                                  accepted=Sum("total_usd", filter=Q(method="accept")),
                               )
-    du = DebtUser.objects.filter(store_id__in=store_ids)\
-                         .aggregate(outstanding=Sum(EW(
-                             # balance USD ekvivalent
-                             F("balance") / F("exchange_rate"), output_field=DecimalField(max_digits=24, decimal_places=6)
-                         )),
+    du = await DebtUser.objects.filter(store_id__in=store_ids)\
+                         .aaggregate(outstanding=Sum("balance_usd"),
                                     debtors=Count("id", filter=Q(balance__gt=0)))
 
     # Inventory (on-hand qiymat va potensial tushum)
@@ -75,13 +71,12 @@ def platform_overview(store_ids: List[int], start, end) -> Dict[str, Any]:
     on_hand = F("count") + F("warehouse_count")
     inv_value = EW(on_hand * F("enter_price"), output_field=DecimalField(max_digits=30, decimal_places=6))
     pot_rev = EW(on_hand * F("out_price"), output_field=DecimalField(max_digits=30, decimal_places=6))
-    inv = p_qs.aggregate(on_hand_qty=Sum(on_hand), inv_value=Sum(inv_value), pot_revenue=Sum(pot_rev))
+    inv = await p_qs.aaggregate(on_hand_qty=Sum(on_hand), inv_value=Sum(inv_value), pot_revenue=Sum(pot_rev))
 
     # Refunds (period)
-    r = Refund.objects.filter(
-        Q(product_order__order__store_id__in=store_ids) | Q(document_product__document__store_id__in=store_ids),
-        created_at__gte=start, created_at__lt=end
-    ).aggregate(count=Count("id"), units=Sum("quantity"))
+    r = await Refund.objects.filter(
+        store_id__in=store_ids, created_at__gte=start, created_at__lt=end
+    ).aaggregate(count=Count("id"), units=Sum("quantity"))
 
     return {
         "sales": {
@@ -127,7 +122,7 @@ def platform_overview(store_ids: List[int], start, end) -> Dict[str, Any]:
 
 # ---- 2. Timeseries (jamlangan) ----
 
-def platform_timeseries(store_ids: List[int], start, end, interval: Interval = "day") -> List[Dict[str, Any]]:
+async def platform_timeseries(store_ids: List[int], start, end, interval: Interval = "day") -> List[Dict[str, Any]]:
     trunc = TRUNC[interval]
     # Sales
     s = (Order.objects.active()
@@ -141,7 +136,7 @@ def platform_timeseries(store_ids: List[int], start, end, interval: Interval = "
          .annotate(ts=trunc("date")).values("ts").annotate(expense=Sum("amount")))
 
     # Cash
-    c = (CashTransaction.objects.filter(cashbox__store_id__in=store_ids, created_at__gte=start, created_at__lt=end)
+    c = (CashTransaction.objects.filter(store_id__in=store_ids, created_at__gte=start, created_at__lt=end)
          .annotate(ts=trunc("created_at")).values("ts").annotate(
             inflow=Sum("amount", filter=Q(is_out=False)),
             outflow=Sum("amount", filter=Q(is_out=True)),
@@ -149,17 +144,17 @@ def platform_timeseries(store_ids: List[int], start, end, interval: Interval = "
 
     # Merge by ts
     by_ts: Dict[Any, Dict[str, Any]] = {}
-    for r in s:
+    async for r in s:
         ts = r["ts"]
         by_ts.setdefault(ts, {"revenue": Decimal("0"), "profit": Decimal("0"), "orders": 0, "expense": Decimal("0"), "inflow": Decimal("0"), "outflow": Decimal("0")})
         by_ts[ts]["revenue"] += r["revenue"] or 0
         by_ts[ts]["profit"] += r["profit"] or 0
         by_ts[ts]["orders"] += r["orders"] or 0
-    for r in e:
+    async for r in e:
         ts = r["ts"]
         by_ts.setdefault(ts, {"revenue": Decimal("0"), "profit": Decimal("0"), "orders": 0, "expense": Decimal("0"), "inflow": Decimal("0"), "outflow": Decimal("0")})
         by_ts[ts]["expense"] += r["expense"] or 0
-    for r in c:
+    async for r in c:
         ts = r["ts"]
         by_ts.setdefault(ts, {"revenue": Decimal("0"), "profit": Decimal("0"), "orders": 0, "expense": Decimal("0"), "inflow": Decimal("0"), "outflow": Decimal("0")})
         by_ts[ts]["inflow"] += r["inflow"] or 0
@@ -181,7 +176,7 @@ def platform_timeseries(store_ids: List[int], start, end, interval: Interval = "
 
 # ---- 3. TOP do'konlar ----
 
-def top_stores(store_ids: List[int], start, end, limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+async def top_stores(store_ids: List[int], start, end, limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
     # Revenue/profit bo'yicha
     s = (Order.objects.active()
          .filter(_stores_q(store_ids), created_at__gte=start, created_at__lt=end)
@@ -191,10 +186,10 @@ def top_stores(store_ids: List[int], start, end, limit: int = 10) -> Dict[str, L
     # Expense bo'yicha
     e = (Expense.objects.filter(store_id__in=store_ids, is_deleted=False, date__gte=start, date__lt=end)
          .values("store_id").annotate(expense=Sum("amount")))
-    e_map = {r["store_id"]: r["expense"] or Decimal("0") for r in e}
+    e_map = {r["store_id"]: r["expense"] or Decimal("0") async for r in e}
 
     rows = []
-    for r in s:
+    async for r in s:
         rid = r["store_id"]
         rows.append({
             "store_id": rid,
@@ -215,10 +210,10 @@ def top_stores(store_ids: List[int], start, end, limit: int = 10) -> Dict[str, L
 
 # ---- 4. To'lov turlari bo'yicha taqsimot ----
 
-def payment_split_multi(store_ids: List[int], start, end) -> List[Dict[str, Any]]:
+async def payment_split_multi(store_ids: List[int], start, end) -> List[Dict[str, Any]]:
     qs = (Order.objects.active()
           .filter(_stores_q(store_ids), created_at__gte=start, created_at__lt=end)
           .values("payment_type")
           .annotate(amount=Sum("paid_amount"), orders=Count("id"))
           .order_by("-amount"))
-    return list(qs)
\ No newline at end of file
+    return [row async for row in qs]
\ No newline at end of file
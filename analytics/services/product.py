@@ -14,14 +14,14 @@ TRUNC = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
 
 # --- 1. Inventory metrics (zaxira holati) ---
 
-def inventory_metrics(store_id: int) -> Dict[str, Any]:
+async def inventory_metrics(store_id: int) -> Dict[str, Any]:
     qs = Product.objects.filter(store_id=store_id, is_deleted=False)
 
     on_hand_expr = F("count") + F("warehouse_count")
     inv_value_expr = EW(on_hand_expr * F("enter_price"), output_field=DecimalField(max_digits=30, decimal_places=6))
     potential_rev_expr = EW(on_hand_expr * F("out_price"), output_field=DecimalField(max_digits=30, decimal_places=6))
 
-    agg = qs.aggregate(
+    agg = await qs.aaggregate(
         sku_count=Count("id"),
         in_stock=Count("id", filter=Q(count__gt=0) | Q(warehouse_count__gt=0)),
         shelf_qty=Sum("count"),
@@ -50,13 +50,13 @@ def inventory_metrics(store_id: int) -> Dict[str, Any]:
 
 # --- 2. Harakatlar timeseries (inflow/outflow) ---
 
-def movement_timeseries(store_id: int, start, end, interval: Interval = "day", include_debt: bool = True) -> List[Dict[str, Any]]:
+async def movement_timeseries(store_id: int, start, end, interval: Interval = "day", include_debt: bool = True) -> List[Dict[str, Any]]:
     trunc = TRUNC[interval]
 
     # Inflow: barcha StockEntry (importlar, qaytarishlar, debt accept, refund DISLIKED/OTHER)
     inflow = (
         StockEntry.objects
-        .filter(product__store_id=store_id, created_at__gte=start, created_at__lt=end)
+        .filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
         .annotate(ts=trunc("created_at"))
         .values("ts")
         .annotate(
@@ -68,7 +68,7 @@ def movement_timeseries(store_id: int, start, end, interval: Interval = "day", i
     # Outflow: sotuvlar (ProductSale)
     sales = (
         ProductSale.objects
-        .filter(order__store_id=store_id, created_at__gte=start, created_at__lt=end)
+        .filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
         .annotate(ts=trunc("created_at"))
         .values("ts")
         .annotate(out_qty=Sum("quantity"), out_value=Sum("total_price"))
@@ -78,7 +78,6 @@ def movement_timeseries(store_id: int, start, end, interval: Interval = "day", i
     dp_by_ts = {}
     if include_debt:
         from loan.models import DocumentProduct
-        from django.db.models import Case, When
         dp = (
             DocumentProduct.objects
             .filter(
@@ -92,29 +91,22 @@ def movement_timeseries(store_id: int, start, end, interval: Interval = "day", i
             .values("ts")
             .annotate(
                 out_qty=Sum("quantity"),
-                out_value=Sum(EW(
-                    Case(
-                        When(currency="UZS", then=F("amount") / F("exchange_rate")),
-                        default=F("amount"),
-                        output_field=DecimalField(max_digits=30, decimal_places=6)
-                    ),
-                    output_field=DecimalField(max_digits=30, decimal_places=6)
-                )),
+                out_value=Sum("amount_usd"),
             )
         )
-        for r in dp:
+        async for r in dp:
             dp_by_ts[r["ts"]] = {"out_qty": r["out_qty"] or 0, "out_value": r["out_value"] or Decimal("0")}
 
     # Merge
     by_ts: Dict[Any, Dict[str, Any]] = {}
 
-    for r in inflow:
+    async for r in inflow:
         ts = r["ts"]
         by_ts.setdefault(ts, {"in_qty": 0, "in_value": Decimal("0"), "out_qty": 0, "out_value": Decimal("0")})
         by_ts[ts]["in_qty"] = r["in_qty"] or 0
         by_ts[ts]["in_value"] = r["in_value"] or Decimal("0")
 
-    for r in sales:
+    async for r in sales:
         ts = r["ts"]
         by_ts.setdefault(ts, {"in_qty": 0, "in_value": Decimal("0"), "out_qty": 0, "out_value": Decimal("0")})
         by_ts[ts]["out_qty"] += r["out_qty"] or 0
@@ -143,20 +135,19 @@ def movement_timeseries(store_id: int, start, end, interval: Interval = "day", i
 
 # --- 3. TOP lar: revenue/profit/units/waste ---
 
-def top_products(store_id: int, start, end, limit: int = 10, include_debt: bool = True) -> Dict[str, List[Dict[str, Any]]]:
+async def top_products(store_id: int, start, end, limit: int = 10, include_debt: bool = True) -> Dict[str, List[Dict[str, Any]]]:
     # Sotuvlar bo‘yicha TOP (revenue/profit/units)
     s = (
         ProductSale.objects
-        .filter(order__store_id=store_id, created_at__gte=start, created_at__lt=end)
+        .filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
         .values("product_id", "product__name")
         .annotate(revenue=Sum("total_price"), profit=Sum("profit"), units=Sum("quantity"))
     )
-    by_pid = { (r["product_id"], r["product__name"]): r for r in s }
+    by_pid = { (r["product_id"], r["product__name"]): r async for r in s }
 
     # Debt transfer’lardan units/out_value qo‘shish (ixtiyoriy)
     if include_debt:
         from loan.models import DocumentProduct
-        from django.db.models import Case, When
         dp = (
             DocumentProduct.objects
             .filter(
@@ -169,17 +160,10 @@ def top_products(store_id: int, start, end, limit: int = 10, include_debt: bool
             .values("product_id", "product__name")
             .annotate(
                 dp_units=Sum("quantity"),
-                dp_value=Sum(EW(
-                    Case(
-                        When(currency="UZS", then=F("amount") / F("exchange_rate")),
-                        default=F("amount"),
-                        output_field=DecimalField(max_digits=30, decimal_places=6)
-                    ),
-                    output_field=DecimalField(max_digits=30, decimal_places=6)
-                )),
+                dp_value=Sum("amount_usd"),
             )
         )
-        for r in dp:
+        async for r in dp:
             key = (r["product_id"], r["product__name"])
             base = by_pid.setdefault(key, {"product_id": r["product_id"], "product__name": r["product__name"], "revenue": Decimal("0"), "profit": Decimal("0"), "units": 0, "dp_value": Decimal("0")})
             base["units"] = (base.get("units") or 0) + (r["dp_units"] or 0)
@@ -194,14 +178,14 @@ def top_products(store_id: int, start, end, limit: int = 10, include_debt: bool
     # Waste bo‘yicha TOP
     waste = (
         WasteEntry.objects
-        .filter(product__store_id=store_id, created_at__gte=start, created_at__lt=end)
+        .filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
         .values("product_id", "product__name", "reason")
         .annotate(qty=Sum("quantity"))
     )
     # qiymat USD (tannarx) bo‘yicha
     from django.db.models import FloatField
     waste_by_pid = {}
-    for r in waste:
+    async for r in waste:
         key = (r["product_id"], r["product__name"])
         waste_by_pid.setdefault(key, {"product_id": r["product_id"], "product__name": r["product__name"], "qty": 0})
         waste_by_pid[key]["qty"] += r["qty"] or 0
@@ -216,30 +200,30 @@ def top_products(store_id: int, start, end, limit: int = 10, include_debt: bool
 
 # --- 4. Waste breakdown (sabablar bo‘yicha) ---
 
-def waste_breakdown(store_id: int, start, end) -> List[Dict[str, Any]]:
+async def waste_breakdown(store_id: int, start, end) -> List[Dict[str, Any]]:
     qs = (
         WasteEntry.objects
-        .filter(product__store_id=store_id, created_at__gte=start, created_at__lt=end)
+        .filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
         .values("reason")
         .annotate(qty=Sum("quantity"))
         .order_by("-qty")
     )
-    return list(qs)
+    return [row async for row in qs]
 
 # --- 5. Slow movers (sotilmayotgan qoldiq) ---
 
-def slow_movers(store_id: int, as_of, min_days: int = 30, top_n: int = 20, include_debt: bool = True) -> List[Dict[str, Any]]:
+async def slow_movers(store_id: int, as_of, min_days: int = 30, top_n: int = 20, include_debt: bool = True) -> List[Dict[str, Any]]:
     from django.db.models import Max
     prods = Product.objects.filter(store_id=store_id, is_deleted=False).annotate(on_hand=F("count") + F("warehouse_count"))
 
     # So‘nggi sotuv sanasi (ProductSale)
     last_sale = (
         ProductSale.objects
-        .filter(order__store_id=store_id)
+        .filter(store_id=store_id)
         .values("product_id")
         .annotate(last=Max("created_at"))
     )
-    last_sale_map = {r["product_id"]: r["last"] for r in last_sale}
+    last_sale_map = {r["product_id"]: r["last"] async for r in last_sale}
 
     # Debt transfer ham faoliyat sifatida hisoblang (ixtiyoriy)
     last_transfer_map = {}
@@ -251,10 +235,10 @@ def slow_movers(store_id: int, as_of, min_days: int = 30, top_n: int = 20, inclu
             .values("product_id")
             .annotate(last=Max("document__date"))
         )
-        last_transfer_map = {r["product_id"]: r["last"] for r in last_transfer}
+        last_transfer_map = {r["product_id"]: r["last"] async for r in last_transfer}
 
     items = []
-    for p in prods:
+    async for p in prods:
         if (p.on_hand or 0) <= 0:
             continue
         l1 = last_sale_map.get(p.id)
@@ -274,16 +258,16 @@ def slow_movers(store_id: int, as_of, min_days: int = 30, top_n: int = 20, inclu
 
 # --- 6. Low cover (qoplash kunlari kam) ---
 
-def low_cover(store_id: int, start, end, cover_days: int = 7, min_avg_daily: float = 0.1, top_n: int = 20, include_debt: bool = True) -> List[Dict[str, Any]]:
+async def low_cover(store_id: int, start, end, cover_days: int = 7, min_avg_daily: float = 0.1, top_n: int = 20, include_debt: bool = True) -> List[Dict[str, Any]]:
     days = max((end - start).days, 1)
     # Sotuv + debt transfer birliklari bo‘yicha o‘rtacha kunlik chiqim
     sales = (
         ProductSale.objects
-        .filter(order__store_id=store_id, created_at__gte=start, created_at__lt=end)
+        .filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
         .values("product_id")
         .annotate(units=Sum("quantity"))
     )
-    usage_map = {r["product_id"]: (r["units"] or 0) for r in sales}
+    usage_map = {r["product_id"]: (r["units"] or 0) async for r in sales}
 
     if include_debt:
         from loan.models import DocumentProduct
@@ -293,13 +277,13 @@ def low_cover(store_id: int, start, end, cover_days: int = 7, min_avg_daily: flo
             .values("product_id")
             .annotate(units=Sum("quantity"))
         )
-        for r in dp:
+        async for r in dp:
             usage_map[r["product_id"]] = usage_map.get(r["product_id"], 0) + (r["units"] or 0)
 
     prods = Product.objects.filter(store_id=store_id, is_deleted=False).annotate(on_hand=F("count") + F("warehouse_count"))
 
     res = []
-    for p in prods:
+    async for p in prods:
         on_hand = p.on_hand or 0
         avg_daily = (usage_map.get(p.id, 0) / days)
         avg_daily = max(avg_daily, min_avg_daily)  # nolga bo‘linmaslik va juda kichik bo‘lsa ham meaningful bo‘lishi uchun
@@ -318,15 +302,15 @@ def low_cover(store_id: int, start, end, cover_days: int = 7, min_avg_daily: flo
 
 # --- 7. Recent stock entries ---
 
-def recent_stock_entries(store_id: int, start, end, limit: int = 20) -> List[Dict[str, Any]]:
+async def recent_stock_entries(store_id: int, start, end, limit: int = 20) -> List[Dict[str, Any]]:
     qs = (
         StockEntry.objects
-        .filter(product__store_id=store_id, created_at__gte=start, created_at__lt=end)
+        .filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
         .select_related("product", "debt")
         .order_by("-created_at")[:limit]
     )
     items = []
-    for e in qs:
+    async for e in qs:
         source = "debt" if getattr(e, "debt_id", None) else ("warehouse" if e.is_warehouse else "shelf")
         items.append({
             "id": e.id,
@@ -25,18 +25,14 @@ RESTOCK_REASON = ["DISLIKED", "OTHER"]
 def _base_qs(store_id: int, start, end):
     return (
         Refund.objects
-        .filter(created_at__gte=start, created_at__lt=end)
-        .filter(
-            Q(product_order__order__store_id=store_id) |
-            Q(document_product__document__store_id=store_id)
-        )
+        .filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
     )
 
 
-def refund_metrics(store_id: int, start, end) -> Dict[str, Any]:
+async def refund_metrics(store_id: int, start, end) -> Dict[str, Any]:
     qs = _base_qs(store_id, start, end)
 
-    agg = qs.aggregate(
+    agg = await qs.aaggregate(
         refunds=Count("id"),
         units=Sum("quantity"),
         restock_units=Sum("quantity", filter=Q(reason_type__in=RESTOCK_REASON)),
@@ -52,16 +48,16 @@ def refund_metrics(store_id: int, start, end) -> Dict[str, Any]:
         default=Value(Decimal('0')),
         output_field=DecimalField(max_digits=30, decimal_places=6)
     )
-    restock_value = qs.filter(reason_type__in=RESTOCK_REASON).aggregate(
+    restock_value = (await qs.filter(reason_type__in=RESTOCK_REASON).aaggregate(
         v=Sum(EW(unit_cost * F("quantity"), output_field=DecimalField(max_digits=30, decimal_places=6)))
-    )["v"] or Decimal("0")
-    waste_cost = qs.filter(reason_type="UNUSABLE").aggregate(
+    ))["v"] or Decimal("0")
+    waste_cost = (await qs.filter(reason_type="UNUSABLE").aaggregate(
         v=Sum(EW(unit_cost * F("quantity"), output_field=DecimalField(max_digits=30, decimal_places=6)))
-    )["v"] or Decimal("0")
+    ))["v"] or Decimal("0")
 
     # revenue reversal (faqat order tarafidagi refund’lar): Python darajasida to‘plash
     revenue_reversed = Decimal("0")
-    for r in qs.select_related("product_order"):
+    async for r in qs.select_related("product_order"):
         if r.product_order:
             try:
                 price_usd = r.product_order.get_price_usd()
@@ -82,7 +78,7 @@ def refund_metrics(store_id: int, start, end) -> Dict[str, Any]:
     }
 
 
-def refund_timeseries(store_id: int, start, end, interval: Interval = "day") -> List[Dict[str, Any]]:
+async def refund_timeseries(store_id: int, start, end, interval: Interval = "day") -> List[Dict[str, Any]]:
     trunc = TRUNC[interval]
     qs = _base_qs(store_id, start, end).annotate(ts=trunc("created_at"))
 
@@ -117,10 +113,10 @@ def refund_timeseries(store_id: int, start, end, interval: Interval = "day") ->
     )
     val_map = {
         r["ts"]: {"restock_value": r["restock_value"] or Decimal("0"), "waste_cost": r["waste_cost"] or Decimal("0")}
-        for r in val}
+        async for r in val}
 
     out = []
-    for r in base:
+    async for r in base:
         ts = r["ts"]
         m = val_map.get(ts, {"restock_value": Decimal("0"), "waste_cost": Decimal("0")})
         out.append({
@@ -135,25 +131,27 @@ def refund_timeseries(store_id: int, start, end, interval: Interval = "day") ->
     return out
 
 
-def refund_breakdown_by_reason(store_id: int, start, end) -> List[Dict[str, Any]]:
+async def refund_breakdown_by_reason(store_id: int, start, end) -> List[Dict[str, Any]]:
     qs = _base_qs(store_id, start, end)
-    return list(
+    rows = (
         qs.values("reason_type")
         .annotate(count=Count("id"), units=Sum("quantity"))
         .order_by("-units")
     )
+    return [row async for row in rows]
 
 
-def refund_breakdown_by_source(store_id: int, start, end) -> List[Dict[str, Any]]:
+async def refund_breakdown_by_source(store_id: int, start, end) -> List[Dict[str, Any]]:
     qs = _base_qs(store_id, start, end).annotate(source=SOURCE_CASE)
-    return list(
+    rows = (
         qs.values("source")
         .annotate(count=Count("id"), units=Sum("quantity"))
         .order_by("-units")
     )
+    return [row async for row in rows]
 
 
-def top_refunded_products(store_id: int, start, end, limit: int = 10) -> List[Dict[str, Any]]:
+async def top_refunded_products(store_id: int, start, end, limit: int = 10) -> List[Dict[str, Any]]:
     """
     Eng ko'p qaytarilgan mahsulotlar (units bo'yicha).
     Case/When bilan product_id va product_name ni annotatsiya qilib,
@@ -180,19 +178,20 @@ def top_refunded_products(store_id: int, start, end, limit: int = 10) -> List[Di
           .annotate(units=Sum("quantity"))
           .order_by("-units")[:limit]
     )
-    return list(rows)
+    return [row async for row in rows]
 
 
-def other_top_custom_reasons(store_id: int, start, end, limit: int = 10) -> List[Dict[str, Any]]:
+async def other_top_custom_reasons(store_id: int, start, end, limit: int = 10) -> List[Dict[str, Any]]:
     qs = _base_qs(store_id, start, end).filter(reason_type="OTHER")
-    return list(
+    rows = (
         qs.values("custom_reason")
         .annotate(count=Count("id"), units=Sum("quantity"))
         .order_by("-units")[:limit]
     )
+    return [row async for row in rows]
 
 
-def recent_refunds(store_id: int, start, end, limit: int = 20) -> List[Dict[str, Any]]:
+async def recent_refunds(store_id: int, start, end, limit: int = 20) -> List[Dict[str, Any]]:
     qs = (
         _base_qs(store_id, start, end)
         .select_related("product_order__product", "document_product__product")
@@ -200,7 +199,7 @@ def recent_refunds(store_id: int, start, end, limit: int = 20) -> List[Dict[str,
     )
 
     items = []
-    for r in qs:
+    async for r in qs:
         if r.product_order:
             src = "order"
             pname = r.product_order.product.name if r.product_order.product else None
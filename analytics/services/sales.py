@@ -15,11 +15,11 @@ TRUNC = {
 }
 
 
-def sales_metrics(store_id: int, start, end):
+async def sales_metrics(store_id: int, start, end):
     qs = (Order.objects.active()
           .filter(store_id=store_id, created_at__gte=start, created_at__lt=end))
 
-    totals = qs.aggregate(
+    totals = await qs.aaggregate(
         revenue=Sum("total_price"),
         net_profit=Sum("total_profit"),
         orders=Count("id"),
@@ -27,12 +27,12 @@ def sales_metrics(store_id: int, start, end):
         change=Sum("change_amount"),
     )
 
-    units = ProductOrder.objects.filter(
+    units = await ProductOrder.objects.filter(
         order__store_id=store_id,
         order__created_at__gte=start,
         order__created_at__lt=end,
         order__is_deleted=False,
-    ).aggregate(units=Sum("quantity"))
+    ).aaggregate(units=Sum("quantity"))
 
     revenue = totals["revenue"] or Decimal("0")
     orders_count = totals["orders"] or 0
@@ -48,7 +48,7 @@ def sales_metrics(store_id: int, start, end):
     }
 
 
-def sales_timeseries(store_id: int, start, end, interval: Interval = "day"):
+async def sales_timeseries(store_id: int, start, end, interval: Interval = "day"):
     trunc = TRUNC[interval]
     qs = (Order.objects.active()
           .filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
@@ -56,23 +56,23 @@ def sales_timeseries(store_id: int, start, end, interval: Interval = "day"):
           .values("ts")
           .annotate(revenue=Sum("total_price"), profit=Sum("total_profit"), orders=Count("id"))
           .order_by("ts"))
-    return list(qs)
+    return [row async for row in qs]
 
 
-def top_products(store_id: int, start, end, by: Literal["revenue", "profit"] = "revenue", limit: int = 10):
+async def top_products(store_id: int, start, end, by: Literal["revenue", "profit"] = "revenue", limit: int = 10):
     agg_field = "total_price" if by == "revenue" else "profit"
     qs = (ProductSale.objects
-    .filter(order__store_id=store_id, created_at__gte=start, created_at__lt=end)
+    .filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
     .values("product_id", "product__name")
     .annotate(metric=Sum(agg_field), quantity=Sum("quantity"))
     .order_by("-metric")[:limit])
-    return list(qs)
+    return [row async for row in qs]
 
 
-def payment_split(store_id: int, start, end):
+async def payment_split(store_id: int, start, end):
     qs = (Order.objects.active()
           .filter(store_id=store_id, created_at__gte=start, created_at__lt=end)
           .values("payment_type")
           .annotate(amount=Sum("paid_amount"), orders=Count("id"))
           .order_by("-amount"))
-    return list(qs)
+    return [row async for row in qs]
@@ -7,6 +7,8 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from config.replicas import ReplicaReadMixin
+
 # SELECTOR & SERVICE lar
 from .selectors.turnover import compute_turnover
 from .selectors.gross_profit import compute_gross_profit
@@ -88,7 +90,8 @@ def parse_range(q):
 
 
 # ===================== ORDERS =====================
-class OrderAnalyticsViewSet(ViewSet):
+class OrderAnalyticsViewSet(ReplicaReadMixin, ViewSet):
+    replica_actions = None
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=['get'], url_path='summary')
@@ -169,7 +172,8 @@ class OrderAnalyticsViewSet(ViewSet):
 
 
 # ===================== PRODUCTS (IMPORTS) =====================
-class ProductAnalyticsViewSet(ViewSet):
+class ProductAnalyticsViewSet(ReplicaReadMixin, ViewSet):
+    replica_actions = None
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=['get'], url_path='imports')
@@ -248,7 +252,8 @@ class ProductAnalyticsViewSet(ViewSet):
 
 
 # ===================== DEBTS =====================
-class DebtAnalyticsViewSet(ViewSet):
+class DebtAnalyticsViewSet(ReplicaReadMixin, ViewSet):
+    replica_actions = None
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=['get'], url_path='summary')
@@ -277,7 +282,8 @@ class DebtAnalyticsViewSet(ViewSet):
 
 
 # ===================== STORE (NET PROFIT) =====================
-class StoreAnalyticsViewSet(ViewSet):
+class StoreAnalyticsViewSet(ReplicaReadMixin, ViewSet):
+    replica_actions = None
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=['get'], url_path='profit')
@@ -314,7 +320,8 @@ class StoreAnalyticsViewSet(ViewSet):
 
 from .selectors.sellers import compute_seller_summary, compute_seller_detail
 
-class SellerAnalyticsViewSet(ViewSet):
+class SellerAnalyticsViewSet(ReplicaReadMixin, ViewSet):
+    replica_actions = None
     permission_classes = [IsAuthenticated]
 
     @action(detail=False, methods=['get'], url_path='summary')
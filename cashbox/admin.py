@@ -19,7 +19,10 @@ class CashTransactionAdmin(admin.ModelAdmin):
     list_filter = ('is_out', 'created_at', 'cashbox__store__name')
     search_fields = ('note', 'manual_source', 'cashbox__store__name')
     date_hierarchy = 'created_at'
-    list_select_related = ('cashbox', 'order')
+    # get_full_note har bir qator uchun expense/entry_system/debt_document'ga murojaat qiladi
+    list_select_related = (
+        'cashbox__store', 'order', 'expense', 'entry_system__product', 'debt_document__debtuser',
+    )
     autocomplete_fields = ('cashbox', 'order')
 
     readonly_fields = ["get_full_note"]
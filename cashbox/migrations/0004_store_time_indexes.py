@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:46
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+CHUNK = 50_000
+
+
+def backfill_store(apps, schema_editor):
+    CashTransaction = apps.get_model('cashbox', 'CashTransaction')
+    Cashbox = apps.get_model('cashbox', 'Cashbox')
+    store = Subquery(Cashbox.objects.filter(pk=OuterRef('cashbox_id')).values('store_id')[:1])
+    last = CashTransaction.objects.aggregate(m=Max('id'))['m'] or 0
+    for start in range(0, last + 1, CHUNK):
+        CashTransaction.objects.filter(
+            id__gte=start, id__lt=start + CHUNK, store__isnull=True
+        ).update(store_id=store)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('cashbox', '0003_initial'),
+        ('store', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cashtransaction',
+            name='store',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='cash_transactions', to='store.store'),
+        ),
+        migrations.RunPython(backfill_store, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='cashtransaction',
+            index=models.Index(fields=['store', 'created_at'], name='cashtx_store_created_idx'),
+        ),
+    ]
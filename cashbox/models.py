@@ -2,6 +2,10 @@ from django.db import models
 from decimal import Decimal, ROUND_HALF_UP
 from django.db.models import Sum
 
+from events.models import EventType
+from events.outbox import publish
+from config.unit_of_work import add_delta
+
 
 class Cashbox(models.Model):
     store = models.OneToOneField("store.Store", on_delete=models.CASCADE, related_name="cashbox")
@@ -25,9 +29,16 @@ class Cashbox(models.Model):
         self.balance = self.calculate_balance()
         self.save(update_fields=['balance'])
 
+    def apply_delta(self, delta):
+        """Balansni to‘liq qayta hisoblamasdan o‘zgartiradi; unit_of_work ichida bitta UPDATE."""
+        add_delta(self, balance=delta)
+
 
 class CashTransaction(models.Model):
     cashbox = models.ForeignKey(Cashbox, on_delete=models.CASCADE, related_name="transactions")
+    # cashbox.store_id nusxasi (analytics uchun)
+    store = models.ForeignKey("store.Store", on_delete=models.CASCADE, related_name="cash_transactions",
+                              null=True, editable=False, db_index=False)
     amount = models.DecimalField(max_digits=20, decimal_places=6)
     is_out = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -44,6 +55,9 @@ class CashTransaction(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['store', 'created_at'], name='cashtx_store_created_idx'),
+        ]
         verbose_name = "Kassa qismi"
         verbose_name_plural = "Kassa qismlari"
 
@@ -66,10 +80,32 @@ class CashTransaction(models.Model):
         direction = "Chiqim" if self.is_out else "Kirim"
         return f"{direction}: {self.amount} ({self.cashbox.store.name})"
 
+    @property
+    def signed_amount(self):
+        return -self.amount if self.is_out else self.amount
+
     def save(self, *args, **kwargs):
+        if self.store_id is None:
+            self.store_id = self.cashbox.store_id
+        delta = Decimal(self.signed_amount)
+        if not self._state.adding:
+            old = CashTransaction.objects.filter(pk=self.pk).values('amount', 'is_out').first()
+            if old:
+                delta -= -old['amount'] if old['is_out'] else old['amount']
         super().save(*args, **kwargs)
-        self.cashbox.refresh_balance()
+        # To‘liq qayta hisob (reconcile) CashPosted hodisasi obunachisida
+        self.cashbox.apply_delta(delta)
+        self._publish(delta)
 
     def delete(self, *args, **kwargs):
+        pk = self.pk
         super().delete(*args, **kwargs)
-        self.cashbox.refresh_balance()
+        delta = -Decimal(self.signed_amount)
+        self.cashbox.apply_delta(delta)
+        self._publish(delta, transaction_id=pk, deleted=True)
+
+    def _publish(self, delta, transaction_id=None, deleted=False):
+        publish(
+            EventType.CASH_POSTED, self.cashbox_id, store_id=self.store_id,
+            transaction_id=transaction_id or self.pk, delta=delta, deleted=deleted,
+        )
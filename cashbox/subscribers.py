@@ -0,0 +1,33 @@
+import logging
+
+from events.models import EventType, OutboxEvent
+from events.registry import subscriber
+
+from .models import Cashbox
+
+logger = logging.getLogger("project")
+
+
+@subscriber(EventType.CASH_POSTED)
+def reconcile_cashbox_balance(event):
+    """
+    Saqlashda balans delta bilan o‘zgaradi; bu yerda to‘liq yig‘indi bilan solishtiriladi.
+    Shu kassa uchun keyingi hodisa kutayotgan bo‘lsa — o‘sha tekshiradi.
+    """
+    newer_pending = OutboxEvent.objects.filter(
+        type=EventType.CASH_POSTED, aggregate_id=event.aggregate_id,
+        processed_at__isnull=True, id__gt=event.id,
+    ).exists()
+    if newer_pending:
+        return
+
+    cashbox = Cashbox.objects.select_for_update().filter(pk=event.aggregate_id).first()
+    if cashbox is None:
+        return
+    expected = cashbox.calculate_balance()
+    if cashbox.balance != expected:
+        logger.warning(
+            "Kassa %s balansi tuzatildi: %s -> %s", cashbox.pk, cashbox.balance, expected,
+        )
+        cashbox.balance = expected
+        cashbox.save(update_fields=['balance'])
@@ -5,3 +5,18 @@ pytestmark = pytest.mark.django_db
 
 def test_models_importable():
     assert apps.all_models
+
+
+def test_transaction_store_copied_from_cashbox():
+    from django.contrib.auth import get_user_model
+    from cashbox.models import CashTransaction
+    from platform_user.models import PlatformUser
+    from store.models import Store
+
+    user = get_user_model().objects.create_user(username="cb", password="x", phone_number="+998900000011")
+    store = Store.objects.create(name="Do‘kon", owner=PlatformUser.objects.create(user=user))
+
+    tx = CashTransaction.objects.create(cashbox=store.cashbox, amount=10, exchange_rate=1)
+
+    assert tx.store_id == store.pk
+    assert CashTransaction.objects.filter(store_id=store.pk).count() == 1
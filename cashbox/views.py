@@ -7,9 +7,10 @@ from staffs.permissions import StoreStaffPermission
 from rest_framework.exceptions import PermissionDenied, NotFound
 from .models import Cashbox, CashTransaction
 from .serializers import CashboxSerializer, CashTransactionSerializer
-from staffs.models import StoreStaff
+from staffs.cache import resolve_store_role
 from django.core.exceptions import ObjectDoesNotExist
 from store.models import Store
+from config.replicas import ReplicaReadMixin
 
 
 class CashboxDetailView(APIView):
@@ -23,27 +24,22 @@ class CashboxDetailView(APIView):
         except Cashbox.DoesNotExist:
             raise NotFound("Ushbu do‘kon uchun kassa mavjud emas.")
 
-        if cashbox.store.owner == user.platform_profile:
-            serializer = CashboxSerializer(cashbox)
-            return Response(serializer.data)
-
-        if not hasattr(user, 'platform_profile'):
+        platform_user = getattr(user, 'platform_profile', None)
+        if platform_user is None:
             raise PermissionDenied("Siz bu kassani ko‘rish huquqiga ega emassiz.")
 
-        platform_user = user.platform_profile
-
-        is_staff = StoreStaff.objects.filter(
-            user=platform_user, store_id=store_id, is_active=True
-        ).exists()
+        if cashbox.store.owner_id == platform_user.pk:
+            serializer = CashboxSerializer(cashbox)
+            return Response(serializer.data)
 
-        if not is_staff:
+        if resolve_store_role(request, platform_user, store_id)['role'] is None:
             raise PermissionDenied("Siz bu kassani ko‘rish huquqiga ega emassiz.")
 
         serializer = CashboxSerializer(cashbox)
         return Response(serializer.data)
 
 
-class CashTransactionListView(APIView):
+class CashTransactionListView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, store_id):
@@ -62,20 +58,19 @@ class CashTransactionListView(APIView):
         platform_user = user.platform_profile
         allowed_roles = ["manager", "cashier", ]
 
-        if platform_user.chief :
-            try:
-                staff = StoreStaff.objects.get(user=platform_user, store_id=store_id, is_active=True)
-                if staff.role not in allowed_roles:
-                    raise PermissionDenied("Sizga bu amaliyotni bajarishga ruxsat yo‘q.")
-            except StoreStaff.DoesNotExist:
+        if platform_user.chief_id:
+            role = resolve_store_role(request, platform_user, store_id)['role']
+            if role is None:
                 raise PermissionDenied("Siz ushbu do‘konda xodim emassiz.")
+            if role not in allowed_roles:
+                raise PermissionDenied("Sizga bu amaliyotni bajarishga ruxsat yo‘q.")
 
         return self.paginated_response(store_id, request)
 
     def get_transactions(self, store_id):
         return CashTransaction.objects.select_related(
             'cashbox', 'order', 'cashbox__store'
-        ).filter(cashbox__store_id=store_id)
+        ).filter(store_id=store_id)
 
     def paginated_response(self, store_id, request):
         transactions = self.get_transactions(store_id)
@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class ConfigConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'config'
+    verbose_name = "Loyiha sozlamalari"
+
+    def ready(self):
+        from .db import QueryMetricsWrapper, SlowQueryWrapper, install_execute_wrapper
+
+        def on_connection_created(sender, connection, **kwargs):
+            install_execute_wrapper(connection, SlowQueryWrapper())
+            install_execute_wrapper(connection, QueryMetricsWrapper())
+
+        connection_created.connect(on_connection_created, weak=False, dispatch_uid="config.slow_query")
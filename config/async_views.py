@@ -0,0 +1,64 @@
+"""
+DRF uchun async view'lar (DRF o‘zi faqat sync dispatch qiladi).
+
+Handler `async def` bo‘lsa, dispatch coroutine qaytaradi: autentifikatsiya,
+ruxsatlar va throttle (initial) sync_to_async'da, handler esa event loop'da ishlaydi.
+Handler ichida async ORM (`aaggregate`, `async for`) ishlatiladi — so‘rovlar shu
+so‘rovning bitta sync oqimida (ASGI ThreadSensitiveContext) navbat bilan bajariladi,
+qo‘shimcha oqim va pool ulanishi olinmaydi. Middleware zanjiri ham async bo‘lishi
+kerak (config.middleware), aks holda so‘rov butun davomida oqimni band qiladi.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncViewMixin:
+    """
+    APIView/ViewSet uchun. ViewSet'da route async bo‘ladi, agar unga tegishli
+    barcha action'lar `async def` bo‘lsa (masalan, faqat `unread_count`).
+    """
+    async_route = False
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        if actions is None:
+            # APIView: Django View.as_view() handler'lar async bo‘lsa o‘zi belgilaydi
+            return super().as_view(**initkwargs)
+        is_async = all(iscoroutinefunction(getattr(cls, name)) for name in actions.values())
+        view = super().as_view(actions, **initkwargs, async_route=is_async)
+        return markcoroutinefunction(view) if is_async else view
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.async_route or self.view_is_async:
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        # APIView.dispatch'ning async nusxasi
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncAPIView(AsyncViewMixin, APIView):
+    pass
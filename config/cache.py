@@ -0,0 +1,27 @@
+from django.core.cache.backends.redis import RedisCache
+
+from . import metrics
+
+_MISSING = object()
+
+
+class InstrumentedRedisCache(RedisCache):
+    """RedisCache + joriy so‘rov uchun cache hit/miss hisoblagichlari."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        self._count(hits=int(value is not _MISSING), misses=int(value is _MISSING))
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version)
+        self._count(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+    @staticmethod
+    def _count(hits, misses):
+        request_metrics = metrics.current()
+        if request_metrics is not None:
+            request_metrics.cache_hits += hits
+            request_metrics.cache_misses += misses
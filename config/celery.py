@@ -1,8 +1,16 @@
 import os
 from celery import Celery
+from celery.signals import worker_process_init
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 app = Celery('config')
 app.config_from_object('django.conf:settings', namespace='CELERY')
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+
+@worker_process_init.connect
+def _reset_db_pools(**kwargs):
+    # prefork: ota jarayondan meros qolgan DB pool'lari ishlatilmaydi
+    from config.pool import discard_inherited_pools
+    discard_inherited_pools()
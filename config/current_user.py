@@ -0,0 +1,36 @@
+"""
+So‘rovning joriy foydalanuvchisi (model hook'lari uchun: kurs, egasi).
+
+django_currentuser'ning threading.local o‘rniga asgiref Local: async so‘rovda
+qiymat event loop'da o‘rnatiladi va sync_to_async oqimlarida ham ko‘rinadi.
+CurrentUserMiddleware (config.middleware) o‘rnatadi.
+"""
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.contrib.auth.models import AnonymousUser
+
+_local = Local()
+
+
+@contextmanager
+def current_user_scope(request):
+    # request.user dangasa: DRF autentifikatsiyasidan keyin o‘qilganda o‘sha foydalanuvchi
+    previous = getattr(_local, "user", None)
+    _local.user = lambda: getattr(request, "user", None)
+    try:
+        yield
+    finally:
+        _local.user = previous
+
+
+def get_current_user():
+    user = getattr(_local, "user", None)
+    return user() if callable(user) else user
+
+
+def get_current_authenticated_user():
+    user = get_current_user()
+    if user is None or isinstance(user, AnonymousUser):
+        return None
+    return user
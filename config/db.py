@@ -0,0 +1,84 @@
+import hashlib
+import logging
+import re
+import time
+
+from django.conf import settings
+
+from . import metrics
+
+slow_query_logger = logging.getLogger("db.slow")
+
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*%s\s*,?)+\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"VALUES\s*(\((?:[^()]|%s)*\)\s*,?\s*)+", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """Parametr/literallarni '?' bilan almashtiradi — bir xil shakldagi so‘rovlar bitta ko‘rinishga keladi."""
+    sql = _IN_LIST.sub("IN (?)", sql)
+    sql = _VALUES_LIST.sub("VALUES (?) ", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    return _SPACES.sub(" ", sql).strip()
+
+
+def _fingerprint(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def sql_fingerprint(sql):
+    return _fingerprint(normalize_sql(sql))
+
+
+class SlowQueryWrapper:
+    """
+    connection.execute_wrappers uchun: faqat SLOW_QUERY_THRESHOLD_MS dan uzun
+    so‘rovlarni (normallashtirilgan SQL va fingerprint bilan) yozadi.
+    """
+
+    def __init__(self, threshold_ms=None):
+        self.threshold_ms = threshold_ms if threshold_ms is not None else settings.SLOW_QUERY_THRESHOLD_MS
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= self.threshold_ms:
+                normalized = normalize_sql(sql)
+                slow_query_logger.warning(
+                    "slow query %.1fms", duration_ms,
+                    extra={
+                        "duration_ms": round(duration_ms, 2),
+                        "fingerprint": _fingerprint(normalized),
+                        "sql": normalized,
+                        "many": many,
+                        "alias": context["connection"].alias,
+                    },
+                )
+
+
+class QueryMetricsWrapper:
+    """Joriy so‘rovning SQL soni va vaqtini config.metrics'ga yozadi."""
+
+    def __call__(self, execute, sql, params, many, context):
+        request_metrics = metrics.current()
+        if request_metrics is None:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            request_metrics.queries += 1
+            request_metrics.query_time += time.perf_counter() - started
+
+
+def install_execute_wrapper(connection, wrapper):
+    """Wrapper'ni ulanishga bir marta qo‘shadi (connection_created signalidan chaqiriladi)."""
+    if not any(isinstance(w, type(wrapper)) for w in connection.execute_wrappers):
+        connection.execute_wrappers.append(wrapper)
@@ -0,0 +1,97 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from queue import SimpleQueue
+
+# LogRecord'ning standart atributlari — qolganlari "extra" sifatida JSON'ga qo‘shiladi
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Bir qator = bitta JSON yozuv (ts, level, logger, message + extra maydonlar)."""
+
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Oddiy trafikdan (level < WARNING) faqat `rate` ulushini o‘tkazadi,
+    WARNING va undan yuqorisi har doim yoziladi.
+    """
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = float(rate)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class QueuedFileHandler(QueueHandler):
+    """
+    So‘rov oqimida faqat navbatga qo‘yadi; faylga yozish (rotatsiya bilan)
+    fon oqimidagi QueueListener'da bajariladi.
+    `when` berilsa vaqt bo‘yicha, aks holda hajm bo‘yicha rotatsiya.
+    """
+
+    def __init__(self, filename, max_bytes=50 * 1024 * 1024, backup_count=10, when=None):
+        super().__init__(SimpleQueue())
+        if when:
+            self.target = TimedRotatingFileHandler(
+                filename, when=when, backupCount=backup_count, encoding="utf-8", delay=True
+            )
+        else:
+            self.target = RotatingFileHandler(
+                filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True
+            )
+        self._pid = None
+        self.listener = None
+        self._start_listener()
+        atexit.register(self._stop_listener)
+
+    def _start_listener(self):
+        self._pid = os.getpid()
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def _stop_listener(self):
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Formatlash fon oqimida (target handler) bajariladi — bu yerda faqat xabar muzlatiladi
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record):
+        # Celery prefork kabi fork'dan keyin listener oqimi bola jarayonda yo‘q bo‘ladi
+        if self._pid != os.getpid():
+            self.queue = SimpleQueue()
+            self._start_listener()
+        super().emit(record)
@@ -0,0 +1,194 @@
+import json
+import statistics
+import subprocess
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from loan.models import DebtUser
+from product.models import Product
+from store.models import Store
+from systems.models import StockTransfer
+
+ANALYTICS_ENDPOINTS = ["sales", "expenses", "cashbox", "debt", "products", "refunds", "overview"]
+
+
+class Rollback(Exception):
+    pass
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _git_version():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Asosiy yo‘llar benchmarki (checkout, qidiruv, stock transfer, qarz hujjati, analytics). "
+        "Natija JSON ko‘rinishida — versiyalar orasida solishtirish uchun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store", type=int, help="Store ID (default: eng ko‘p mahsulotli do‘kon)")
+        parser.add_argument("-n", "--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--only", nargs="*", help="Faqat shu nomdagi benchmarklar")
+        parser.add_argument("--output", help="JSON natijani faylga yozish (default: stdout)")
+
+    def handle(self, *args, **opts):
+        store = self._pick_store(opts["store"])
+        self.store = store
+        self.client = APIClient()
+        self.client.force_authenticate(user=store.owner.user)
+        self.products = list(
+            Product.objects.filter(store=store, is_deleted=False, count__gt=10).order_by("id")[:200]
+        )
+        if not self.products:
+            raise CommandError("Do‘konda mahsulot yo‘q — avval `manage.py seed_data` ni ishga tushiring.")
+        self.debtor = DebtUser.objects.filter(store=store).order_by("id").first()
+
+        cases = [
+            ("checkout", self._checkout),
+            ("product_search", self._search),
+            ("stock_transfer", self._stock_transfer),
+        ]
+        if self.debtor:
+            cases.append(("debt_document_create", self._debt_document))
+        cases += [(f"analytics_{name}", self._analytics(name)) for name in ANALYTICS_ENDPOINTS]
+        if opts["only"]:
+            cases = [case for case in cases if case[0] in opts["only"]]
+
+        results = [self._run(name, fn, opts["iterations"], opts["warmup"]) for name, fn in cases]
+        report = {
+            "version": _git_version(),
+            "timestamp": timezone.now().isoformat(),
+            "store_id": store.pk,
+            "iterations": opts["iterations"],
+            "results": results,
+        }
+
+        payload = json.dumps(report, indent=2)
+        if opts["output"]:
+            with open(opts["output"], "w") as fh:
+                fh.write(payload)
+            self.stderr.write(f"Natija {opts['output']} ga yozildi")
+        else:
+            self.stdout.write(payload)
+
+    def _pick_store(self, store_id):
+        qs = Store.objects.select_related("owner__user")
+        if store_id:
+            store = qs.filter(pk=store_id).first()
+        else:
+            store = qs.order_by("-id").first()
+        if store is None:
+            raise CommandError("Do‘kon topilmadi.")
+        return store
+
+    def _run(self, name, fn, iterations, warmup):
+        for i in range(warmup):
+            self._call(fn, i)
+
+        timings, queries = [], []
+        for i in range(iterations):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                self._call(fn, warmup + i)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(ctx.captured_queries))
+
+        return {
+            "name": name,
+            "n": iterations,
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(_percentile(timings, 95), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "max_ms": round(max(timings), 3),
+            "queries_mean": round(statistics.fmean(queries), 2),
+        }
+
+    def _call(self, fn, i):
+        # Yozuvchi benchmarklar ma'lumotni o‘zgartirmasligi uchun har safar rollback
+        try:
+            with transaction.atomic():
+                response = fn(i)
+                raise Rollback(response)
+        except Rollback as exc:
+            response = exc.args[0]
+        status = getattr(response, "status_code", 200)
+        if status >= 400:
+            raise CommandError(f"{fn.__name__}: HTTP {status} — {getattr(response, 'data', '')}")
+
+    # --- benchmark holatlari ---
+
+    def _product(self, i):
+        return self.products[i % len(self.products)]
+
+    def _checkout(self, i):
+        items = [self._product(i + k) for k in range(3)]
+        total = sum(p.out_price for p in items)
+        return self.client.post(
+            f"/platform/{self.store.pk}/orders/orders/",
+            {
+                "phone_number": "+998900000000",
+                "first_name": "Bench",
+                "currency": "USD",
+                "payment_type": "cash",
+                "paid_amount": str(total),
+                "items": [
+                    {"product_id": p.pk, "quantity": 1, "price": str(p.out_price), "currency": "USD"}
+                    for p in items
+                ],
+            },
+            format="json",
+        )
+
+    def _search(self, i):
+        term = self._product(i).name.split()[0]
+        return self.client.get(f"/platform/{self.store.pk}/search/product/", {"q": term})
+
+    def _stock_transfer(self, i):
+        # StockTransferSerializer depth=1 — product'ni qabul qilmaydi, shuning uchun model yo‘li
+        product = self._product(i)
+        if product.warehouse_count:
+            StockTransfer.objects.create(product=product, quantity=1, note="bench")
+
+    def _debt_document(self, i):
+        product = self._product(i)
+        return self.client.post(
+            f"/platform/{self.store.pk}/debt/debtors/{self.debtor.pk}/documents/",
+            {
+                "store": self.store.pk,
+                "debtuser": self.debtor.pk,
+                "method": "transfer",
+                "currency": "USD",
+                "cash_amount": "10.00",
+                "products": [{
+                    "product": product.pk, "quantity": 1,
+                    "price": str(product.out_price.quantize(Decimal("0.01"))), "currency": "USD",
+                }],
+            },
+            format="json",
+        )
+
+    def _analytics(self, name):
+        def fn(i):
+            return self.client.get(f"/platform/{self.store.pk}/analytics/{name}/")
+        fn.__name__ = f"analytics_{name}"
+        return fn
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from config.partitions import (
+    PARTITIONED_TABLES, detach_expired_partitions, ensure_partitions, list_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = "Oylik partitsiyalar: ro‘yxat, keyingi oylarni yaratish, eskilarini ajratish."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ensure", action="store_true", help="Keyingi oylar uchun partitsiyalar yaratish")
+        parser.add_argument("--months-ahead", type=int)
+        parser.add_argument("--detach", action="store_true", help="Retention'dan eski partitsiyalarni ajratish")
+
+    def handle(self, *args, **opts):
+        if opts["ensure"]:
+            for name in ensure_partitions(months_ahead=opts["months_ahead"]):
+                self.stdout.write(f"+ {name}")
+        if opts["detach"]:
+            for name in detach_expired_partitions():
+                self.stdout.write(f"- {name}")
+
+        with connection.cursor() as cursor:
+            for table in PARTITIONED_TABLES:
+                self.stdout.write(self.style.MIGRATE_HEADING(table))
+                for name, upper in list_partitions(cursor, table):
+                    self.stdout.write(f"  {name:<48} < {upper or 'DEFAULT'}")
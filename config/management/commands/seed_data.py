@@ -0,0 +1,338 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from cashbox.models import Cashbox, CashTransaction
+from category.models import Category
+from expense.models import EXPENSE_REASONS, Expense
+from loan.models import DebtDocument, DebtUser, DocumentProduct
+from order.models import Order, ProductOrder
+from platform_user.models import PlatformUser, RateUsd
+from product.models import COUNT_TYPE_CHOICES, CatalogCursor, Product, StockEntry
+from refund.models import Refund
+from store.models import Store
+from store_user.models import StoreUser
+from systems.models import ProductSale
+
+User = get_user_model()
+
+Q6 = Decimal("0.000001")
+Q2 = Decimal("0.01")
+RATE = Decimal("12700")
+
+
+@contextmanager
+def backdated(*models_fields):
+    """
+    auto_now_add'ni vaqtincha o‘chiradi — bulk_create berilgan sanani saqlashi uchun.
+    models_fields: (Model, "field_name") juftliklari.
+    """
+    fields = [model._meta.get_field(name) for model, name in models_fields]
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in saved:
+            field.auto_now_add = value
+
+
+class Command(BaseCommand):
+    help = (
+        "Sintetik ma'lumot generatori: do‘konlar, partiyali mahsulotlar, oylar davomidagi "
+        "buyurtmalar, qarzlar, refundlar, xarajatlar va kassa yozuvlari (bulk insert)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stores", type=int, default=3)
+        parser.add_argument("--products", type=int, default=300, help="Har bir do‘kon uchun")
+        parser.add_argument("--lots", type=int, default=3, help="Har bir mahsulot uchun partiyalar")
+        parser.add_argument("--months", type=int, default=6)
+        parser.add_argument("--orders-per-day", type=int, default=40)
+        parser.add_argument("--items-per-order", type=int, default=3)
+        parser.add_argument("--customers", type=int, default=500, help="Har bir do‘kon uchun")
+        parser.add_argument("--debtors", type=int, default=100, help="Har bir do‘kon uchun")
+        parser.add_argument("--debt-docs", type=int, default=600, help="Har bir do‘kon uchun")
+        parser.add_argument("--refund-ratio", type=float, default=0.02)
+        parser.add_argument("--expenses-per-month", type=int, default=30)
+        parser.add_argument("--batch", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **opts):
+        self.rnd = random.Random(opts["seed"])
+        self.batch = opts["batch"]
+        self.opts = opts
+        self.now = timezone.now()
+        self.since = self.now - timedelta(days=30 * opts["months"])
+        self.tag = get_random_string(6, "abcdefghijklmnopqrstuvwxyz0123456789")
+
+        chief_user, chief = self._create_chief()
+        for index in range(opts["stores"]):
+            with transaction.atomic():
+                store = self._create_store(chief, index)
+                products = self._create_products(store, chief)
+                customers = self._create_customers(store)
+                self._create_orders(store, chief, products, customers)
+                debtors = self._create_debts(store, chief_user, products)
+                self._create_expenses(store, chief)
+                self._finalize(store, debtors)
+            self.stdout.write(f"store #{store.pk} tayyor")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Tayyor: chief username={chief_user.username} (parol: seed-password)"
+        ))
+
+    # --- helpers ---
+
+    def _when(self):
+        return self.since + timedelta(seconds=self.rnd.randrange(int((self.now - self.since).total_seconds())))
+
+    def _bulk(self, model, objs):
+        return model.objects.bulk_create(objs, batch_size=self.batch)
+
+    def _create_chief(self):
+        user = User.objects.create_user(
+            username=f"seed_chief_{self.tag}",
+            password="seed-password",
+            phone_number=f"+99877{self.rnd.randrange(10 ** 7):07d}",
+        )
+        chief = PlatformUser.objects.create(user=user, is_verified=True)
+        RateUsd.objects.update_or_create(user=chief, defaults={"rate": RATE})
+        return user, chief
+
+    def _create_store(self, chief, index):
+        store = Store.objects.create(name=f"Seed do‘kon {self.tag}-{index}", owner=chief)
+        Cashbox.objects.get_or_create(store=store)
+        return store
+
+    def _create_products(self, store, chief):
+        categories = self._bulk(Category, [
+            Category(name=f"Kategoriya {i}", slug=f"seed-{self.tag}-{store.pk}-{i}", user=chief)
+            for i in range(10)
+        ])
+
+        products = []
+        for i in range(self.opts["products"]):
+            out_price = Decimal(self.rnd.randrange(100, 50000)) / 100
+            product = Product(
+                name=f"Mahsulot {i} {get_random_string(5)}",
+                description=f"Sintetik mahsulot #{i}",
+                store=store,
+                out_price=out_price,
+                currency="USD",
+                exchange_rate=RATE,
+                count_type=self.rnd.choice(COUNT_TYPE_CHOICES)[0],
+                category=self.rnd.choice(categories),
+            )
+            product.generate_sku()
+            product.generate_barcode()
+            product.catalog_version = len(products) + 1
+            products.append(product)
+        self._bulk(Product, products)
+        CatalogCursor.objects.create(store=store, version=len(products))
+
+        lots = []
+        for product in products:
+            for _ in range(self.opts["lots"]):
+                lots.append(StockEntry(
+                    product=product, store=store,
+                    quantity=self.rnd.randrange(20, 400),
+                    unit_price=(product.out_price * Decimal(self.rnd.uniform(0.55, 0.9))).quantize(Q6),
+                    currency="USD",
+                    exchange_rate=RATE,
+                    is_warehouse=self.rnd.random() < 0.4,
+                    created_at=self._when(),
+                ))
+        with backdated((StockEntry, "created_at")):
+            self._bulk(StockEntry, lots)
+
+        # Product.recalculate_average_cost() natijasini Python'da hisoblaymiz
+        totals = {}
+        for lot in lots:
+            shelf, warehouse, cost = totals.get(lot.product_id, (0, 0, Decimal("0")))
+            if lot.is_warehouse:
+                warehouse += lot.quantity
+            else:
+                shelf += lot.quantity
+            totals[lot.product_id] = (shelf, warehouse, cost + lot.unit_price * lot.quantity)
+        for product in products:
+            shelf, warehouse, cost = totals.get(product.pk, (0, 0, Decimal("0")))
+            product.count = shelf
+            product.warehouse_count = warehouse
+            qty = shelf + warehouse
+            product.enter_price = (cost / qty).quantize(Q6, ROUND_HALF_UP) if qty else Decimal("0")
+        Product.objects.bulk_update(products, ["count", "warehouse_count", "enter_price"], batch_size=self.batch)
+        return products
+
+    def _create_customers(self, store):
+        return self._bulk(StoreUser, [
+            StoreUser(
+                phone_number=f"+9{store.pk:06d}{i:06d}",
+                first_name=f"Mijoz{i}",
+                last_name="Seed",
+            )
+            for i in range(self.opts["customers"])
+        ])
+
+    def _create_orders(self, store, chief, products, customers):
+        days = (self.now - self.since).days
+        per_day = self.opts["orders_per_day"]
+        for day in range(days):
+            day_start = self.since + timedelta(days=day)
+            orders, lines = [], []
+            for _ in range(self.rnd.randint(per_day // 2, per_day * 3 // 2)):
+                customer = self.rnd.choice(customers)
+                created = day_start + timedelta(seconds=self.rnd.randrange(86400))
+                items = []
+                for product in self.rnd.sample(products, min(len(products), self.rnd.randint(1, self.opts["items_per_order"]))):
+                    items.append((product, self.rnd.randint(1, 3)))
+                total = sum(p.out_price * q for p, q in items)
+                profit = sum((p.out_price - p.enter_price) * q for p, q in items)
+                orders.append(Order(
+                    store=store, owner=chief, customer=customer,
+                    phone_number=customer.phone_number[:15],
+                    first_name=customer.first_name or "", last_name=customer.last_name or "",
+                    exchange_rate=RATE, currency="USD",
+                    payment_type=self.rnd.choice(["cash", "card"]),
+                    total_price=total.quantize(Q6), total_profit=profit.quantize(Q6),
+                    paid_amount=total.quantize(Q6), change_given=False, change_amount=Decimal("0"),
+                    created_at=created,
+                ))
+                lines.append(items)
+
+            with backdated((Order, "created_at")):
+                self._bulk(Order, orders)
+
+            order_items, sales, txs = [], [], []
+            for order, items in zip(orders, lines):
+                for product, qty in items:
+                    order_items.append(ProductOrder(
+                        order=order, product=product, quantity=qty, created_at=order.created_at,
+                        price=product.out_price, currency="USD", exchange_rate=RATE,
+                    ))
+                    sales.append(ProductSale(
+                        order=order, store=store, product=product, quantity=qty,
+                        unit_price=product.out_price, total_price=product.out_price * qty,
+                        profit=((product.out_price - product.enter_price) * qty).quantize(Q6),
+                        currency="USD", exchange_rate=RATE, created_at=order.created_at,
+                    ))
+                txs.append(CashTransaction(
+                    cashbox=store.cashbox, store=store, amount=order.paid_amount, is_out=False,
+                    note=f"Buyurtma #{order.pk} uchun to‘lov", exchange_rate=RATE,
+                    order=order, created_at=order.created_at,
+                ))
+            self._bulk(ProductOrder, order_items)
+            with backdated((ProductSale, "created_at"), (CashTransaction, "created_at")):
+                self._bulk(ProductSale, sales)
+                self._bulk(CashTransaction, txs)
+
+            refunds = [
+                Refund(
+                    product_order=item, store=store, reason_type=self.rnd.choice(["DISLIKED", "OTHER"]),
+                    custom_reason="Mijoz fikrini o‘zgartirdi", quantity=1,
+                    created_at=item.order.created_at + timedelta(hours=self.rnd.randint(1, 48)),
+                )
+                for item in order_items if self.rnd.random() < self.opts["refund_ratio"]
+            ]
+            with backdated((Refund, "created_at")):
+                self._bulk(Refund, refunds)
+
+    def _create_debts(self, store, owner_user, products):
+        debtors = self._bulk(DebtUser, [
+            DebtUser(
+                store=store, phone_number=f"+9{store.pk:06d}{i:06d}"[:15],
+                first_name=f"Qarzdor{i}", last_name="Seed",
+                currency="USD", exchange_rate=RATE,
+            )
+            for i in range(self.opts["debtors"])
+        ])
+
+        docs, lines = [], []
+        for _ in range(self.opts["debt_docs"]):
+            debtor = self.rnd.choice(debtors)
+            method = "transfer" if self.rnd.random() < 0.6 else "accept"
+            cash = Decimal(self.rnd.randrange(1000, 200000)) / 100
+            items = []
+            if method == "transfer" and self.rnd.random() < 0.3:
+                product = self.rnd.choice(products)
+                items.append((product, self.rnd.randint(1, 5)))
+            product_amount = sum((p.out_price.quantize(Q2) * q for p, q in items), Decimal("0"))
+            docs.append(DebtDocument(
+                debtuser=debtor, store=store, owner=owner_user,
+                phone_number=debtor.phone_number, first_name=debtor.first_name, last_name=debtor.last_name,
+                method=method, currency="USD", exchange_rate=RATE,
+                cash_amount=cash, product_amount=product_amount, total_amount=cash + product_amount,
+                date=self._when(),
+            ))
+            lines.append(items)
+        self._bulk(DebtDocument, docs)
+
+        doc_products, txs = [], []
+        for doc, items in zip(docs, lines):
+            for product, qty in items:
+                price = product.out_price.quantize(Q2)
+                doc_products.append(DocumentProduct(
+                    document=doc, product=product, quantity=qty, price=price,
+                    amount=price * qty, currency="USD", exchange_rate=RATE,
+                ))
+            txs.append(CashTransaction(
+                cashbox=store.cashbox, store=store, amount=doc.cash_amount, is_out=doc.method == "transfer",
+                note=f"Debt {doc.method} #{doc.pk} - {doc.phone_number}", exchange_rate=RATE,
+                debt_document=doc, created_at=doc.date,
+            ))
+        self._bulk(DocumentProduct, doc_products)
+        with backdated((CashTransaction, "created_at")):
+            self._bulk(CashTransaction, txs)
+        return debtors
+
+    def _create_expenses(self, store, chief):
+        expenses = []
+        for _ in range(self.opts["expenses_per_month"] * self.opts["months"]):
+            reason = self.rnd.choice(EXPENSE_REASONS)[0]
+            expenses.append(Expense(
+                store=store, user=chief, reason=reason,
+                custom_reason="Sintetik xarajat" if reason == "OTHER" else "",
+                amount=(Decimal(self.rnd.randrange(500, 50000)) / 100).quantize(Q6),
+                currency="USD", exchange_rate=RATE, note="seed", date=self._when(),
+            ))
+        with backdated((Expense, "date")):
+            self._bulk(Expense, expenses)
+
+        txs = [
+            CashTransaction(
+                cashbox=store.cashbox, store=store, amount=e.amount, is_out=True, note=e.get_full_reason(),
+                exchange_rate=RATE, expense=e, created_at=e.date,
+            )
+            for e in expenses
+        ]
+        with backdated((CashTransaction, "created_at")):
+            self._bulk(CashTransaction, txs)
+        for expense, tx in zip(expenses, txs):
+            expense.cash_transaction = tx
+        Expense.objects.bulk_update(expenses, ["cash_transaction"], batch_size=self.batch)
+
+    def _finalize(self, store, debtors):
+        store.cashbox.refresh_balance()
+        # DebtUser.recalculate_balance() bilan bir xil natija, lekin bitta so‘rov + bulk_update
+        sums = {}
+        for debtuser_id, method, total in DebtDocument.objects.filter(
+            store=store, is_deleted=False
+        ).values_list("debtuser_id", "method", "total_amount"):
+            transferred, accepted = sums.get(debtuser_id, (Decimal("0"), Decimal("0")))
+            if method == "transfer":
+                transferred += total
+            else:
+                accepted += total
+            sums[debtuser_id] = (transferred, accepted)
+        for debtor in debtors:
+            debtor.transferred, debtor.accepted = sums.get(debtor.pk, (Decimal("0"), Decimal("0")))
+            debtor.balance = debtor.transferred - debtor.accepted
+        DebtUser.objects.bulk_update(debtors, ["transferred", "accepted", "balance"], batch_size=self.batch)
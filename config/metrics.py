@@ -0,0 +1,132 @@
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+# Sekundlarda (Prometheus an'anasi)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class RequestMetrics:
+    """Bitta so‘rov davomida yig‘iladigan hisoblagichlar (DB wrapper va cache shu yerga yozadi)."""
+    queries: int = 0
+    query_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+_current = ContextVar("request_metrics", default=None)
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+@dataclass
+class RouteStats:
+    count: int = 0
+    duration_sum: float = 0.0
+    buckets: list = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    statuses: dict = field(default_factory=dict)
+    queries: int = 0
+    query_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    response_bytes: int = 0
+
+
+class MetricsRegistry:
+    """Jarayon ichidagi agregatsiya: (method, route) bo‘yicha statistikalar."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._gauges = {}
+
+    def observe(self, method, route, status, duration, metrics, response_bytes):
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = RouteStats()
+            stats.count += 1
+            stats.duration_sum += duration
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    stats.buckets[i] += 1
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.queries += metrics.queries
+            stats.query_time += metrics.query_time
+            stats.cache_hits += metrics.cache_hits
+            stats.cache_misses += metrics.cache_misses
+            stats.response_bytes += response_bytes
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: RouteStats(
+                    count=s.count, duration_sum=s.duration_sum, buckets=list(s.buckets),
+                    statuses=dict(s.statuses), queries=s.queries, query_time=s.query_time,
+                    cache_hits=s.cache_hits, cache_misses=s.cache_misses, response_bytes=s.response_bytes,
+                )
+                for key, s in self._routes.items()
+            }
+
+    def set_gauge(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._gauges.clear()
+
+    def render_prometheus(self):
+        lines = [
+            "# TYPE http_request_duration_seconds histogram",
+            "# TYPE http_requests_total counter",
+            "# TYPE http_request_db_queries_total counter",
+            "# TYPE http_request_db_time_seconds_total counter",
+            "# TYPE http_request_cache_hits_total counter",
+            "# TYPE http_request_cache_misses_total counter",
+            "# TYPE http_response_size_bytes_total counter",
+        ]
+        for (method, route), s in sorted(self.snapshot().items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            for bound, value in zip(LATENCY_BUCKETS, s.buckets):
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {value}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {s.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {s.duration_sum:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {s.count}")
+            for status, value in sorted(s.statuses.items()):
+                lines.append(f'http_requests_total{{{labels},status="{status}"}} {value}')
+            lines.append(f"http_request_db_queries_total{{{labels}}} {s.queries}")
+            lines.append(f"http_request_db_time_seconds_total{{{labels}}} {s.query_time:.6f}")
+            lines.append(f"http_request_cache_hits_total{{{labels}}} {s.cache_hits}")
+            lines.append(f"http_request_cache_misses_total{{{labels}}} {s.cache_misses}")
+            lines.append(f"http_response_size_bytes_total{{{labels}}} {s.response_bytes}")
+
+        with self._lock:
+            gauges = sorted(self._gauges.items())
+        for name in sorted({name for (name, _), _ in gauges}):
+            lines.append(f"# TYPE {name} gauge")
+        for (name, labels), value in gauges:
+            rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels)
+            lines.append(f"{name}{{{rendered}}} {value}" if rendered else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+registry = MetricsRegistry()
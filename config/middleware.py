@@ -0,0 +1,175 @@
+import cProfile
+import hmac
+import io
+import pstats
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from auditlog.cid import set_cid
+from auditlog.context import set_actor
+from auditlog.middleware import AuditlogMiddleware as BaseAuditlogMiddleware
+from django.conf import settings
+from django.http import HttpResponse
+
+from . import metrics
+from .current_user import current_user_scope
+
+PROFILE_HEADER = "X-Profile"
+
+
+class AsyncCapableMiddleware:
+    """
+    Sync va async zanjirda ishlaydi: ASGI ostida `__acall__` — so‘rov butun davomida
+    oqimni band qilmaydi (bitta sync middleware butun zanjirni sync qilib qo‘yadi).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class CurrentUserMiddleware(AsyncCapableMiddleware):
+    """django_currentuser.ThreadLocalUserMiddleware o‘rniga (config.current_user)."""
+
+    def handle(self, request):
+        with current_user_scope(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with current_user_scope(request):
+            return await self.get_response(request)
+
+
+class AuditlogMiddleware(AsyncCapableMiddleware, BaseAuditlogMiddleware):
+    """auditlog.middleware.AuditlogMiddleware + async yo‘l (set_actor ContextVar'da)."""
+
+    def __init__(self, get_response):
+        BaseAuditlogMiddleware.__init__(self, get_response)
+        AsyncCapableMiddleware.__init__(self, get_response)
+
+    def handle(self, request):
+        return BaseAuditlogMiddleware.__call__(self, request)
+
+    async def __acall__(self, request):
+        user = await request.auser() if hasattr(request, "auser") else None
+        set_cid(request)
+        with set_actor(
+            actor=user if user is not None and user.is_authenticated else None,
+            remote_addr=self._get_remote_addr(request),
+            remote_port=self._get_remote_port(request),
+        ):
+            return await self.get_response(request)
+
+
+class PerformanceMiddleware(AsyncCapableMiddleware):
+    """
+    Har bir so‘rov uchun: davomiylik, SQL soni/vaqti, cache hit/miss va javob hajmi
+    route (URL pattern) bo‘yicha config.metrics.registry'ga yig‘iladi.
+    `X-Profile: 1` sarlavhasi bilan kelgan staff foydalanuvchiga javob o‘rniga cProfile natijasi qaytadi.
+    Ruxsat profiler ishga tushishidan oldin tekshiriladi (X-Metrics-Token yoki staff JWT) —
+    boshqalar uchun sarlavha e'tiborsiz qoldiriladi.
+    """
+
+    def handle(self, request):
+        request_metrics, token = metrics.start_request()
+        profiler = cProfile.Profile() if self._can_profile(request) else None
+        started = time.perf_counter()
+        try:
+            if profiler is not None:
+                response = profiler.runcall(self.get_response, request)
+            else:
+                response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self._finish(request, response, started, request_metrics, profiler)
+
+    async def __acall__(self, request):
+        request_metrics, token = metrics.start_request()
+        # ruxsat JWT/user cache'ni o‘qiydi — faqat sarlavha bo‘lsa, sync oqimda
+        can_profile = request.headers.get(PROFILE_HEADER) and await sync_to_async(self._can_profile)(request)
+        profiler = cProfile.Profile() if can_profile else None
+        started = time.perf_counter()
+        try:
+            if profiler is not None:
+                # event loop oqimi profillanadi (sync_to_async ichidagi ORM alohida oqimda)
+                profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+        finally:
+            metrics.end_request(token)
+        return self._finish(request, response, started, request_metrics, profiler)
+
+    def _finish(self, request, response, started, request_metrics, profiler):
+        duration = time.perf_counter() - started
+        metrics.registry.observe(
+            request.method,
+            self._route(request),
+            response.status_code,
+            duration,
+            request_metrics,
+            self._response_size(response),
+        )
+
+        if profiler is not None:
+            return self._profile_response(profiler, response, duration, request_metrics)
+        return response
+
+    @staticmethod
+    def _route(request):
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "unmatched"
+        return match.route or match.view_name or "unknown"
+
+    @staticmethod
+    def _response_size(response):
+        if response.streaming:
+            return 0
+        return len(response.content)
+
+    @staticmethod
+    def _can_profile(request):
+        if not request.headers.get(PROFILE_HEADER):
+            return False
+        token = settings.METRICS_TOKEN
+        if token and hmac.compare_digest(request.headers.get("X-Metrics-Token", ""), token):
+            return True
+        # Middleware'lardan oldin ishlaydi — foydalanuvchi Bearer JWT'dan (user cache orqali) olinadi
+        from rest_framework.exceptions import APIException
+        from accounts.authentication import CachedJWTAuthentication
+
+        try:
+            authenticated = CachedJWTAuthentication().authenticate(request)
+        except APIException:
+            return False
+        return bool(authenticated and authenticated[0].is_staff)
+
+    @staticmethod
+    def _profile_response(profiler, response, duration, request_metrics):
+        out = io.StringIO()
+        out.write(
+            f"status={response.status_code} duration={duration * 1000:.1f}ms "
+            f"queries={request_metrics.queries} query_time={request_metrics.query_time * 1000:.1f}ms "
+            f"cache_hits={request_metrics.cache_hits} cache_misses={request_metrics.cache_misses}\n\n"
+        )
+        stats = pstats.Stats(profiler, stream=out)
+        stats.sort_stats(settings.PROFILE_SORT).print_stats(settings.PROFILE_LIMIT)
+        return HttpResponse(out.getvalue(), content_type="text/plain; charset=utf-8")
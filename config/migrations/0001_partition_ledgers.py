@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from config.partitions import convert_to_partitioned
+
+# migratsiya vaqtidagi ro‘yxat — keyin PARTITIONED_TABLES o‘zgarsa ham shu jadvallar
+TABLES = {
+    "systems_productsale": "created_at",
+    "notifications_notification": "created_at",
+}
+
+
+def partition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in TABLES.items():
+        convert_to_partitioned(schema_editor, table, column)
+
+
+class Migration(migrations.Migration):
+    # CHECK constraint'ni tekshirish (VALIDATE) jadvalni yozuvdan to‘smasligi uchun
+    # alohida tranzaksiyada; jadval almashtirish convert_to_partitioned ichida atomik
+    atomic = False
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+        ('systems', '0002_store_time_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,240 @@
+"""
+Katta jurnallar uchun oylik RANGE partitsiyalar (PostgreSQL).
+
+Jadval config/migrations/0001_partition_ledgers.py'da partitsiyalangan jadvalga
+aylantiriladi: eski jadval `<table>_legacy` nomi bilan butun tarixni qamrovchi
+partitsiya sifatida ulanadi (ma'lumot ko‘chirilmaydi), keyingi oylar alohida
+`<table>_pYYYYMM` partitsiyalarga yoziladi. `<table>_default` — xavfsizlik uchun.
+
+Eslatma: partitsiyalangan jadvalda CREATE INDEX CONCURRENTLY ishlamaydi —
+keyingi migratsiyalarda oddiy AddIndex ishlatiladi.
+"""
+import logging
+import re
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger("project")
+
+# jadval -> partitsiya ustuni. Faqat boshqa jadvallar FK bilan bog‘lanmagan jurnallar:
+# partitsiyalangan jadvalning PK'si (id, ustun), unga oddiy FK qo‘yib bo‘lmaydi.
+# auditlog_logentry — uchinchi tomon jadvali, o‘z migratsiyalari bor; partitsiyalanmaydi.
+PARTITIONED_TABLES = {
+    "systems_productsale": "created_at",
+    "notifications_notification": "created_at",
+}
+
+_BOUND_TO = re.compile(r"TO \('([^']+)'\)")
+
+
+def month_start(value):
+    value = timezone.localtime(value) if timezone.is_aware(value) else value
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y%m}"
+
+
+def _q(name):
+    return connection.ops.quote_name(name)
+
+
+def _literal(value):
+    # Ichki qiymat (datetime) — parametr sifatida DDL'da uzatib bo‘lmaydi
+    return "'%s'" % value.isoformat()
+
+
+def list_partitions(cursor, table):
+    """[(nom, yuqori chegara yoki None)] — DEFAULT partitsiya uchun None."""
+    cursor.execute(
+        """
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = %s
+        ORDER BY child.relname
+        """,
+        [table],
+    )
+    result = []
+    for name, bound in cursor.fetchall():
+        match = _BOUND_TO.search(bound or "")
+        upper = datetime.fromisoformat(match.group(1)) if match and match.group(1) != "MAXVALUE" else None
+        result.append((name, upper))
+    return result
+
+
+def create_partition(cursor, table, month):
+    name = partition_name(table, month)
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {_q(name)} PARTITION OF {_q(table)} "
+        f"FOR VALUES FROM ({_literal(month)}) TO ({_literal(add_months(month, 1))})"
+    )
+    return name
+
+
+def ensure_partitions(months_ahead=None, now=None):
+    """Joriy oy va keyingi `months_ahead` oy uchun partitsiyalar mavjudligini ta'minlaydi."""
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = month_start(now or timezone.now())
+    created = []
+    with connection.cursor() as cursor:
+        for table in PARTITIONED_TABLES:
+            existing = list_partitions(cursor, table)
+            covered_until = max((upper for _, upper in existing if upper), default=None)
+            for offset in range(months_ahead + 1):
+                month = add_months(current, offset)
+                # legacy partitsiya qamragan oylar o‘tkazib yuboriladi
+                if covered_until and month < covered_until:
+                    continue
+                try:
+                    with transaction.atomic():
+                        created.append(create_partition(cursor, table, month))
+                except Exception:
+                    # Masalan, default partitsiyada shu oyga tegishli qatorlar bor
+                    logger.exception("Partition yaratilmadi: %s %s", table, month)
+    return created
+
+
+def detach_expired_partitions(now=None):
+    """
+    PARTITION_RETENTION_MONTHS'dan eski partitsiyalarni ajratadi: arxiv sxemasiga
+    ko‘chiradi yoki (PARTITION_ARCHIVE_SCHEMA bo‘sh bo‘lsa) o‘chiradi.
+    DELETE o‘rniga metadata amali — jadval bo‘ylab skan yo‘q.
+    """
+    schema = settings.PARTITION_ARCHIVE_SCHEMA
+    current = month_start(now or timezone.now())
+    detached = []
+    with connection.cursor() as cursor:
+        if schema:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {_q(schema)}")
+        for table, months in settings.PARTITION_RETENTION_MONTHS.items():
+            if not months or table not in PARTITIONED_TABLES:
+                continue
+            cutoff = add_months(current, -months)
+            for name, upper in list_partitions(cursor, table):
+                if upper is None or upper > cutoff:
+                    continue
+                with transaction.atomic():
+                    cursor.execute(f"ALTER TABLE {_q(table)} DETACH PARTITION {_q(name)}")
+                    if schema:
+                        cursor.execute(f"ALTER TABLE {_q(name)} SET SCHEMA {_q(schema)}")
+                    else:
+                        cursor.execute(f"DROP TABLE {_q(name)}")
+                logger.info("Partition ajratildi: %s (%s)", name, schema or "dropped")
+                detached.append(name)
+    return detached
+
+
+def convert_to_partitioned(schema_editor, table, column, months_ahead=3):
+    """
+    Mavjud jadvalni oylik partitsiyalangan jadvalga aylantiradi (migratsiya uchun, atomic = False).
+    Eski jadval `<table>_legacy` bo‘lib, (MINVALUE, keyingi oy) oralig‘ini qamraydi.
+
+    Qulf talab qiladigan skanlar oldindan, yozuvlarni to‘smasdan bajariladi:
+    `CHECK (column < chegara) NOT VALID` + alohida VALIDATE (SHARE UPDATE EXCLUSIVE) va
+    (id, column) unique indeksi CONCURRENTLY. ATTACH PARTITION shularga tayanadi —
+    jadvalni ACCESS EXCLUSIVE qulf ostida skan qilmaydi, indeks qurmaydi.
+    """
+    q = schema_editor.quote_name
+    legacy = f"{table}_legacy"
+    bound = f"{table}_partition_bound"[:63]
+    execute = schema_editor.execute
+    boundary = add_months(month_start(timezone.now()), 1)
+
+    execute(
+        f"ALTER TABLE {q(table)} ADD CONSTRAINT {q(bound)} "
+        f"CHECK ({q(column)} IS NOT NULL AND {q(column)} < {_literal(boundary)}) NOT VALID"
+    )
+    execute(f"ALTER TABLE {q(table)} VALIDATE CONSTRAINT {q(bound)}")
+    # ota jadval PK'si (id, column) — legacy'da mos indeks bo‘lsa ATTACH uni qayta ishlatadi
+    execute(
+        f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {q(legacy + '_id_key')} "
+        f"ON {q(table)} (id, {q(column)})"
+    )
+
+    with transaction.atomic(using=schema_editor.connection.alias):
+        _swap_to_partitioned(schema_editor, table, column, legacy, bound, boundary)
+        for offset in range(months_ahead + 1):
+            month = add_months(boundary, offset)
+            execute(
+                f"CREATE TABLE {q(partition_name(table, month))} PARTITION OF {q(table)} "
+                f"FOR VALUES FROM ({_literal(month)}) TO ({_literal(add_months(month, 1))})"
+            )
+        execute(f"CREATE TABLE {q(table + '_default')} PARTITION OF {q(table)} DEFAULT")
+
+
+def _swap_to_partitioned(schema_editor, table, column, legacy, bound, boundary):
+    q = schema_editor.quote_name
+    execute = schema_editor.execute
+
+    with schema_editor.connection.cursor() as cursor:
+        # qulf boshida olinadi — quyidagi max(id) va metadata o‘zgarmasin
+        cursor.execute(f"LOCK TABLE {q(table)} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN (%s, %s)",
+            [table, f"{table}_pkey", f"{legacy}_id_key"],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype = 'f'
+            """,
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'",
+            [table],
+        )
+        is_identity = cursor.fetchone()[0] in ("a", "d")
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {q(table)}")
+        max_id = cursor.fetchone()[0]
+
+    execute(f"ALTER TABLE {q(table)} RENAME TO {q(legacy)}")
+    execute(f"ALTER TABLE {q(legacy)} RENAME CONSTRAINT {q(table + '_pkey')} TO {q(legacy + '_pkey')}")
+    for index_name, _ in indexes:
+        execute(f"ALTER INDEX {q(index_name)} RENAME TO {q(index_name[:56] + '_legacy')}")
+
+    # id ketma-ketligi ota jadvalga o‘tadi
+    if is_identity:
+        execute(f"ALTER TABLE {q(legacy)} ALTER COLUMN id DROP IDENTITY")
+    else:
+        execute(f"ALTER TABLE {q(legacy)} ALTER COLUMN id DROP DEFAULT")
+        execute(f"DROP SEQUENCE IF EXISTS {q(table + '_id_seq')}")
+    sequence = f"{table}_id_seq"
+    execute(f"CREATE SEQUENCE {q(sequence)}")
+    execute(f"SELECT setval('{sequence}', {max_id + 1}, false)")
+
+    execute(
+        f"CREATE TABLE {q(table)} (LIKE {q(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE ({q(column)})"
+    )
+    # LIKE chegara CHECK'ini ham ko‘chiradi — ota jadvalda u kelajak qatorlarini rad etardi
+    execute(f"ALTER TABLE {q(table)} DROP CONSTRAINT {q(bound)}")
+    execute(f"ALTER TABLE {q(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+    execute(f"ALTER SEQUENCE {q(sequence)} OWNED BY {q(table)}.id")
+    execute(f"ALTER TABLE {q(table)} ADD CONSTRAINT {q(table + '_pkey')} PRIMARY KEY (id, {q(column)})")
+    # indexdef nomni o‘zgartirishdan oldin olingan — asl nom va jadval bilan ota jadvalda yaratiladi
+    for _, definition in indexes:
+        execute(definition)
+    for constraint, definition in foreign_keys:
+        execute(f"ALTER TABLE {q(table)} ADD CONSTRAINT {q(constraint)} {definition}")
+
+    # ustun NOT NULL + tasdiqlangan CHECK partitsiya chegarasini qamraydi — skan yo‘q
+    execute(
+        f"ALTER TABLE {q(table)} ATTACH PARTITION {q(legacy)} "
+        f"FOR VALUES FROM (MINVALUE) TO ({_literal(boundary)})"
+    )
+    execute(f"ALTER TABLE {q(legacy)} DROP CONSTRAINT {q(bound)}")
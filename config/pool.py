@@ -0,0 +1,64 @@
+"""
+PostgreSQL connection pool (Django 5.1+, psycopg 3).
+
+daphne ostida sync view'lar alohida oqimlarda ishlaydi va CONN_MAX_AGE bilan
+doimiy ulanishlar oqimlar bo‘yicha "oqib ketadi" — shuning uchun har bir jarayonda
+bitta psycopg_pool.ConnectionPool ishlatiladi: so‘rov oxirida ulanish yopilmaydi,
+pool'ga qaytadi. CONN_HEALTH_CHECKS=True bo‘lsa Django pool'ga `check` beradi —
+ulanish berilishdan oldin tekshiriladi.
+"""
+import logging
+
+from django.db import connections
+
+from .metrics import registry
+
+logger = logging.getLogger("project")
+
+# get_stats() kalitlari -> /metrics'dagi nom
+POOL_STATS = {
+    "pool_min": "db_pool_min_size",
+    "pool_max": "db_pool_max_size",
+    "pool_size": "db_pool_size",
+    "pool_available": "db_pool_available",
+    "requests_waiting": "db_pool_requests_waiting",
+    "requests_num": "db_pool_requests_total",
+    "requests_queued": "db_pool_requests_queued_total",
+    "requests_wait_ms": "db_pool_requests_wait_ms_total",
+    "requests_errors": "db_pool_requests_errors_total",
+    "usage_ms": "db_pool_usage_ms_total",
+    "returns_bad": "db_pool_returns_bad_total",
+    "connections_num": "db_pool_connections_total",
+    "connections_ms": "db_pool_connections_ms_total",
+    "connections_errors": "db_pool_connections_errors_total",
+    "connections_lost": "db_pool_connections_lost_total",
+}
+
+
+def _pools():
+    for alias in connections:
+        wrapper = connections[alias]
+        if wrapper.vendor == "postgresql" and wrapper.settings_dict["OPTIONS"].get("pool"):
+            yield alias, wrapper
+
+
+def collect_pool_metrics():
+    """Har bir pool holatini gauge sifatida registry'ga yozadi (/metrics chaqirilganda)."""
+    for alias, wrapper in _pools():
+        try:
+            stats = wrapper.pool.get_stats()
+        except Exception:
+            logger.warning("Pool statistikasi olinmadi: %s", alias, exc_info=True)
+            continue
+        for key, name in POOL_STATS.items():
+            registry.set_gauge(name, stats.get(key, 0), alias=alias)
+
+
+def discard_inherited_pools():
+    """
+    Fork'dan keyin (Celery prefork) ota jarayon pool'i bolaga meros qoladi: uning
+    ulanishlari ota bilan umumiy soket, ishchi oqimlari esa yo‘q. Yopmasdan
+    tashlab yuboramiz — bola jarayon birinchi so‘rovda o‘z pool'ini ochadi.
+    """
+    for _, wrapper in _pools():
+        wrapper._connection_pools.pop(wrapper.alias, None)
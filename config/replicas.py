@@ -0,0 +1,241 @@
+"""
+Read-replica marshrutlash.
+
+Standart holatda barcha so‘rovlar primary'ga boradi. Replica faqat aniq belgilangan
+joylarda ishlatiladi: `use_replica()` bloki, `ReplicaReadMixin` (GET/list) yoki
+`pick_replica()` bilan `.using(...)`. Replica lag'i REPLICA_MAX_LAG_SECONDS'dan
+oshsa yoki ulanib bo‘lmasa — primary'ga qaytiladi. Bitta `use_replica()` bloki
+ichidagi barcha o‘qishlar blok boshida tanlangan bitta replica'dan.
+
+Read-your-writes:
+  * blok ichida yozuv bo‘lsa, keyingi o‘qishlar primary'dan;
+  * foydalanuvchi yozuvidan keyin REPLICA_PIN_SECONDS davomida uning
+    GET so‘rovlari ham primary'dan (ReplicaPinMiddleware).
+"""
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+from .metrics import registry
+from .middleware import AsyncCapableMiddleware
+
+logger = logging.getLogger("project")
+
+REPLICA_PREFIX = "replica"
+
+# o‘qish alias'i: None — router standarti, "default" — use_primary, aks holda replica
+_read_alias = ContextVar("db_read_alias", default=None)
+_wrote = ContextVar("db_wrote", default=False)
+_pin_on_write = ContextVar("db_pin_on_write", default=True)
+
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)]
+
+
+class LagMonitor:
+    """Har bir replica lag'ini REPLICA_LAG_CHECK_INTERVAL oralig‘ida o‘lchaydi (jarayon ichida)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = {}
+
+    def lag(self, alias):
+        now = time.monotonic()
+        with self._lock:
+            checked_at, lag = self._state.get(alias, (None, None))
+            if checked_at is not None and now - checked_at < settings.REPLICA_LAG_CHECK_INTERVAL:
+                return lag
+            # Parallel oqimlar bir vaqtda o‘lchamasligi uchun eski qiymat bilan belgilab qo‘yamiz
+            self._state[alias] = (now, lag)
+
+        lag = self.measure(alias)
+        with self._lock:
+            self._state[alias] = (now, lag)
+        registry.set_gauge("db_replica_lag_seconds", -1 if lag is None else round(lag, 3), alias=alias)
+        return lag
+
+    def measure(self, alias):
+        # pool'dan emas, qisqa timeout'li alohida ulanish: o‘lik replica so‘rovni
+        # pool timeout'igacha to‘smaydi va pool'dagi joyni egallamaydi
+        connection = connections[alias]
+        try:
+            with connection.Database.connect(**probe_params(alias), autocommit=True) as conn:
+                return float(conn.execute(LAG_SQL).fetchone()[0])
+        except Exception:
+            logger.warning("Replica %s mavjud emas", alias, exc_info=True)
+            return None
+
+    def healthy(self):
+        limit = settings.REPLICA_MAX_LAG_SECONDS
+        result = []
+        for alias in replica_aliases():
+            lag = self.lag(alias)
+            if lag is not None and lag <= limit:
+                result.append(alias)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._state.clear()
+
+
+lag_monitor = LagMonitor()
+
+
+def probe_params(alias):
+    params = connections[alias].get_connection_params()
+    timeout = settings.REPLICA_PROBE_TIMEOUT
+    # libpq connect_timeout butun sekund (2 dan kam qiymat 2 deb olinadi)
+    params["connect_timeout"] = max(2, int(timeout))
+    options = f"-c statement_timeout={int(timeout * 1000)}"
+    params["options"] = f"{params['options']} {options}" if params.get("options") else options
+    return params
+
+
+def pick_replica():
+    """Sog‘lom replica alias'i, bo‘lmasa 'default'."""
+    aliases = lag_monitor.healthy()
+    return random.choice(aliases) if aliases else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def use_replica(pin_on_write=True):
+    # reset(token) o‘rniga eski qiymatlar qaytariladi: async view'da blok sync_to_async
+    # oqimida ochilib, event loop kontekstida yopilishi mumkin (boshqa Context)
+    previous = (_read_alias.get(), _wrote.get(), _pin_on_write.get())
+    # replica blok boshida bir marta tanlanadi — so‘rovlar har xil lag'li replica'larga tarqalmaydi
+    _read_alias.set(pick_replica())
+    _wrote.set(False)
+    _pin_on_write.set(pin_on_write)
+    try:
+        yield
+    finally:
+        _read_alias.set(previous[0])
+        _wrote.set(previous[1])
+        _pin_on_write.set(previous[2])
+
+
+@contextmanager
+def use_primary():
+    previous = _read_alias.get()
+    _read_alias.set(DEFAULT_DB_ALIAS)
+    try:
+        yield
+    finally:
+        _read_alias.set(previous)
+
+
+def replica_reads(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # Bog‘liq obyektlar o‘sha bazadan o‘qiladi
+            return instance._state.db
+        alias = _read_alias.get()
+        if alias and not _wrote.get():
+            return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        if _read_alias.get() not in (None, DEFAULT_DB_ALIAS) and _pin_on_write.get():
+            _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+# --- so‘rovlar darajasida ---
+
+def _pin_key(user_id):
+    return f"replica_pin_{user_id}"
+
+
+def is_pinned(user):
+    return bool(user and user.is_authenticated and cache.get(_pin_key(user.pk)))
+
+
+class ReplicaPinMiddleware(AsyncCapableMiddleware):
+    """Muvaffaqiyatli yozuvdan keyin foydalanuvchini qisqa muddat primary'ga bog‘laydi."""
+
+    def handle(self, request):
+        response = self.get_response(request)
+        if self._should_pin(request, response):
+            self._pin(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self._should_pin(request, response):
+            # request.user session'dan dangasa yuklanishi mumkin — sync oqimda
+            await sync_to_async(self._pin)(request)
+        return response
+
+    @staticmethod
+    def _should_pin(request, response):
+        return bool(replica_aliases()) and request.method not in SAFE_METHODS and response.status_code < 400
+
+    @staticmethod
+    def _pin(request):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            cache.set(_pin_key(user.pk), 1, settings.REPLICA_PIN_SECONDS)
+
+
+class ReplicaReadMixin:
+    """
+    DRF view'lar uchun: GET so‘rovlar replica'dan o‘qiladi. ViewSet'da faqat
+    `replica_actions`dagi action'lar (None — barcha GET action'lar).
+    """
+    replica_actions = ("list",)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self._reads_from_replica(request):
+            self._replica_scope = use_replica()
+            self._replica_scope.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        scope = getattr(self, "_replica_scope", None)
+        if scope is not None:
+            self._replica_scope = None
+            scope.__exit__(None, None, None)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def _reads_from_replica(self, request):
+        if request.method not in SAFE_METHODS or not replica_aliases():
+            return False
+        action = getattr(self, "action", None)
+        if action is not None and self.replica_actions is not None and action not in self.replica_actions:
+            return False
+        return not is_pinned(request.user)
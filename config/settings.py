@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 from datetime import timedelta
 import environ
+from celery.schedules import crontab
 
 # Load environment variables
 env = environ.Env(DEBUG=(bool, False))
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
     'auditlog',
 
     # common apps
+    'config.apps.ConfigConfig',
     'accounts',
     "device",
 
@@ -62,6 +64,7 @@ INSTALLED_APPS = [
     'notifications',
     'loan.apps.LoanConfig',
     'analytics',
+    'events.apps.EventsConfig',
 
     # Store-side apps
     'store_user',
@@ -69,26 +72,35 @@ INSTALLED_APPS = [
 
 # === Middleware ===
 MIDDLEWARE = [
+    'config.middleware.PerformanceMiddleware',
     "corsheaders.middleware.CorsMiddleware",
-    'django_currentuser.middleware.ThreadLocalUserMiddleware',
+    'config.middleware.CurrentUserMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'auditlog.middleware.AuditlogMiddleware',
+    'config.middleware.AuditlogMiddleware',
+    'config.replicas.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# === Metrics & profiling ===
+# /metrics uchun token (bo‘sh bo‘lsa faqat staff session)
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+PROFILE_SORT = env("PROFILE_SORT", default="cumulative")
+PROFILE_LIMIT = env.int("PROFILE_LIMIT", default=60)
+
 # === Auth & user model ===
 AUTH_USER_MODEL = "accounts.CustomUser"
 
 APPEND_SLASH = False
 
+# MultiFieldModelBackend username'ni ham qamraydi — ikkinchi backend muvaffaqiyatsiz
+# loginda qo‘shimcha so‘rov va parol hash'ini keltirib chiqarardi
 AUTHENTICATION_BACKENDS = [
     'accounts.authentication.MultiFieldModelBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
@@ -137,6 +149,15 @@ CHANNEL_LAYERS = {
     },
 }
 
+# === Cache ===
+CACHES = {
+    "default": {
+        "BACKEND": "config.cache.InstrumentedRedisCache",
+        "LOCATION": env("REDIS_CACHE_URL", default=f"redis://{env('REDIS_HOST')}:{env('REDIS_PORT')}/1"),
+        "KEY_PREFIX": "pos",
+    }
+}
+
 CELERY_BROKER_URL = env("CELERY_BROKER_URL")
 CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND")
 
@@ -145,7 +166,68 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Tashkent'
 
+CELERY_BEAT_SCHEDULE = {
+    "prune-expired-tokens": {
+        "task": "device.tasks.prune_expired_tokens",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "reconcile-debtor-balances": {
+        "task": "loan.tasks.reconcile_debtor_balances",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "refresh-debt-ageing": {
+        "task": "loan.tasks.refresh_debt_ageing",
+        "schedule": crontab(hour=3, minute=15),
+    },
+    "expire-debt-offers": {
+        "task": "loan.tasks.expire_debt_offers",
+        "schedule": crontab(minute="*/10"),
+    },
+    # POS bootstrap: o‘zgargan do‘konlar katalog snapshot'i (product.snapshot)
+    "build-catalog-snapshots": {
+        "task": "product.tasks.build_catalog_snapshots",
+        "schedule": crontab(minute="*/15"),
+    },
+    "maintain-partitions": {
+        "task": "config.tasks.maintain_partitions",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    # on_commit'da navbatga qo‘yilmay qolgan hodisalar uchun zaxira
+    "dispatch-events": {
+        "task": "events.tasks.dispatch_events",
+        "schedule": crontab(minute="*"),
+    },
+    "purge-events": {
+        "task": "events.tasks.purge_events",
+        "schedule": crontab(hour=4, minute=30),
+    },
+}
+
+# === Domain events (outbox) ===
+EVENTS_DISPATCH_ON_COMMIT = env.bool("EVENTS_DISPATCH_ON_COMMIT", default=True)
+EVENTS_BATCH_SIZE = env.int("EVENTS_BATCH_SIZE", default=200)
+EVENTS_MAX_ATTEMPTS = env.int("EVENTS_MAX_ATTEMPTS", default=10)
+# Qayta ishlangan hodisalar shuncha kundan keyin o‘chiriladi
+EVENTS_RETENTION_DAYS = env.int("EVENTS_RETENTION_DAYS", default=7)
+
+# === Partitioning ===
+# Oylik partitsiyalar (config.partitions): oldindan yaratiladigan oylar soni
+PARTITION_MONTHS_AHEAD = env.int("PARTITION_MONTHS_AHEAD", default=3)
+# Jadval -> saqlash muddati (oy). Ko‘rsatilmagan jadvallar abadiy saqlanadi.
+PARTITION_RETENTION_MONTHS = {
+    "notifications_notification": env.int("NOTIFICATION_RETENTION_MONTHS", default=6),
+}
+# Ajratilgan partitsiyalar shu sxemaga ko‘chiriladi; bo‘sh bo‘lsa DROP qilinadi
+PARTITION_ARCHIVE_SCHEMA = env("PARTITION_ARCHIVE_SCHEMA", default="archive")
+
 # === Database ===
+# Har bir jarayonda bitta connection pool (config/pool.py). Hajm — bir vaqtda DB bilan
+# ishlaydigan oqimlar soni: daphne uchun ASGI_THREADS (asgiref executor hajmi),
+# Celery prefork'da har bir jarayon bitta vazifa bajaradi — DB_POOL_MAX_SIZE=2 yetarli.
+DB_POOL = env.bool("DB_POOL", default=True)
+DB_POOL_MAX_SIZE = env.int("DB_POOL_MAX_SIZE", default=env.int("ASGI_THREADS", default=10))
+DB_POOL_MIN_SIZE = min(env.int("DB_POOL_MIN_SIZE", default=2), DB_POOL_MAX_SIZE)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -154,16 +236,50 @@ DATABASES = {
         "PASSWORD": env("POSTGRES_PASSWORD"),
         "HOST": env("POSTGRES_HOST"),
         "PORT": env("POSTGRES_PORT"),
+        # Pool bilan CONN_MAX_AGE 0 bo‘lishi shart — ulanish yopilmaydi, pool'ga qaytadi
+        "CONN_MAX_AGE": 0 if DB_POOL else env.int("DB_CONN_MAX_AGE", default=0),
+        # Pool bilan: ulanish pool'dan berilishdan oldin tekshiriladi
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "pool": {
+                "min_size": DB_POOL_MIN_SIZE,
+                "max_size": DB_POOL_MAX_SIZE,
+                # bo‘sh ulanish kutish chegarasi — oshsa PoolTimeout
+                "timeout": env.float("DB_POOL_TIMEOUT", default=10.0),
+                "max_idle": env.float("DB_POOL_MAX_IDLE", default=300.0),
+                "max_lifetime": env.float("DB_POOL_MAX_LIFETIME", default=1800.0),
+            },
+        } if DB_POOL else {},
     }
 }
 
+# === Read replicas ===
+# Analytics, eksport va read-only list'lar replica'dan o‘qiydi (config/replicas.py).
+# Bo‘sh bo‘lsa hammasi primary'da.
+for _index, _host in enumerate(env.list("POSTGRES_REPLICA_HOSTS", default=[]), start=1):
+    _host, _, _port = _host.partition(":")
+    DATABASES[f"replica{_index}"] = {
+        **DATABASES["default"],
+        "OPTIONS": {**DATABASES["default"]["OPTIONS"]},
+        "HOST": _host,
+        "PORT": _port or env("POSTGRES_REPLICA_PORT", default=env("POSTGRES_PORT")),
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ['config.replicas.ReplicaRouter']
+# Shundan katta lag bo‘lsa replica chetlab o‘tiladi (sekund)
+REPLICA_MAX_LAG_SECONDS = env.float("REPLICA_MAX_LAG_SECONDS", default=5.0)
+REPLICA_LAG_CHECK_INTERVAL = env.float("REPLICA_LAG_CHECK_INTERVAL", default=10.0)
+# Lag o‘lchash ulanishi va so‘rovi uchun chegara (sekund) — o‘lik replica so‘rovni to‘smasin
+REPLICA_PROBE_TIMEOUT = env.float("REPLICA_PROBE_TIMEOUT", default=2.0)
+# Yozuvdan keyin foydalanuvchi o‘qishlari shuncha vaqt primary'dan (read-your-writes)
+REPLICA_PIN_SECONDS = env.int("REPLICA_PIN_SECONDS", default=10)
+
 # === REST Framework ===
 REST_FRAMEWORK = {
+    # Sxema bo‘yicha bitta autentifikator: Bearer/Token/Basic, sarlavha bo‘lmasa session
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.HeaderSchemeAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -175,6 +291,9 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 100,
+    'DEFAULT_THROTTLE_RATES': {
+        'login': env("LOGIN_THROTTLE_RATE", default="10/min"),
+    },
 }
 
 # === Simple JWT ===
@@ -221,6 +340,28 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 LOG_DIR = BASE_DIR / 'logs'
 LOG_DIR.mkdir(exist_ok=True)
 
+# === Logging ===
+# Fayl yozish fon oqimida (QueuedFileHandler), rotatsiya bilan, JSON formatda.
+# Oddiy INFO yozuvlari LOG_SAMPLE_RATE bo‘yicha tanlab olinadi, WARNING+ har doim.
+LOG_SAMPLE_RATE = env.float("LOG_SAMPLE_RATE", default=0.1)
+LOG_MAX_BYTES = env.int("LOG_MAX_BYTES", default=50 * 1024 * 1024)
+LOG_BACKUP_COUNT = env.int("LOG_BACKUP_COUNT", default=10)
+SLOW_QUERY_THRESHOLD_MS = env.float("SLOW_QUERY_THRESHOLD_MS", default=200)
+# Har bir SQL'ni yozish faqat debug uchun (LOG_SQL=True)
+LOG_SQL = env.bool("LOG_SQL", default=False)
+
+
+def _queued_file(filename, **kwargs):
+    return {
+        'class': 'config.log.QueuedFileHandler',
+        'filename': LOG_DIR / filename,
+        'formatter': 'json',
+        'max_bytes': LOG_MAX_BYTES,
+        'backup_count': LOG_BACKUP_COUNT,
+        **kwargs,
+    }
+
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -234,6 +375,16 @@ LOGGING = {
             'format': '{levelname}: {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'config.log.JsonFormatter',
+        },
+    },
+
+    'filters': {
+        'sampled': {
+            '()': 'config.log.SamplingFilter',
+            'rate': LOG_SAMPLE_RATE,
+        },
     },
 
     'handlers': {
@@ -241,31 +392,12 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
-        'file_django': {
-            'class': 'logging.FileHandler',
-            'filename': LOG_DIR / 'django_requests.log',
-            'formatter': 'verbose',
-        },
-        'file_security': {
-            'class': 'logging.FileHandler',
-            'filename': LOG_DIR / 'django_security.log',
-            'formatter': 'verbose',
-        },
-        'file_queries': {
-            'class': 'logging.FileHandler',
-            'filename': LOG_DIR / 'db_queries.log',
-            'formatter': 'verbose',
-        },
-        'file_celery': {
-            'class': 'logging.FileHandler',
-            'filename': LOG_DIR / 'celery.log',
-            'formatter': 'verbose',
-        },
-        'file_project': {
-            'class': 'logging.FileHandler',
-            'filename': LOG_DIR / 'project.log',
-            'formatter': 'verbose',
-        },
+        'file_django': _queued_file('django_requests.log', filters=['sampled']),
+        'file_security': _queued_file('django_security.log'),
+        'file_queries': _queued_file('db_queries.log'),
+        'file_slow_queries': _queued_file('db_slow_queries.log'),
+        'file_celery': _queued_file('celery.log', when='midnight'),
+        'file_project': _queued_file('project.log', filters=['sampled']),
     },
 
     'loggers': {
@@ -281,7 +413,12 @@ LOGGING = {
         },
         'django.db.backends': {
             'handlers': ['file_queries'],
-            'level': 'DEBUG',
+            'level': 'DEBUG' if LOG_SQL else 'WARNING',
+            'propagate': False,
+        },
+        'db.slow': {
+            'handlers': ['file_slow_queries'],
+            'level': 'WARNING',
             'propagate': False,
         },
         'celery': {
@@ -295,4 +432,4 @@ LOGGING = {
             'propagate': False,
         },
     },
-}
\ No newline at end of file
+}
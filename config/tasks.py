@@ -0,0 +1,11 @@
+from celery import shared_task
+
+from .partitions import detach_expired_partitions, ensure_partitions
+
+
+@shared_task
+def maintain_partitions():
+    return {
+        "created": ensure_partitions(),
+        "detached": detach_expired_partitions(),
+    }
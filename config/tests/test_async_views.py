@@ -0,0 +1,71 @@
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+from rest_framework import viewsets
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from config.async_views import AsyncAPIView, AsyncViewMixin
+from config.current_user import get_current_authenticated_user
+from config.middleware import CurrentUserMiddleware
+
+
+class PingView(AsyncAPIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    async def get(self, request):
+        return Response(["a", "b"])
+
+
+class MixedViewSet(AsyncViewMixin, viewsets.ViewSet):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def list(self, request):
+        return Response("sync")
+
+    async def count(self, request):
+        return Response("async")
+
+
+def test_async_api_view_returns_response():
+    view = PingView.as_view()
+    assert iscoroutinefunction(view)
+
+    response = async_to_sync(view)(APIRequestFactory().get("/"))
+    assert response.status_code == 200
+    assert response.data == ["a", "b"]
+
+
+def test_viewset_route_is_async_only_for_async_actions():
+    sync_view = MixedViewSet.as_view({"get": "list"})
+    async_view = MixedViewSet.as_view({"get": "count"})
+    assert not iscoroutinefunction(sync_view)
+    assert iscoroutinefunction(async_view)
+
+    assert sync_view(APIRequestFactory().get("/")).data == "sync"
+    assert async_to_sync(async_view)(APIRequestFactory().get("/")).data == "async"
+
+
+def test_middleware_chain_is_async_capable():
+    # bitta sync-only middleware ASGI ostida butun so‘rovni oqimga bog‘laydi
+    sync_only = [path for path in settings.MIDDLEWARE if not getattr(import_string(path), "async_capable", False)]
+    assert sync_only == []
+
+
+def test_current_user_visible_in_sync_threads():
+    user = type("User", (), {"is_authenticated": True})()
+
+    async def view(request):
+        request.user = user  # DRF autentifikatsiyadan keyin o‘rnatadi
+        seen = await sync_to_async(get_current_authenticated_user)()
+        return HttpResponse("ok" if seen is user else "lost")
+
+    middleware = CurrentUserMiddleware(view)
+    assert iscoroutinefunction(middleware)
+    assert async_to_sync(middleware)(RequestFactory().get("/")).content == b"ok"
+    assert get_current_authenticated_user() is None
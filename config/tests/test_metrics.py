@@ -0,0 +1,69 @@
+from config import pool
+from config.db import normalize_sql
+from config.metrics import MetricsRegistry, RequestMetrics
+
+
+def test_registry_renders_cumulative_histogram():
+    registry = MetricsRegistry()
+    registry.observe("GET", "platform/<int:store_id>/products/", 200, 0.03, RequestMetrics(queries=4), 512)
+    registry.observe("GET", "platform/<int:store_id>/products/", 200, 0.3, RequestMetrics(queries=6), 256)
+
+    text = registry.render_prometheus()
+    labels = 'method="GET",route="platform/<int:store_id>/products/"'
+    assert f'http_request_duration_seconds_bucket{{{labels},le="0.05"}} 1' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f"http_request_db_queries_total{{{labels}}} 10" in text
+    assert f"http_response_size_bytes_total{{{labels}}} 768" in text
+
+
+def test_normalize_sql_collapses_parameters():
+    sql = 'SELECT "id" FROM "product_product" WHERE "id" IN (%s, %s, %s) LIMIT 21'
+    assert normalize_sql(sql) == 'SELECT "id" FROM "product_product" WHERE "id" IN (?) LIMIT ?'
+
+
+def test_pool_stats_rendered_as_gauges(monkeypatch):
+    class FakePool:
+        def get_stats(self):
+            return {"pool_max": 10, "pool_size": 4, "pool_available": 3, "requests_waiting": 0}
+
+    class FakeWrapper:
+        pool = FakePool()
+
+    registry = MetricsRegistry()
+    monkeypatch.setattr(pool, "registry", registry)
+    monkeypatch.setattr(pool, "_pools", lambda: [("default", FakeWrapper())])
+    pool.collect_pool_metrics()
+
+    text = registry.render_prometheus()
+    assert "# TYPE db_pool_size gauge" in text
+    assert 'db_pool_size{alias="default"} 4' in text
+    assert 'db_pool_connections_lost_total{alias="default"} 0' in text
+
+
+def test_profile_header_ignored_for_anonymous(monkeypatch):
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from config import middleware
+
+    def forbidden():
+        raise AssertionError("profiler must not start")
+
+    monkeypatch.setattr(middleware.cProfile, "Profile", forbidden)
+    monkeypatch.setattr(middleware.settings, "METRICS_TOKEN", "secret")
+    mw = middleware.PerformanceMiddleware(lambda request: HttpResponse("ok"))
+
+    request = RequestFactory().get("/", HTTP_X_PROFILE="1", HTTP_X_METRICS_TOKEN="wrong")
+    assert mw(request).content == b"ok"
+
+
+def test_metrics_view_checks_token(settings, rf):
+    from django.contrib.auth.models import AnonymousUser
+
+    from config.views import metrics_view
+
+    settings.METRICS_TOKEN = "secret"
+    for header, status in (("secret", 200), ("wrong", 403), (None, 403)):
+        request = rf.get("/metrics/", **({"HTTP_X_METRICS_TOKEN": header} if header else {}))
+        request.user = AnonymousUser()
+        assert metrics_view(request).status_code == status
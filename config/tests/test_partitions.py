@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from config.partitions import (
+    PARTITIONED_TABLES, add_months, convert_to_partitioned, ensure_partitions, list_partitions,
+    month_start, partition_name,
+)
+
+
+def test_month_arithmetic_wraps_year():
+    start = month_start(datetime(2026, 11, 17, 13, 5))
+    assert start == datetime(2026, 11, 1)
+    assert add_months(start, 2) == datetime(2027, 1, 1)
+    assert add_months(start, -11) == datetime(2025, 12, 1)
+
+
+def test_partition_name():
+    assert partition_name("systems_productsale", datetime(2027, 1, 1)) == "systems_productsale_p202701"
+
+
+PROBE = "config_partition_probe"
+
+
+@pytest.fixture
+def probe_table():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {PROBE} (id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY, "
+            f"created_at timestamptz NOT NULL, note text)"
+        )
+        cursor.execute(f"CREATE INDEX {PROBE}_note_idx ON {PROBE} (note)")
+        cursor.execute(f"INSERT INTO {PROBE} (created_at, note) VALUES (now() - interval '400 days', 'eski'), (now(), 'yangi')")
+    yield PROBE
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {PROBE} CASCADE")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_convert_to_partitioned_keeps_rows_and_ids(probe_table):
+    with connection.schema_editor(atomic=False) as editor:
+        convert_to_partitioned(editor, probe_table, "created_at", months_ahead=1)
+
+    current = month_start(timezone.now())
+    with connection.cursor() as cursor:
+        partitions = dict(list_partitions(cursor, probe_table))
+        assert partitions[f"{probe_table}_legacy"] == add_months(current, 1)
+        assert partition_name(probe_table, add_months(current, 2)) in partitions
+        assert partitions[f"{probe_table}_default"] is None
+
+        cursor.execute(f"INSERT INTO {probe_table} (created_at, note) VALUES (now() + interval '40 days', 'keyin') RETURNING id")
+        assert cursor.fetchone()[0] == 3
+        cursor.execute(f"SELECT note FROM {probe_table} ORDER BY id")
+        assert [row[0] for row in cursor.fetchall()] == ["eski", "yangi", "keyin"]
+
+        # chegara CHECK'i vaqtinchalik — na ota jadvalda, na legacy'da qolmaydi
+        cursor.execute(
+            "SELECT count(*) FROM pg_constraint WHERE conname = %s", [f"{probe_table}_partition_bound"]
+        )
+        assert cursor.fetchone()[0] == 0
+
+
+@pytest.mark.django_db
+def test_ensure_partitions_creates_missing_months():
+    later = add_months(month_start(timezone.now()), 12)
+    created = ensure_partitions(months_ahead=1, now=later)
+
+    assert set(created) == {
+        partition_name(table, month)
+        for table in PARTITIONED_TABLES
+        for month in (later, add_months(later, 1))
+    }
+    assert ensure_partitions(months_ahead=1, now=later) == []
@@ -0,0 +1,143 @@
+"""
+Har bir list/detail endpoint uchun so‘rovlar soni byudjeti.
+
+Ikki xil hajmdagi do‘kon seed_data bilan yaratiladi; endpoint ikkalasida ham bir xil
+sonda so‘rov bajarishi (N+1 yo‘q) va ROUTE_BUDGETS'dagi chegaradan oshmasligi kerak.
+Xato bo‘lsa, ko‘paygan so‘rovlarning fingerprint'lari chiqariladi.
+"""
+from collections import Counter
+from dataclasses import dataclass
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from config.db import normalize_sql, sql_fingerprint
+from expense.models import Expense
+from loan.models import DebtDocument, DebtUser
+from order.models import Order
+from product.models import Product
+from refund.models import Refund
+from store.models import Store
+from systems.models import ProductSale
+
+pytestmark = pytest.mark.django_db
+
+SMALL = dict(products=3, lots=1, customers=2, orders_per_day=1, items_per_order=1,
+             debtors=1, debt_docs=2, expenses_per_month=1)
+LARGE = dict(products=40, lots=3, customers=20, orders_per_day=4, items_per_order=5,
+             debtors=10, debt_docs=40, expenses_per_month=20)
+# refund_ratio=1 — har bir buyurtma qatorida refund bor, detail route'lar 404 bermaydi
+COMMON = dict(stores=1, months=1, refund_ratio=1.0, seed=7)
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str
+    url: str
+    budget: int
+
+
+# Byudjetlar chief (force_authenticate) uchun, cache issiq holatda.
+ROUTE_BUDGETS = [
+    Route("orders-list", "/platform/{store}/orders/orders/", 3),
+    Route("orders-detail", "/platform/{store}/orders/orders/{order}/", 4),
+    Route("orders-items", "/platform/{store}/orders/orders/{order}/items/", 4),
+    Route("order-trash-list", "/platform/{store}/orders/trash/", 3),
+    Route("products-list", "/platform/{store}/products/products/", 3),
+    Route("products-detail", "/platform/{store}/products/products/{product}/", 5),
+    Route("stock-list", "/platform/{store}/products/stock/", 3),
+    Route("sales-list", "/platform/{store}/system/sales/", 3),
+    Route("sales-detail", "/platform/{store}/system/sales/{sale}/", 2),
+    Route("stock-transfers-list", "/platform/{store}/system/stock-transfers/", 3),
+    Route("product-entries-list", "/platform/{store}/system/product-entries/", 4),
+    Route("expenses-list", "/platform/{store}/expense/", 3),
+    Route("expenses-detail", "/platform/{store}/expense/{expense}/", 2),
+    Route("debtors-list", "/platform/{store}/debt/debtors/", 3),
+    Route("debtors-detail", "/platform/{store}/debt/debtors/{debtor}/", 2),
+    Route("documents-list", "/platform/{store}/debt/debtors/{debtor}/documents/", 4),
+    Route("documents-detail", "/platform/{store}/debt/debtors/{debtor}/documents/{document}/", 3),
+    Route("document-products-list",
+          "/platform/{store}/debt/debtors/{debtor}/documents/{document}/products/", 3),
+    Route("refunds-list", "/platform/{store}/refunds/refunds/", 3),
+    Route("refunds-detail", "/platform/{store}/refunds/refunds/{refund}/", 2),
+    Route("cashbox-detail", "/platform/{store}/cashbox/", 2),
+    Route("cashbox-transactions", "/platform/{store}/cashbox/transactions/", 3),
+    Route("product-search", "/platform/{store}/search/product/?q=Mahsulot", 2),
+    Route("staffs-list", "/platform/{store}/staffs/", 3),
+]
+
+
+def _seed(size):
+    call_command("seed_data", stdout=StringIO(), **COMMON, **size)
+    store = Store.objects.select_related("owner__user").order_by("-id").first()
+
+    # Detail endpointlar uchun eng ko‘p bog‘liq qatorlari bor obyektlar
+    order = Order.objects.filter(store=store).annotate(n=Count("items")).order_by("-n").first()
+    debtor = DebtUser.objects.filter(store=store).annotate(n=Count("documents")).order_by("-n").first()
+    document = (DebtDocument.objects.filter(debtuser=debtor)
+                .annotate(n=Count("products")).order_by("-n").first())
+    return store, {
+        "store": store.pk,
+        "order": order.pk,
+        "product": Product.objects.filter(store=store).order_by("id").first().pk,
+        "sale": ProductSale.objects.filter(order__store=store).first().pk,
+        "expense": Expense.objects.filter(store=store).first().pk,
+        "debtor": debtor.pk,
+        "document": document.pk,
+        "refund": Refund.objects.filter(store=store).order_by("id").first().pk,
+    }
+
+
+@pytest.fixture(scope="module")
+def stores(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        small = _seed(SMALL)
+        large = _seed(LARGE)
+    yield small, large
+    with django_db_blocker.unblock():
+        call_command("flush", interactive=False, verbosity=0)
+
+
+def _measure(store, params, route):
+    client = APIClient()
+    client.force_authenticate(user=store.owner.user)
+    url = route.url.format(**params)
+
+    client.get(url)  # isitish: cache va lazy obyektlar
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200, f"{route.name}: HTTP {response.status_code}"
+    return [q["sql"] for q in ctx.captured_queries]
+
+
+def _report(small, large):
+    small_fp = Counter((sql_fingerprint(sql), normalize_sql(sql)) for sql in small)
+    large_fp = Counter((sql_fingerprint(sql), normalize_sql(sql)) for sql in large)
+    lines = []
+    for (fp, sql), count in large_fp.most_common():
+        marker = "+" if count > small_fp.get((fp, sql), 0) else " "
+        lines.append(f"{marker} {count:>4}x [{fp}] {sql[:200]}")
+    return "\n".join(lines)
+
+
+@pytest.mark.parametrize("route", ROUTE_BUDGETS, ids=lambda r: r.name)
+def test_query_budget(stores, route):
+    (small_store, small_params), (large_store, large_params) = stores
+    cache.clear()
+
+    small = _measure(small_store, small_params, route)
+    large = _measure(large_store, large_params, route)
+
+    assert len(large) == len(small), (
+        f"{route.name}: so‘rovlar soni hajm bilan o‘smoqda ({len(small)} -> {len(large)})\n"
+        + _report(small, large)
+    )
+    assert len(large) <= route.budget, (
+        f"{route.name}: byudjet {route.budget}, bajarildi {len(large)}\n" + _report(small, large)
+    )
@@ -0,0 +1,46 @@
+from config import replicas
+from config.replicas import ReplicaRouter, use_primary, use_replica
+from product.models import Product
+
+
+def test_router_reads_replica_until_first_write(monkeypatch):
+    monkeypatch.setattr(replicas, "pick_replica", lambda: "replica1")
+    router = ReplicaRouter()
+
+    assert router.db_for_read(Product) == "default"
+    with use_replica():
+        assert router.db_for_read(Product) == "replica1"
+        assert router.db_for_write(Product) == "default"
+        # read-your-writes: yozuvdan keyin blok oxirigacha primary
+        assert router.db_for_read(Product) == "default"
+        with use_primary():
+            assert router.db_for_read(Product) == "default"
+    assert router.db_for_read(Product) == "default"
+
+
+def test_router_follows_instance_database(monkeypatch):
+    monkeypatch.setattr(replicas, "pick_replica", lambda: "replica1")
+    instance = Product()
+    instance._state.db = "default"
+    with use_replica():
+        assert ReplicaRouter().db_for_read(Product, instance=instance) == "default"
+
+
+def test_replica_picked_once_per_scope(monkeypatch):
+    picks = iter(["replica1", "replica2"])
+    monkeypatch.setattr(replicas, "pick_replica", lambda: next(picks))
+    router = ReplicaRouter()
+
+    with use_replica():
+        assert {router.db_for_read(Product) for _ in range(3)} == {"replica1"}
+    with use_replica():
+        assert router.db_for_read(Product) == "replica2"
+
+
+def test_lag_probe_uses_short_timeouts(settings):
+    settings.REPLICA_PROBE_TIMEOUT = 1.5
+    params = replicas.probe_params("default")
+
+    assert params["connect_timeout"] == 2
+    assert "statement_timeout=1500" in params["options"]
+    assert "pool" not in params
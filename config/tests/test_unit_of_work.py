@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+from config.unit_of_work import flush_pending, in_unit_of_work, mark_dirty, unit_of_work
+
+
+class Dirty:
+    _meta = SimpleNamespace(label="tests.Dirty")
+
+    def __init__(self, pk):
+        self.pk = pk
+        self.calls = 0
+
+    def recompute(self):
+        self.calls += 1
+
+
+def test_mark_dirty_outside_scope_runs_immediately():
+    obj = Dirty(1)
+    mark_dirty(obj, "recompute")
+    mark_dirty(obj, "recompute")
+    assert obj.calls == 2
+    assert not in_unit_of_work()
+
+
+@pytest.mark.django_db
+def test_nested_scopes_recompute_each_entity_once():
+    first, second = Dirty(1), Dirty(2)
+    with unit_of_work():
+        for _ in range(3):
+            with unit_of_work():
+                mark_dirty(first, "recompute")
+                mark_dirty(Dirty(1), "recompute")  # bir xil pk — birinchi instance
+        mark_dirty(second, "recompute")
+        assert first.calls == second.calls == 0
+    assert (first.calls, second.calls) == (1, 1)
+    assert not in_unit_of_work()
+
+
+@pytest.mark.django_db
+def test_failed_savepoint_discards_its_marks():
+    kept, dropped = Dirty(1), Dirty(2)
+    with unit_of_work():
+        mark_dirty(kept, "recompute")
+        with pytest.raises(ValueError):
+            with unit_of_work():
+                mark_dirty(dropped, "recompute")
+                raise ValueError
+    assert (kept.calls, dropped.calls) == (1, 0)
+
+
+@pytest.mark.django_db
+def test_flush_pending_runs_the_mark_now_and_once():
+    obj = Dirty(1)
+    with unit_of_work():
+        mark_dirty(obj, "recompute")
+        flush_pending(Dirty(2), "recompute")  # boshqa obyekt — tegmaydi
+        assert obj.calls == 0
+        flush_pending(obj, "recompute")
+        assert obj.calls == 1
+    assert obj.calls == 1
@@ -0,0 +1,119 @@
+"""
+Tranzaksiya doirasidagi unit-of-work.
+
+Ko‘p qatorli yozuvlarda (mahsulot + N ta StockEntry, hujjat + N ta mahsulot,
+buyurtmani o‘chirish) bir xil hosila qiymat har qator uchun qayta hisoblanardi.
+`unit_of_work()` ichida model hook'lari hisoblashni darhol bajarmaydi, faqat
+"iflos" deb belgilaydi; eng tashqi blok commit'dan oldin (o‘sha tranzaksiya
+ichida) har bir obyektni bir marta qayta hisoblaydi.
+
+Blokdan tashqarida `mark_dirty` / `add_delta` darhol bajariladi — eski xatti-harakat.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+
+_work = ContextVar("unit_of_work", default=None)
+
+
+class _Work:
+    def __init__(self):
+        # (label, pk, method) -> instance; tartib saqlanadi
+        self.recompute = {}
+        # (label, pk) -> [instance, {field: summa}]
+        self.deltas = {}
+
+    def snapshot(self):
+        return dict(self.recompute), {
+            key: [instance, dict(amounts)] for key, (instance, amounts) in self.deltas.items()
+        }
+
+    def restore(self, state):
+        self.recompute, self.deltas = state
+
+    def flush(self):
+        # delta'lar avval: recompute ular yozgan qiymatni ko‘rishi kerak
+        while self.deltas or self.recompute:
+            deltas, self.deltas = self.deltas, {}
+            for instance, amounts in deltas.values():
+                _apply_deltas(instance, amounts)
+
+            # qayta hisoblash yangi obyektni belgilashi mumkin — navbat bo‘shaguncha
+            recompute, self.recompute = self.recompute, {}
+            for (_, _, method), instance in recompute.items():
+                getattr(instance, method)()
+
+
+def in_unit_of_work():
+    return _work.get() is not None
+
+
+@contextmanager
+def unit_of_work(using=None):
+    """
+    transaction.atomic o‘rniga (kontekst menejer yoki dekorator). Ichma-ich bloklar
+    savepoint bo‘ladi, qayta hisoblash faqat eng tashqisida. Savepoint xato bilan
+    bekor qilinsa, uning ichida qo‘yilgan belgilar va delta'lar ham bekor bo‘ladi.
+    """
+    work = _work.get()
+    if work is not None:
+        state = work.snapshot()
+        try:
+            with transaction.atomic(using=using):
+                yield
+        except BaseException:
+            work.restore(state)
+            raise
+        return
+
+    work = _Work()
+    _work.set(work)
+    try:
+        with transaction.atomic(using=using):
+            yield
+            work.flush()
+    finally:
+        _work.set(None)
+
+
+def mark_dirty(instance, method):
+    """`instance.method()` ni blok oxirida bir marta chaqiradi (birinchi berilgan instance'da)."""
+    work = _work.get()
+    if work is None or instance.pk is None:
+        getattr(instance, method)()
+        return
+    work.recompute.setdefault((instance._meta.label, instance.pk, method), instance)
+
+
+def flush_pending(instance, method):
+    """
+    Blok ichida kutilayotgan `instance.method()` ni hozir bajaradi — hosila qiymat
+    (masalan Product.count / enter_price) o‘qilishidan oldin, eskisi o‘qilmasin.
+    """
+    work = _work.get()
+    if work is None or instance.pk is None:
+        return
+    if work.recompute.pop((instance._meta.label, instance.pk, method), None) is not None:
+        # navbatdagi boshqa nusxa emas, o‘qiyotgan nusxa yangilanadi
+        getattr(instance, method)()
+
+
+def _apply_deltas(instance, amounts):
+    changed = {field: F(field) + amount for field, amount in amounts.items() if amount}
+    if changed:
+        type(instance)._base_manager.filter(pk=instance.pk).update(**changed)
+    instance.refresh_from_db(fields=list(amounts))
+
+
+def add_delta(instance, **amounts):
+    """add_delta(obj, balance=x) -> `balance = balance + x`; blok ichida obyekt bo‘yicha bitta UPDATE."""
+    work = _work.get()
+    if work is None:
+        _apply_deltas(instance, amounts)
+        return
+    _, pending = work.deltas.setdefault((instance._meta.label, instance.pk), [instance, {}])
+    for name, value in amounts.items():
+        pending[name] = pending.get(name, Decimal("0")) + value
@@ -6,6 +6,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from config.views import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Your API Title",
@@ -24,6 +26,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('platform/', include('config.platform')),
     path('notifications/', include('notifications.urls')),
+    path('metrics', metrics_view, name='metrics'),
 
 
     re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
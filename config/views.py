@@ -1,6 +1,12 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from rest_framework import viewsets
 from django_filters import rest_framework as filters
 from auditlog.models import LogEntry
+from .metrics import registry
+from .pool import collect_pool_metrics
 from .serializers import LogEntrySerializer
 
 class LogEntryFilter(filters.FilterSet):
@@ -24,3 +30,15 @@ class LogEntryViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['object_repr', 'changes', 'actor__username']
     ordering_fields = ['timestamp', 'actor__username', 'content_type__model']
     ordering = ['-timestamp']
+
+
+def metrics_view(request):
+    """Prometheus text formatidagi jarayon ichidagi metrikalar (METRICS_TOKEN yoki staff)."""
+    token = settings.METRICS_TOKEN
+    authorized = (token and hmac.compare_digest(request.headers.get("X-Metrics-Token", ""), token)) or (
+        request.user.is_authenticated and request.user.is_staff
+    )
+    if not authorized:
+        return HttpResponseForbidden()
+    collect_pool_metrics()
+    return HttpResponse(registry.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,43 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+
+RATE = Decimal("12500")
+
+
+@pytest.fixture
+def chief(db):
+    from platform_user.models import PlatformUser
+
+    user = get_user_model().objects.create_user(username="chief", password="x", phone_number="+998900000001")
+    return PlatformUser.objects.create(user=user, is_verified=True)
+
+
+@pytest.fixture
+def store(chief):
+    from cashbox.models import Cashbox
+    from store.models import Store
+
+    store = Store.objects.create(name="Do‘kon", owner=chief)
+    Cashbox.objects.get_or_create(store=store)
+    return store
+
+
+@pytest.fixture
+def make_product(store):
+    """make_product(quantity, unit_price) — javonda `quantity` dona qoldig‘i bor mahsulot."""
+    from product.models import Product, StockEntry
+
+    def make(quantity=10, unit_price="4", out_price="10", name="Mahsulot"):
+        product = Product.objects.create(
+            name=name, store=store, out_price=Decimal(out_price), exchange_rate=RATE,
+        )
+        if quantity:
+            StockEntry.objects.create(
+                product=product, quantity=quantity, unit_price=Decimal(unit_price), exchange_rate=RATE,
+            )
+        product.refresh_from_db()
+        return product
+
+    return make
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:37
+
+import hashlib
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Device.FINGERPRINT_FIELDS / make_fingerprint nusxasi — migratsiya joriy modelga bog‘lanmasin
+FINGERPRINT_FIELDS = ('device_type', 'os', 'browser', 'brand', 'model', 'ip_address', 'where')
+
+
+def make_fingerprint(device):
+    raw = "|".join(str(getattr(device, name) or "") for name in FINGERPRINT_FIELDS)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def backfill_fingerprints(apps, schema_editor):
+    Device = apps.get_model('device', 'Device')
+    batch = []
+    for device in Device.objects.filter(fingerprint__isnull=True).iterator(chunk_size=2000):
+        device.fingerprint = make_fingerprint(device)
+        batch.append(device)
+        if len(batch) >= 2000:
+            Device.objects.bulk_update(batch, ['fingerprint'])
+            batch = []
+    Device.objects.bulk_update(batch, ['fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('device', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user', 'fingerprint'], name='device_active_fingerprint_idx'),
+        ),
+    ]
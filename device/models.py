@@ -1,3 +1,5 @@
+import hashlib
+
 from django.db import models
 from accounts.models import CustomUser
 
@@ -22,6 +24,7 @@ class Device(models.Model):
     last_login = models.DateTimeField(auto_now=True)
 
     refresh_token = models.CharField(max_length=500, blank=True, null=True)
+    fingerprint = models.CharField(max_length=64, blank=True, null=True, editable=False)
 
     is_active = models.BooleanField(default=True)
 
@@ -31,6 +34,26 @@ class Device(models.Model):
         verbose_name = "Qurilma"
         verbose_name_plural = "Qurilmalar"
         ordering = ['-last_login']
+        indexes = [
+            models.Index(
+                fields=['user', 'fingerprint'],
+                condition=models.Q(is_active=True),
+                name='device_active_fingerprint_idx',
+            ),
+        ]
+
+    FINGERPRINT_FIELDS = ('device_type', 'os', 'browser', 'brand', 'model', 'ip_address', 'where')
+
+    @classmethod
+    def make_fingerprint(cls, **attrs):
+        raw = "|".join(str(attrs.get(name) or "") for name in cls.FINGERPRINT_FIELDS)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.fingerprint = self.make_fingerprint(
+            **{name: getattr(self, name) for name in self.FINGERPRINT_FIELDS}
+        )
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.user.phone_number} — {self.device_type} ({self.os})"
\ No newline at end of file
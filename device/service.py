@@ -0,0 +1,53 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .models import Device
+
+
+class DeviceService:
+
+    @staticmethod
+    def logout_all(user_id):
+        """
+        Foydalanuvchining barcha amaldagi refresh token'larini qora ro‘yxatga qo‘shadi
+        va qurilmalarini o‘chiradi — bitta SQL (INSERT ... SELECT + UPDATE, CTE orqali).
+        """
+        qn = connection.ops.quote_name
+        outstanding = qn(OutstandingToken._meta.db_table)
+        blacklisted = qn(BlacklistedToken._meta.db_table)
+        devices = qn(Device._meta.db_table)
+        now = timezone.now()
+
+        sql = f"""
+            WITH revoked AS (
+                INSERT INTO {blacklisted} (token_id, blacklisted_at)
+                SELECT o.id, %s FROM {outstanding} o
+                WHERE o.user_id = %s AND o.expires_at > %s
+                ON CONFLICT (token_id) DO NOTHING
+            )
+            UPDATE {devices} SET is_active = FALSE, refresh_token = NULL
+            WHERE user_id = %s AND (is_active OR refresh_token IS NOT NULL)
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [now, user_id, now, user_id])
+            return cursor.rowcount
+
+    @staticmethod
+    def prune_expired_tokens(chunk_size=5000):
+        """Muddati o‘tgan outstanding/blacklisted token'larni bo‘laklab o‘chiradi."""
+        now = timezone.now()
+        deleted = 0
+        while True:
+            ids = list(
+                OutstandingToken.objects
+                .filter(expires_at__lte=now)
+                .order_by()
+                .values_list('id', flat=True)[:chunk_size]
+            )
+            if not ids:
+                return deleted
+            with transaction.atomic():
+                BlacklistedToken.objects.filter(token_id__in=ids).delete()
+                count, _ = OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted += count
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .service import DeviceService
+
+
+@shared_task
+def prune_expired_tokens(chunk_size=5000):
+    return DeviceService.prune_expired_tokens(chunk_size=chunk_size)
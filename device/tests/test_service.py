@@ -0,0 +1,26 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from device.models import Device
+from device.service import DeviceService
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+def test_logout_all_blacklists_tokens_in_one_query(django_assert_num_queries):
+    user = User.objects.create_user(username="dev", password="x", phone_number="+998900000020")
+    for _ in range(3):
+        Device.objects.create(
+            user=user, device_type="mobile", os="android", browser="app",
+            refresh_token=str(RefreshToken.for_user(user)),
+        )
+
+    with django_assert_num_queries(1):
+        DeviceService.logout_all(user.pk)
+
+    assert BlacklistedToken.objects.filter(token__user=user).count() == 3
+    assert not Device.objects.filter(user=user, is_active=True).exists()
@@ -4,9 +4,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from rest_framework.exceptions import NotFound, PermissionDenied
 from .models import Device
-from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import DeviceSerializer
+from .service import DeviceService
 
 
 class DeviceListView(APIView):
@@ -45,15 +45,6 @@ class LogoutAllDevicesView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        user = request.user
-
-        tokens = OutstandingToken.objects.filter(user=user)
-        for token in tokens:
-            try:
-                BlacklistedToken.objects.get_or_create(token=token)
-            except Exception:
-                pass
-
-        Device.objects.filter(user=user).update(is_active=False, refresh_token=None)
+        DeviceService.logout_all(request.user.pk)
 
         return Response({"detail": "Siz barcha qurilmalardan muvaffaqiyatli chiqdingiz."}, status=status.HTTP_200_OK)
\ No newline at end of file
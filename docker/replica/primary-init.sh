@@ -0,0 +1,4 @@
+#!/bin/bash
+# Primary: replica konteyneriga replication ulanishiga ruxsat
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
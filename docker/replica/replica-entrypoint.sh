@@ -0,0 +1,13 @@
+#!/bin/bash
+# Replica: birinchi ishga tushishda primary'dan pg_basebackup, keyin hot standby
+set -e
+export PGPASSWORD="$POSTGRES_PASSWORD"
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    until pg_isready -h postgres -U "$POSTGRES_USER"; do sleep 1; done
+    rm -rf "$PGDATA"/*
+    pg_basebackup -h postgres -U "$POSTGRES_USER" -D "$PGDATA" -X stream -R -P
+    chmod 0700 "$PGDATA"
+fi
+
+exec postgres -c hot_standby=on
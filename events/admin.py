@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import ConsumedEvent, OutboxEvent
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'type', 'aggregate_id', 'store_id', 'created_at', 'processed_at', 'attempts')
+    list_filter = ('type',)
+    search_fields = ('aggregate_id',)
+    readonly_fields = [f.name for f in OutboxEvent._meta.fields]
+
+
+@admin.register(ConsumedEvent)
+class ConsumedEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'subscriber', 'event', 'consumed_at')
+    list_filter = ('subscriber',)
+    list_select_related = ('event',)
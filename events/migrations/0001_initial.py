@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:03
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('OrderPlaced', 'Buyurtma yaratildi'), ('StockMoved', 'Zaxira harakati'), ('CashPosted', 'Kassa yozuvi'), ('DebtDocumentChanged', 'Qarz hujjati o‘zgardi')], max_length=32)),
+                ('aggregate_id', models.BigIntegerField()),
+                ('store_id', models.IntegerField(blank=True, null=True)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'Outbox hodisasi',
+                'verbose_name_plural': 'Outbox hodisalari',
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['available_at', 'id'], name='outbox_pending_idx'), models.Index(fields=['type', 'aggregate_id'], name='outbox_aggregate_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ConsumedEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subscriber', models.CharField(max_length=100)),
+                ('consumed_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='consumptions', to='events.outboxevent')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('subscriber', 'event'), name='uniq_subscriber_event')],
+            },
+        ),
+    ]
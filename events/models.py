@@ -0,0 +1,58 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class EventType(models.TextChoices):
+    ORDER_PLACED = "OrderPlaced", "Buyurtma yaratildi"
+    STOCK_MOVED = "StockMoved", "Zaxira harakati"
+    CASH_POSTED = "CashPosted", "Kassa yozuvi"
+    DEBT_DOCUMENT_CHANGED = "DebtDocumentChanged", "Qarz hujjati o‘zgardi"
+
+
+class OutboxEvent(models.Model):
+    """
+    Yozuvchi tranzaksiya ichida saqlanadigan domen hodisasi. Commit'dan keyin
+    events.tasks.dispatch_events uni obunachilarga tarqatadi.
+    """
+    id = models.BigAutoField(primary_key=True)
+    type = models.CharField(max_length=32, choices=EventType.choices)
+    aggregate_id = models.BigIntegerField()
+    store_id = models.IntegerField(null=True, blank=True)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = "Outbox hodisasi"
+        verbose_name_plural = "Outbox hodisalari"
+        indexes = [
+            # faqat kutayotgan hodisalar — jadval o‘ssa ham kichik
+            models.Index(fields=['available_at', 'id'], name='outbox_pending_idx',
+                         condition=Q(processed_at__isnull=True)),
+            models.Index(fields=['type', 'aggregate_id'], name='outbox_aggregate_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.type} #{self.aggregate_id} ({self.pk})"
+
+
+class ConsumedEvent(models.Model):
+    """Obunachi hodisani qayta ishlaganini qayd etadi — takroriy yetkazishda o‘tkazib yuboriladi."""
+    subscriber = models.CharField(max_length=100)
+    event = models.ForeignKey(OutboxEvent, on_delete=models.CASCADE, related_name='consumptions')
+    consumed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['subscriber', 'event'], name='uniq_subscriber_event'),
+        ]
+
+    def __str__(self):
+        return f"{self.subscriber} <- {self.event_id}"
@@ -0,0 +1,117 @@
+"""
+Transactional outbox.
+
+`publish()` hodisani joriy tranzaksiyada yozadi — yozuv bekor qilinsa, hodisa ham
+yo‘qoladi. Commit'dan keyin dispatch_events vazifasi bir marta navbatga qo‘yiladi;
+u yetib bormasa ham beat har daqiqada kutayotgan hodisalarni oladi.
+
+Har bir obunachi hodisani o‘z tranzaksiyasida qayta ishlaydi va ConsumedEvent
+yozadi, shuning uchun qayta yetkazishda (retry, parallel worker) DB o‘zgarishlari
+bir marta qo‘llanadi. Tashqi ta'sirlar (notification) esa "kamida bir marta".
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ConsumedEvent, OutboxEvent
+from .registry import subscribers_for
+
+logger = logging.getLogger("project")
+
+
+def publish(event_type, aggregate_id, store_id=None, **payload):
+    event = OutboxEvent.objects.create(
+        type=event_type,
+        aggregate_id=aggregate_id,
+        store_id=store_id,
+        payload=payload,
+    )
+    _schedule_dispatch()
+    return event
+
+
+def _kick():
+    from .tasks import dispatch_events
+    dispatch_events.delay()
+
+
+def _schedule_dispatch():
+    if not settings.EVENTS_DISPATCH_ON_COMMIT:
+        return
+    connection = transaction.get_connection()
+    # bitta tranzaksiyada bir nechta hodisa — bitta vazifa
+    if connection.in_atomic_block and any(func is _kick for _, func, _ in connection.run_on_commit):
+        return
+    transaction.on_commit(_kick, robust=True)
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(2 ** attempts * 5, 3600))
+
+
+def process_event(event):
+    """Barcha obunachilarni ishga tushiradi. Hammasi muvaffaqiyatli bo‘lsa True."""
+    done = set(ConsumedEvent.objects.filter(event=event).values_list('subscriber', flat=True))
+    errors = []
+    for name, handler in subscribers_for(event.type):
+        if name in done:
+            continue
+        try:
+            with transaction.atomic():
+                # uniq_subscriber_event: parallel worker allaqachon yozgan bo‘lsa — o‘tkazib yuboriladi
+                _, created = ConsumedEvent.objects.get_or_create(subscriber=name, event=event)
+                if created:
+                    handler(event)
+        except Exception as exc:
+            logger.exception("Hodisa %s: %s obunachisi xato berdi", event.pk, name)
+            errors.append(f"{name}: {exc!r}")
+
+    now = timezone.now()
+    if not errors:
+        event.processed_at = now
+        event.last_error = ""
+    else:
+        event.attempts += 1
+        event.last_error = "\n".join(errors)[:4000]
+        if event.attempts >= settings.EVENTS_MAX_ATTEMPTS:
+            # dead letter: processed_at bor, last_error bo‘sh emas
+            logger.error("Hodisa %s %s urinishdan keyin to‘xtatildi", event.pk, event.attempts)
+            event.processed_at = now
+        else:
+            event.available_at = now + _retry_delay(event.attempts)
+    event.save(update_fields=['processed_at', 'attempts', 'last_error', 'available_at'])
+    return not errors
+
+
+def _pending():
+    return OutboxEvent.objects.filter(processed_at__isnull=True, available_at__lte=timezone.now())
+
+
+def dispatch_pending(batch_size=None, max_batches=50):
+    """
+    Kutayotgan hodisalarni id tartibida qayta ishlaydi. Har bir hodisa o‘z tranzaksiyasida
+    (SKIP LOCKED) — qator faqat o‘sha hodisa ishlanayotganda band, bir nechta worker xavfsiz.
+    """
+    batch_size = batch_size or settings.EVENTS_BATCH_SIZE
+    processed = 0
+    for _ in range(max_batches):
+        ids = list(_pending().order_by('id').values_list('id', flat=True)[:batch_size])
+        for pk in ids:
+            with transaction.atomic():
+                event = _pending().select_for_update(skip_locked=True).filter(pk=pk).first()
+                if event is not None:
+                    process_event(event)
+                    processed += 1
+        if len(ids) < batch_size:
+            break
+    return processed
+
+
+def purge_processed(days=None):
+    days = settings.EVENTS_RETENTION_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = OutboxEvent.objects.filter(processed_at__lt=cutoff, last_error="").delete()
+    return deleted
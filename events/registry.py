@@ -0,0 +1,26 @@
+from collections import defaultdict
+
+_subscribers = defaultdict(list)
+
+
+def subscriber(*event_types, name=None):
+    """
+    Hodisa iste'molchisini ro‘yxatdan o‘tkazadi:
+
+        @subscriber(EventType.ORDER_PLACED)
+        def notify_order_placed(event): ...
+
+    `name` idempotentlik kaliti (ConsumedEvent.subscriber) — o‘zgartirilsa, eski
+    hodisalar qayta ishlanadi. Default: module.funksiya.
+    """
+    def decorator(func):
+        key = name or f"{func.__module__}.{func.__name__}"
+        for event_type in event_types:
+            if all(existing != key for existing, _ in _subscribers[event_type]):
+                _subscribers[event_type].append((key, func))
+        return func
+    return decorator
+
+
+def subscribers_for(event_type):
+    return list(_subscribers.get(event_type, ()))
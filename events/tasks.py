@@ -0,0 +1,13 @@
+from celery import shared_task
+
+from .outbox import dispatch_pending, purge_processed
+
+
+@shared_task(ignore_result=True)
+def dispatch_events():
+    return dispatch_pending()
+
+
+@shared_task
+def purge_events():
+    return purge_processed()
@@ -0,0 +1,36 @@
+import pytest
+
+from events import registry
+from events.models import ConsumedEvent, EventType, OutboxEvent
+from events.outbox import process_event
+from events.registry import subscriber, subscribers_for
+
+
+def test_app_subscribers_registered():
+    names = {name for name, _ in subscribers_for(EventType.CASH_POSTED)}
+    assert "cashbox.subscribers.reconcile_cashbox_balance" in names
+
+
+@pytest.mark.django_db
+def test_process_event_runs_each_subscriber_once(monkeypatch):
+    monkeypatch.setattr(registry, "_subscribers", registry.defaultdict(list))
+    calls = []
+
+    @subscriber("Test", name="ok")
+    def ok(event):
+        calls.append(event.pk)
+
+    @subscriber("Test", name="broken")
+    def broken(event):
+        raise RuntimeError("boom")
+
+    event = OutboxEvent.objects.create(type="Test", aggregate_id=1, payload={})
+    assert process_event(event) is False
+    assert event.processed_at is None
+    assert event.attempts == 1
+    assert "broken" in event.last_error
+
+    # retry: muvaffaqiyatli obunachi qayta ishlamaydi
+    assert process_event(event) is False
+    assert calls == [event.pk]
+    assert ConsumedEvent.objects.filter(event=event).count() == 1
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:46
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('expense', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='expense',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['store', 'date'], name='expense_store_date_live_idx'),
+        ),
+    ]
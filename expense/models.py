@@ -5,7 +5,7 @@ from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
 
 from cashbox.models import CashTransaction
 from cashbox.service import CashboxService
-from platform_user.exchange import get_default_exchange_rate
+from platform_user.exchange import get_default_exchange_rate, get_platform_user_rate
 from platform_user.models import PlatformUser
 from store.models import Store
 
@@ -64,6 +64,10 @@ class Expense(models.Model):
         verbose_name = "Do'kon xarajati"
         verbose_name_plural = "Do'kon xarajatlari"
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['store', 'date'], name='expense_store_date_live_idx',
+                         condition=models.Q(is_deleted=False)),
+        ]
 
     # ---------- VALIDATION ----------
     def clean(self):
@@ -87,20 +91,24 @@ class Expense(models.Model):
 
     # ---------- UTIL ----------
     def _get_owner_rate_safely(self):
-        """Ustuvorlik: expense.user → store.owner → current authenticated user"""
+        """Ustuvorlik: expense.user → store.owner → current authenticated user (kurs cache'dan)"""
         try:
-            if self.user and getattr(self.user, "usd_rate", None):
-                return self.user.usd_rate.rate
+            if self.user:
+                rate = get_platform_user_rate(self.user)
+                if rate:
+                    return rate
         except Exception:
             pass
         try:
             owner = getattr(self.store, "owner", None)
-            if owner and getattr(owner, "usd_rate", None):
-                return owner.usd_rate.rate
+            if owner:
+                rate = get_platform_user_rate(owner)
+                if rate:
+                    return rate
         except Exception:
             pass
         try:
-            from django_currentuser.middleware import get_current_authenticated_user
+            from config.current_user import get_current_authenticated_user
             u = get_current_authenticated_user()
             if u:
                 return get_default_exchange_rate(u)
@@ -154,7 +162,7 @@ class Expense(models.Model):
     def save(self, *args, **kwargs):
         if not self.user:
             try:
-                from django_currentuser.middleware import get_current_authenticated_user
+                from config.current_user import get_current_authenticated_user
                 cu = get_current_authenticated_user()
                 if cu and hasattr(cu, "platform_profile"):
                     self.user = cu.platform_profile
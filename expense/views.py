@@ -1,12 +1,13 @@
 # expense/views.py
 from rest_framework import viewsets, permissions
 from staffs.mixins import StoreIDMixin
+from config.replicas import ReplicaReadMixin
 from staffs.permissions import StoreStaffPermission
 from .models import Expense
 from .serializers import ExpenseSerializer
 from rest_framework import serializers
 
-class ExpenseViewSet(StoreIDMixin, viewsets.ModelViewSet):
+class ExpenseViewSet(ReplicaReadMixin, StoreIDMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, StoreStaffPermission]
     serializer_class = ExpenseSerializer
     # OLD: http_method_names = ['get', 'post', 'delete']
@@ -16,7 +17,7 @@ class ExpenseViewSet(StoreIDMixin, viewsets.ModelViewSet):
         store_id = self.kwargs.get('store_id')
         if not store_id:
             return Expense.objects.none()
-        return Expense.objects.filter(store=store_id)
+        return Expense.objects.filter(store=store_id).select_related('store')
 
     def perform_create(self, serializer):
         store_id = self.kwargs.get('store_id')
@@ -1,7 +1,7 @@
 from django.contrib import admin, messages
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
-from .models import DebtUser, DebtDocument, DocumentProduct, DebtImportOffer
+from .models import DebtUser, DebtDocument, DocumentProduct, DebtImportOffer, DebtAgeing
 from django.db.models import Sum
 
 class DocumentProductInline(admin.TabularInline):
@@ -218,4 +218,19 @@ class DocumentProductAdmin(admin.ModelAdmin):
 class DebtImportOfferAdmin(admin.ModelAdmin):
     list_display = ("id", "debtor_user", "status", "created_by", "applied_store", "applied_document", "created_at", "expires_at")
     search_fields = ("debtor_user__username", "debtor_user__phone_number")
-    list_filter = ("status", "created_at")
\ No newline at end of file
+    list_filter = ("status", "created_at")
+
+
+@admin.register(DebtAgeing)
+class DebtAgeingAdmin(admin.ModelAdmin):
+    list_display = ("debtuser", "store", "balance_usd", "bucket_0_30", "bucket_31_60", "bucket_61_90",
+                    "bucket_90_plus", "oldest_open_date", "computed_at")
+    list_filter = ("store",)
+    search_fields = ("debtuser__first_name", "debtuser__last_name", "debtuser__phone_number")
+
+    # loan.ageing hisoblaydi — qo‘lda tahrir yo‘q
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
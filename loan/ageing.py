@@ -0,0 +1,104 @@
+"""
+Qarz yoshi (ageing) — DebtAgeing jadvalini yangilash.
+
+Debitorning USD balansi eng yangi transfer hujjatlariga (yangidan eskiga) taqsimlanadi —
+to‘lovlar eng eski qarzni yopadi deb hisoblanadi — va har bir qism hujjat yoshiga ko‘ra
+0–30 / 31–60 / 61–90 / 90+ kunlik bucket'ga tushadi.
+"""
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+
+from django.utils import timezone
+
+from .models import DebtAgeing, DebtDocument, DebtUser
+
+BUCKETS = (
+    ("bucket_0_30", "0-30", 30),
+    ("bucket_31_60", "31-60", 60),
+    ("bucket_61_90", "61-90", 90),
+    ("bucket_90_plus", ">90", None),
+)
+D0 = Decimal("0")
+
+
+def _bucket_for(days):
+    for field, _, upper in BUCKETS:
+        if upper is None or days <= upper:
+            return field
+
+
+def age_balance(outstanding, transfers, as_of):
+    """
+    outstanding: USD balans; transfers: (date, amount_usd) yangidan eskiga.
+    -> ({bucket: summa}, eng eski ochiq transfer sanasi)
+    """
+    buckets = {field: D0 for field, _, _ in BUCKETS}
+    remaining = outstanding
+    oldest = None
+    for date, amount in transfers:
+        if remaining <= 0:
+            break
+        part = min(remaining, amount)
+        buckets[_bucket_for((as_of - date).days)] += part
+        remaining -= part
+        oldest = date
+    if remaining > 0:
+        # kurs farqi / qo‘lda tahrir: transferlardan ortgan qism eng eski ochiq qarzga
+        buckets[_bucket_for((as_of - oldest).days) if oldest else BUCKETS[0][0]] += remaining
+    return buckets, oldest
+
+
+def refresh_ageing(store_id=None, debtuser_ids=None, as_of=None):
+    """Berilgan do‘kon yoki debitorlar uchun DebtAgeing'ni qayta yozadi (upsert). Qatorlar soni."""
+    as_of = as_of or timezone.now()
+    debtors = DebtUser.objects.all()
+    if store_id is not None:
+        debtors = debtors.filter(store_id=store_id)
+    if debtuser_ids is not None:
+        debtors = debtors.filter(pk__in=debtuser_ids)
+    debtors = {
+        d["id"]: d
+        for d in debtors.values("id", "store_id", "balance_usd")
+    }
+    if not debtors:
+        return 0
+
+    docs = (
+        DebtDocument.objects
+        .filter(debtuser_id__in=list(debtors), is_deleted=False)
+        .order_by("debtuser_id", "-date", "-id")
+        .values_list("debtuser_id", "date", "method", "total_usd")
+    )
+    history = {
+        debtuser_id: list(rows)
+        for debtuser_id, rows in groupby(docs.iterator(chunk_size=2000), key=itemgetter(0))
+    }
+
+    rows = []
+    for debtuser_id, debtor in debtors.items():
+        documents = history.get(debtuser_id, [])
+        balance_usd = debtor["balance_usd"]
+        transfers = ((date, total_usd) for _, date, method, total_usd in documents if method == "transfer")
+        buckets, oldest = age_balance(balance_usd, transfers, as_of)
+        rows.append(DebtAgeing(
+            debtuser_id=debtuser_id,
+            store_id=debtor["store_id"],
+            balance_usd=balance_usd,
+            oldest_open_date=oldest,
+            last_activity=documents[0][1] if documents else None,
+            computed_at=as_of,
+            **buckets,
+        ))
+
+    DebtAgeing.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["debtuser"],
+        update_fields=[
+            "store", "balance_usd", *(field for field, _, _ in BUCKETS),
+            "oldest_open_date", "last_activity", "computed_at",
+        ],
+    )
+    return len(rows)
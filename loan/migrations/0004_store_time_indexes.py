@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:45
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('loan', '0003_debtimportoffer'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='debtdocument',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['store', 'date'], name='debtdoc_store_date_live_idx'),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:14
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+LEDGER_VIEW_SQL = """
+CREATE VIEW loan_debt_ledger AS
+SELECT l.*,
+       SUM(l.amount) OVER (PARTITION BY l.debtuser_id ORDER BY l.date, l.id) AS balance
+FROM (
+    SELECT d.id, d.debtuser_id, d.store_id, d.date, d.method, d.currency, d.exchange_rate,
+           d.cash_amount, d.product_amount, d.total_amount,
+           ROUND(
+               (CASE WHEN d.method = 'transfer' THEN 1 ELSE -1 END) *
+               (CASE WHEN d.currency = u.currency THEN d.total_amount
+                     WHEN u.currency = 'USD' THEN d.total_amount / NULLIF(u.exchange_rate, 0)
+                     ELSE d.total_amount * u.exchange_rate END),
+               6
+           ) AS amount
+    FROM loan_debtdocument d
+    JOIN loan_debtuser u ON u.id = d.debtuser_id
+    WHERE NOT d.is_deleted
+) l
+"""
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('loan', '0004_store_time_indexes'),
+        ('store', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DebtLedgerEntry',
+            fields=[
+                ('document', models.OneToOneField(db_column='id', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to='loan.debtdocument')),
+                ('date', models.DateTimeField()),
+                ('method', models.CharField(choices=[('transfer', 'Transfer'), ('accept', 'Accept')], max_length=10)),
+                ('currency', models.CharField(choices=[('USD', 'USD'), ('UZS', 'UZS')], max_length=3)),
+                ('exchange_rate', models.DecimalField(decimal_places=6, max_digits=20)),
+                ('cash_amount', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('product_amount', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('amount', models.DecimalField(decimal_places=6, max_digits=30)),
+                ('balance', models.DecimalField(decimal_places=6, max_digits=30)),
+            ],
+            options={
+                'db_table': 'loan_debt_ledger',
+                'ordering': ['date', 'document_id'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='DebtAgeing',
+            fields=[
+                ('debtuser', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ageing', serialize=False, to='loan.debtuser')),
+                ('balance_usd', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=20)),
+                ('bucket_0_30', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=20)),
+                ('bucket_31_60', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=20)),
+                ('bucket_61_90', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=20)),
+                ('bucket_90_plus', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=20)),
+                ('oldest_open_date', models.DateTimeField(blank=True, null=True)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Qarz yoshi',
+                'verbose_name_plural': 'Qarz yoshi',
+            },
+        ),
+        AddIndexConcurrently(
+            model_name='debtdocument',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['debtuser', 'date', 'id'], name='debtdoc_ledger_idx'),
+        ),
+        migrations.AddField(
+            model_name='debtageing',
+            name='store',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='debt_ageing', to='store.store'),
+        ),
+        migrations.AddIndex(
+            model_name='debtageing',
+            index=models.Index(fields=['store', '-balance_usd'], name='debtageing_store_balance_idx'),
+        ),
+        migrations.RunSQL(LEDGER_VIEW_SQL, reverse_sql='DROP VIEW IF EXISTS loan_debt_ledger'),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:17
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('loan', '0005_debt_ageing_ledger'),
+        ('store', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='debtimportoffer',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['debtor_user', '-created_at'], name='debtoffer_pending_idx'),
+        ),
+    ]
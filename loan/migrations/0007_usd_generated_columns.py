@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:19
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loan', '0006_debtoffer_pending_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='debtdocument',
+            name='cash_usd',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('currency', 'UZS'), ('exchange_rate__gt', 0)), then=django.db.models.expressions.CombinedExpression(models.F('cash_amount'), '/', models.F('exchange_rate'))), default=models.F('cash_amount'), output_field=models.DecimalField(decimal_places=6, max_digits=30)), output_field=models.DecimalField(decimal_places=6, max_digits=30)),
+        ),
+        migrations.AddField(
+            model_name='debtdocument',
+            name='product_usd',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('currency', 'UZS'), ('exchange_rate__gt', 0)), then=django.db.models.expressions.CombinedExpression(models.F('product_amount'), '/', models.F('exchange_rate'))), default=models.F('product_amount'), output_field=models.DecimalField(decimal_places=6, max_digits=30)), output_field=models.DecimalField(decimal_places=6, max_digits=30)),
+        ),
+        migrations.AddField(
+            model_name='debtdocument',
+            name='total_usd',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('currency', 'UZS'), ('exchange_rate__gt', 0)), then=django.db.models.expressions.CombinedExpression(models.F('total_amount'), '/', models.F('exchange_rate'))), default=models.F('total_amount'), output_field=models.DecimalField(decimal_places=6, max_digits=30)), output_field=models.DecimalField(decimal_places=6, max_digits=30)),
+        ),
+        migrations.AddField(
+            model_name='debtuser',
+            name='balance_usd',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('currency', 'UZS'), ('exchange_rate__gt', 0)), then=django.db.models.expressions.CombinedExpression(models.F('balance'), '/', models.F('exchange_rate'))), default=models.F('balance'), output_field=models.DecimalField(decimal_places=6, max_digits=30)), output_field=models.DecimalField(decimal_places=6, max_digits=30)),
+        ),
+        migrations.AddField(
+            model_name='documentproduct',
+            name='amount_usd',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('currency', 'UZS'), ('exchange_rate__gt', 0)), then=django.db.models.expressions.CombinedExpression(models.F('amount'), '/', models.F('exchange_rate'))), default=models.F('amount'), output_field=models.DecimalField(decimal_places=6, max_digits=30)), output_field=models.DecimalField(decimal_places=6, max_digits=30)),
+        ),
+    ]
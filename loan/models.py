@@ -1,3 +1,4 @@
+from collections import defaultdict
 from decimal import Decimal, ROUND_HALF_UP
 from django.contrib.auth import get_user_model
 from django.db import models, transaction
@@ -6,9 +7,28 @@ from product.models import Product, StockEntry
 from systems.models import StockTransfer
 from cashbox.models import CashTransaction
 from django.core.exceptions import ValidationError
-from django.db.models import Q
+from django.db.models import Case, F, Q, When
 from django.conf import settings
 from store.models import Store
+from events.models import EventType
+from events.outbox import publish
+from config.unit_of_work import add_delta, mark_dirty, unit_of_work
+
+
+def usd_generated(field):
+    """
+    STORED generated column: `field` USD da (UZS -> / exchange_rate). Postgres yozishda
+    hisoblaydi, analitika qator bo‘yicha Case o‘rniga oddiy ustunni yig‘adi.
+    """
+    return models.GeneratedField(
+        expression=Case(
+            When(Q(currency='UZS') & Q(exchange_rate__gt=0), then=F(field) / F('exchange_rate')),
+            default=F(field),
+            output_field=models.DecimalField(max_digits=30, decimal_places=6),
+        ),
+        output_field=models.DecimalField(max_digits=30, decimal_places=6),
+        db_persist=True,
+    )
 
 
 class SoftDeleteMixin(models.Model):
@@ -50,6 +70,17 @@ DOCUMENT_METHOD = [
 ]
 
 
+def _balance_sums():
+    """transfer/accept × USD/UZS — bitta so‘rovda shartli SUM'lar."""
+    return {
+        f"{method}_{currency.lower()}": models.Sum(
+            'total_amount', filter=Q(method=method, currency=currency), default=Decimal('0.00'),
+        )
+        for method in ('transfer', 'accept')
+        for currency in ('USD', 'UZS')
+    }
+
+
 class DebtUser(SoftDeleteMixin, models.Model):  # <-- SoftDeleteMixin qo‘shildi
     store = models.ForeignKey('store.Store', on_delete=models.CASCADE, related_name="debt_users")
     phone_number = models.CharField(max_length=15)
@@ -63,6 +94,7 @@ class DebtUser(SoftDeleteMixin, models.Model):  # <-- SoftDeleteMixin qo‘shild
 
     currency = models.CharField(max_length=3, choices=CURRENCY, default='USD')
     exchange_rate = models.DecimalField(max_digits=20, decimal_places=6, default=Decimal('13000.00'))
+    balance_usd = usd_generated('balance')
 
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -85,28 +117,71 @@ class DebtUser(SoftDeleteMixin, models.Model):  # <-- SoftDeleteMixin qo‘shild
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.phone_number})"
 
-    def recalculate_balance(self):
-        base = self.documents.filter(is_deleted=False)
-        transferred_usd = base.filter(method='transfer', currency='USD').aggregate(s=models.Sum('total_amount'))['s'] or Decimal('0.00')
-        transferred_uzs = base.filter(method='transfer', currency='UZS').aggregate(s=models.Sum('total_amount'))['s'] or Decimal('0.00')
-        accepted_usd    = base.filter(method='accept',   currency='USD').aggregate(s=models.Sum('total_amount'))['s'] or Decimal('0.00')
-        accepted_uzs    = base.filter(method='accept',   currency='UZS').aggregate(s=models.Sum('total_amount'))['s'] or Decimal('0.00')
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        rate_changed = False
+        if not self._state.adding and (
+                update_fields is None or {'currency', 'exchange_rate'} & set(update_fields)):
+            old = DebtUser.objects.filter(pk=self.pk).values('currency', 'exchange_rate').first()
+            rate_changed = bool(old) and (old['currency'], old['exchange_rate']) != (
+                self.currency, Decimal(self.exchange_rate))
+        super().save(*args, **kwargs)
+        # balans debitor valyutasida — kurs o‘zgarsa hujjatlardan qayta yig‘iladi
+        if rate_changed:
+            self.recalculate_balance()
 
+    def to_own_currency(self, amount, currency):
+        if currency == self.currency:
+            return amount
         if self.currency == 'USD':
-            self.transferred = transferred_usd + (transferred_uzs / self.exchange_rate)
-            self.accepted    = accepted_usd    + (accepted_uzs    / self.exchange_rate)
+            return amount / self.exchange_rate
+        return amount * self.exchange_rate
+
+    def apply_document_delta(self, method, currency, amount):
+        """Hujjat qo‘shilishi (+) yoki olib tashlanishi (-) — qayta yig‘ishsiz, delta bilan."""
+        value = self.to_own_currency(amount, currency).quantize(Decimal('0.01'), ROUND_HALF_UP)
+        if method == 'transfer':
+            add_delta(self, transferred=value, balance=value)
         else:
-            self.transferred = transferred_uzs + (transferred_usd * self.exchange_rate)
-            self.accepted    = accepted_uzs    + (accepted_usd    * self.exchange_rate)
-
+            add_delta(self, accepted=value, balance=-value)
+
+    def _apply_sums(self, sums):
+        to_own = self.to_own_currency
+        self.transferred = (to_own(sums['transfer_usd'] or Decimal('0.00'), 'USD')
+                            + to_own(sums['transfer_uzs'] or Decimal('0.00'), 'UZS'))
+        self.accepted = (to_own(sums['accept_usd'] or Decimal('0.00'), 'USD')
+                         + to_own(sums['accept_uzs'] or Decimal('0.00'), 'UZS'))
         self.balance = self.transferred - self.accepted
+
+    def recalculate_balance(self):
+        """To‘liq qayta hisob (reconcile) — bitta shartli agregat so‘rov."""
+        self._apply_sums(self.documents.filter(is_deleted=False).aggregate(**_balance_sums()))
         self.save(update_fields=['transferred', 'accepted', 'balance'])
 
+    @classmethod
+    @transaction.atomic
+    def recalculate_store_balances(cls, store_id):
+        """
+        Do‘konning barcha debitorlari: bitta GROUP BY so‘rov + bulk_update. Debitor qatorlari
+        avval bloklanadi, yig‘indi keyin olinadi — parallel add_delta yo‘qolmaydi (u kutadi).
+        """
+        debtors = list(cls.objects.select_for_update().filter(store_id=store_id).order_by('pk'))
+        sums = {
+            row['debtuser_id']: row
+            for row in DebtDocument.objects.filter(debtuser__store_id=store_id, is_deleted=False)
+            .values('debtuser_id').annotate(**_balance_sums())
+        }
+        empty = dict.fromkeys(_balance_sums())
+        for debtor in debtors:
+            debtor._apply_sums(sums.get(debtor.pk, empty))
+        cls.objects.bulk_update(debtors, ['transferred', 'accepted', 'balance'], batch_size=500)
+        return len(debtors)
+
     # --- Soft delete/restore ni hujjatlar bilan sinxron qilish (ixtiyoriy lekin tavsiya) ---
     def soft_delete(self):
         if self.is_deleted:
             return
-        with transaction.atomic():
+        with unit_of_work():
             # avval bog‘liq hujjatlarni soft-delete qilamiz (balans va kassa mantiqlari o‘zlarida bor)
             for doc in self.documents.select_for_update().filter(is_deleted=False):
                 doc.soft_delete()
@@ -115,13 +190,12 @@ class DebtUser(SoftDeleteMixin, models.Model):  # <-- SoftDeleteMixin qo‘shild
     def restore(self):
         if not self.is_deleted:
             return
-        with transaction.atomic():
+        with unit_of_work():
             super().restore()
             # istasangiz, hujjatlarni ham qayta tiklang:
             for doc in self.documents.select_for_update().filter(is_deleted=True):
                 doc.restore()
-            # tiklangandan keyin balans qayta hisob
-            self.recalculate_balance()
+            # balans hujjatlar restore()'idagi delta'lar bilan yangilanadi
 
 
 class DebtDocument(SoftDeleteMixin, models.Model):
@@ -144,10 +218,21 @@ class DebtDocument(SoftDeleteMixin, models.Model):
     total_amount = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal('0.00'))
     income = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal('0.00'))
 
+    cash_usd = usd_generated('cash_amount')
+    product_usd = usd_generated('product_amount')
+    total_usd = usd_generated('total_amount')
+
     date = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['store', 'date'], name='debtdoc_store_date_live_idx',
+                         condition=models.Q(is_deleted=False)),
+            # loan_debt_ledger: PARTITION BY debtuser ORDER BY date, id
+            models.Index(fields=['debtuser', 'date', 'id'], name='debtdoc_ledger_idx',
+                         condition=models.Q(is_deleted=False)),
+        ]
 
 
     def clean(self):
@@ -245,7 +330,76 @@ class DebtDocument(SoftDeleteMixin, models.Model):
                 dp.deduct_stock()
             else:  # 'accept'
                 dp.return_to_stock()
-    
+
+    def sync_products(self, lines):
+        """
+        Qatorlarni diff bilan yangilash (to‘liq o‘chirib qayta yaratish o‘rniga):
+        - o‘zgarmagan qatorlarga tegilmaydi
+        - (mahsulot, narx, valyuta, kurs) bir xil, miqdori boshqa — bulk_update
+        - qolganlari bulk delete / bulk_create
+        Zaxira har bir mahsulot bo‘yicha bitta sof harakat bilan; jamlar va balans
+        chaqiruvchidagi keyingi save()'da. Bulk amallar DocumentProduct.save()'ni
+        chaqirmaydi — uning ishi (amount, zaxira) shu yerda bajariladi.
+        """
+        def line_key(line):
+            return line.product_id, line.price, line.currency, line.exchange_rate
+
+        existing = defaultdict(list)
+        for line in self.products.all():
+            existing[line_key(line)].append(line)
+
+        to_create, to_update = [], []
+        net = defaultdict(int)  # product_id -> hujjatga qo‘shilgan miqdor (ishorali)
+        sample = {}  # product_id -> narx/kurs olinadigan qator
+        for data in lines:
+            line = DocumentProduct(document=self, **data)
+            line.amount = line.quantity * line.price
+            bucket = existing.get(line_key(line))
+            if bucket:
+                old = bucket.pop(0)
+                if (old.quantity, old.income) == (line.quantity, line.income):
+                    continue
+                net[old.product_id] += line.quantity - old.quantity
+                old.quantity, old.amount, old.income = line.quantity, line.amount, line.income
+                to_update.append(old)
+                sample[old.product_id] = old
+            else:
+                net[line.product_id] += line.quantity
+                to_create.append(line)
+                sample[line.product_id] = line
+
+        to_delete = [line for bucket in existing.values() for line in bucket]
+        for line in to_delete:
+            net[line.product_id] -= line.quantity
+            sample.setdefault(line.product_id, line)
+
+        if to_delete:
+            DocumentProduct.objects.filter(pk__in=[line.pk for line in to_delete]).delete()
+        if to_update:
+            DocumentProduct.objects.bulk_update(to_update, ['quantity', 'amount', 'income'])
+        if to_create:
+            DocumentProduct.objects.bulk_create(to_create)
+
+        if not self.is_mirror and not self.is_deleted:
+            for product_id, quantity in net.items():
+                if product_id and quantity:
+                    self._move_line_stock(sample[product_id], quantity)
+
+        # prefetch_related('products') keshi eskirgan
+        getattr(self, '_prefetched_objects_cache', {}).pop('products', None)
+
+    def _move_line_stock(self, sample, quantity):
+        # saqlanmaydigan vaqtinchalik qator; pk — StockMoved hodisasi haqiqiy qatorni ko‘rsatadi
+        line = DocumentProduct(
+            pk=sample.pk, document=self, product=sample.product, quantity=abs(quantity),
+            price=sample.price, currency=sample.currency, exchange_rate=sample.exchange_rate,
+        )
+        # transfer: qatorga qo‘shildi -> zaxiradan chiqadi; accept — teskari
+        if (self.method == 'transfer') == (quantity > 0):
+            line.deduct_stock()
+        else:
+            line.return_to_stock()
+
     def _delete_cash_debts_safely(self):
         for tx in self.cash_debts.all():
             tx.delete()  
@@ -283,7 +437,12 @@ class DebtDocument(SoftDeleteMixin, models.Model):
         #     if is_new and not self.is_mirror and self.debtuser_id:
         #         self.debtuser.recalculate_balance()
 
-        with transaction.atomic():
+        old = None
+        if not is_new:
+            old = DebtDocument.objects.filter(pk=self.pk).values(
+                'debtuser_id', 'method', 'currency', 'total_amount', 'is_deleted').first()
+
+        with unit_of_work():
             super().save(*args, **kwargs)
 
             if not self.is_mirror and not self.is_deleted:
@@ -291,8 +450,26 @@ class DebtDocument(SoftDeleteMixin, models.Model):
             else:
                 self._delete_cash_debts_safely()
 
-            if is_new and not self.is_mirror and self.debtuser_id:
-                self.debtuser.recalculate_balance()
+            # 4) debitor balansi: eski hissani ayirib, yangisini qo‘shamiz
+            if old and not old['is_deleted'] and old['debtuser_id']:
+                debtor = (self.debtuser if old['debtuser_id'] == self.debtuser_id
+                          else DebtUser.objects.get(pk=old['debtuser_id']))
+                debtor.apply_document_delta(old['method'], old['currency'], -old['total_amount'])
+            self._apply_balance_delta(1)
+
+            moved_from = old['debtuser_id'] if old and old['debtuser_id'] != self.debtuser_id else None
+            self._publish_changed("created" if is_new else "updated", previous_debtuser_id=moved_from)
+
+    def _apply_balance_delta(self, sign):
+        if self.debtuser_id and not self.is_deleted:
+            self.debtuser.apply_document_delta(self.method, self.currency, sign * self.total_amount)
+
+    def _publish_changed(self, change, pk=None, **extra):
+        publish(
+            EventType.DEBT_DOCUMENT_CHANGED, pk or self.pk, store_id=self.store_id,
+            change=change, debtuser_id=self.debtuser_id, is_mirror=self.is_mirror,
+            method=self.method, owner_id=self.owner_id, **extra,
+        )
 
     def soft_delete(self):
         """
@@ -303,23 +480,23 @@ class DebtDocument(SoftDeleteMixin, models.Model):
         """
         if self.is_deleted:
             return
-        with transaction.atomic():
+        with unit_of_work():
             # 1) zaxirani teskari qilamiz
             self._reverse_stock_for_delete()
 
-            # 2) flaglar
+            # 2) balansdan hujjat hissasini ayiramiz (flag qo‘yilishidan oldin)
+            self._apply_balance_delta(-1)
+
+            # 3) flaglar
             self.is_deleted = True
             self.deleted_at = timezone.now()
             super().save(update_fields=['is_deleted', 'deleted_at'])
 
-            # 3) kassani tozalash
+            # 4) kassani tozalash
             # self.cash_debts.all().delete()
             self._delete_cash_debts_safely()
 
-
-            # 4) balansni yangilash
-            if not self.is_mirror and self.debtuser_id:
-                self.debtuser.recalculate_balance()
+            self._publish_changed("deleted")
 
     def restore(self):
         """
@@ -330,7 +507,7 @@ class DebtDocument(SoftDeleteMixin, models.Model):
         """
         if not self.is_deleted:
             return
-        with transaction.atomic():
+        with unit_of_work():
             # 1) flaglar
             self.is_deleted = False
             self.deleted_at = None
@@ -343,15 +520,71 @@ class DebtDocument(SoftDeleteMixin, models.Model):
             self._write_cashbox_txn()
 
             # 4) balans
-            if not self.is_mirror and self.debtuser_id:
-                self.debtuser.recalculate_balance()
+            self._apply_balance_delta(1)
+
+            self._publish_changed("restored")
 
     # agar haqiqiy (hard) o'chirish kerak bo'lsa, CASCADE bo'yicha cash txn va products ketadi
     def hard_delete(self, *args, **kwargs):
         cb = getattr(getattr(self, 'store', None), 'cashbox', None)
-        super().hard_delete(*args, **kwargs)
-        if cb:
-            cb.refresh_balance()
+        pk = self.pk
+        with unit_of_work():
+            self._apply_balance_delta(-1)
+            super().hard_delete(*args, **kwargs)
+            if cb:
+                cb.refresh_balance()
+            self._publish_changed("hard_deleted", pk=pk)
+
+class DebtLedgerEntry(models.Model):
+    """
+    `loan_debt_ledger` VIEW (migratsiyada): o‘chirilmagan hujjatlar, debitor valyutasidagi
+    ishorali summa (transfer +, accept -) va yig‘ma balans — SUM() OVER (debtuser, date, id).
+    Oxirgi qatordagi balance == DebtUser.balance (yaxlitlashgacha).
+    """
+    document = models.OneToOneField(
+        DebtDocument, on_delete=models.DO_NOTHING, primary_key=True, db_column='id', related_name='+',
+    )
+    debtuser = models.ForeignKey(DebtUser, on_delete=models.DO_NOTHING, related_name='ledger')
+    store = models.ForeignKey('store.Store', on_delete=models.DO_NOTHING, related_name='+', null=True)
+    date = models.DateTimeField()
+    method = models.CharField(max_length=10, choices=DOCUMENT_METHOD)
+    currency = models.CharField(max_length=3, choices=CURRENCY)
+    exchange_rate = models.DecimalField(max_digits=20, decimal_places=6)
+    cash_amount = models.DecimalField(max_digits=20, decimal_places=2)
+    product_amount = models.DecimalField(max_digits=20, decimal_places=2)
+    total_amount = models.DecimalField(max_digits=20, decimal_places=2)
+    amount = models.DecimalField(max_digits=30, decimal_places=6)
+    balance = models.DecimalField(max_digits=30, decimal_places=6)
+
+    class Meta:
+        managed = False
+        db_table = 'loan_debt_ledger'
+        ordering = ['date', 'document_id']
+
+
+class DebtAgeing(models.Model):
+    """
+    Debitor balansining yoshi (USD). To‘lovlar eng eski qarzni yopadi (FIFO), ya'ni qoldiq
+    eng yangi transfer hujjatlarida. loan.ageing yangilaydi: hodisa bo‘yicha va har kecha.
+    """
+    debtuser = models.OneToOneField(DebtUser, on_delete=models.CASCADE, primary_key=True, related_name='ageing')
+    store = models.ForeignKey('store.Store', on_delete=models.CASCADE, related_name='debt_ageing', db_index=False)
+    balance_usd = models.DecimalField(max_digits=20, decimal_places=6, default=Decimal('0'))
+    bucket_0_30 = models.DecimalField(max_digits=20, decimal_places=6, default=Decimal('0'))
+    bucket_31_60 = models.DecimalField(max_digits=20, decimal_places=6, default=Decimal('0'))
+    bucket_61_90 = models.DecimalField(max_digits=20, decimal_places=6, default=Decimal('0'))
+    bucket_90_plus = models.DecimalField(max_digits=20, decimal_places=6, default=Decimal('0'))
+    oldest_open_date = models.DateTimeField(null=True, blank=True)
+    last_activity = models.DateTimeField(null=True, blank=True)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['store', '-balance_usd'], name='debtageing_store_balance_idx'),
+        ]
+        verbose_name = "Qarz yoshi"
+        verbose_name_plural = "Qarz yoshi"
+
 
 class DocumentProduct(models.Model):
     document = models.ForeignKey(DebtDocument, on_delete=models.CASCADE, related_name='products')
@@ -363,6 +596,7 @@ class DocumentProduct(models.Model):
 
     currency = models.CharField(max_length=3, choices=CURRENCY, default='USD')
     exchange_rate = models.DecimalField(max_digits=20, decimal_places=6, default=Decimal('13000.00'))
+    amount_usd = usd_generated('amount')
 
     income = models.DecimalField(max_digits=20, decimal_places=2, default=Decimal('0.00'))
 
@@ -412,7 +646,10 @@ class DocumentProduct(models.Model):
         if total_needed > 0:
             raise ValueError(f"{self.product.name} uchun yetarli mahsulot yo‘q")
 
-        self.product.recalculate_average_cost()
+        mark_dirty(self.product, "recalculate_average_cost")
+        self.product.publish_stock_moved(
+            -self.quantity, "debt_transfer", document_id=self.document_id, document_product_id=self.pk,
+        )
 
     def return_to_stock(self):
 
@@ -425,7 +662,10 @@ class DocumentProduct(models.Model):
                 exchange_rate=self.exchange_rate,
                 debt=self.document,
             )
-            self.product.recalculate_average_cost()
+            mark_dirty(self.product, "recalculate_average_cost")
+            self.product.publish_stock_moved(
+                self.quantity, "debt_accept", document_id=self.document_id, document_product_id=self.pk,
+            )
 
     def save(self, *args, **kwargs):
         self.amount = self.quantity * self.price
@@ -442,7 +682,7 @@ class DocumentProduct(models.Model):
                 self.return_to_stock()
     def delete(self, *args, **kwargs):
         doc = self.document
-        with transaction.atomic():
+        with unit_of_work():
             if not doc.is_deleted:
                 if doc.method == 'transfer':
                     self.return_to_stock()
@@ -477,10 +717,44 @@ class DebtImportOffer(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # faqat kutilayotgan takliflar: debitor ro‘yxati va expiry sweeper
+            models.Index(
+                fields=["debtor_user", "-created_at"],
+                condition=Q(status="pending"),
+                name="debtoffer_pending_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Offer #{self.pk} → {self.debtor_user} [{self.status}]"
 
+    @classmethod
+    def live_pending(cls, now=None):
+        """Sweeper ishlaguncha muddati o‘tganlar ham PENDING — ro‘yxatda ularni ko‘rsatmaymiz."""
+        now = now or timezone.now()
+        return cls.objects.filter(
+            Q(expires_at__isnull=True) | Q(expires_at__gt=now),
+            status=cls.Status.PENDING,
+        )
+
+    @classmethod
+    def expire_overdue(cls, now=None) -> int:
+        """Muddati o‘tgan PENDING takliflarni bitta UPDATE bilan EXPIRED qiladi."""
+        now = now or timezone.now()
+        return cls.objects.filter(status=cls.Status.PENDING, expires_at__lte=now).update(
+            status=cls.Status.EXPIRED, decided_at=now,
+        )
+
+    def notification_data(self) -> dict:
+        return {
+            "offer_id": self.id,
+            "amount": str(self.payload.get("amount")),
+            "currency": self.payload.get("currency", "USD"),
+            "creditor": self.payload.get("creditor_name"),
+            "action": "review_import",
+        }
+
     # ---- domain helpers ----
     def is_pending(self) -> bool:
         if self.status != self.Status.PENDING:
@@ -496,6 +770,7 @@ class DebtImportOffer(models.Model):
             self.decided_by = by
         self.save(update_fields=["status", "decided_at", "decided_by"])
 
+    @unit_of_work()
     def apply_to_store(self, store: Store, actor) -> DebtDocument:
         """
         Materialize the debt into the chosen store.
@@ -542,8 +817,7 @@ class DebtImportOffer(models.Model):
             date=timezone.now(),
         )
 
-        # 3) Recalculate balance
-        du.recalculate_balance()
+        # 3) Balans DebtDocument.save() ichida delta bilan yangilangan
 
         # 4) Link + mark applied
         self.applied_store = store
@@ -1,6 +1,11 @@
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
+
+from config.unit_of_work import unit_of_work
 from .models import DebtUser, DebtDocument, DocumentProduct, DebtImportOffer
 
+User = get_user_model()
+
 
 class DebtImportOfferCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -15,6 +20,40 @@ class DebtImportOfferCreateSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class DebtImportOfferBulkItemSerializer(serializers.Serializer):
+    # ModelSerializer emas: har bir element uchun FK va unique tekshiruv so‘rovlari bo‘lmasin
+    debtor_user = serializers.IntegerField()
+    payload = serializers.JSONField()
+    expires_at = serializers.DateTimeField(required=False, allow_null=True)
+    idempotency_key = serializers.CharField(max_length=64, required=False, allow_null=True, allow_blank=True)
+
+    def validate_payload(self, payload):
+        if not isinstance(payload, dict) or "amount" not in payload:
+            raise serializers.ValidationError({"amount": "required"})
+        return payload
+
+
+class DebtImportOfferBulkCreateSerializer(serializers.Serializer):
+    MAX_ITEMS = 500
+
+    offers = DebtImportOfferBulkItemSerializer(many=True, allow_empty=False, max_length=MAX_ITEMS)
+
+    def validate_offers(self, offers):
+        for item in offers:
+            item["idempotency_key"] = item.get("idempotency_key") or None
+
+        keys = [item["idempotency_key"] for item in offers if item["idempotency_key"]]
+        if len(keys) != len(set(keys)):
+            raise serializers.ValidationError("idempotency_key must be unique within the batch.")
+
+        user_ids = {item["debtor_user"] for item in offers}
+        found = set(User.objects.filter(pk__in=user_ids).values_list("pk", flat=True))
+        missing = sorted(user_ids - found)
+        if missing:
+            raise serializers.ValidationError({"debtor_user": f"Unknown users: {missing}"})
+        return offers
+
+
 class DebtImportOfferSerializer(serializers.ModelSerializer):
     class Meta:
         model = DebtImportOffer
@@ -54,6 +93,7 @@ class DebtDocumentSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['product_amount', 'total_amount', 'is_deleted', 'deleted_at']
 
+    @unit_of_work()
     def create(self, validated_data):
         request = self.context.get('request')
         user = request.user if request else None
@@ -84,23 +124,22 @@ class DebtDocumentSerializer(serializers.ModelSerializer):
         for product_data in products_data:
             DocumentProduct.objects.create(document=document, **product_data)
 
-        document.debtuser.recalculate_balance()
+        # balans DebtDocument.save() ichida delta bilan yangilanadi
         return document
 
+    @unit_of_work()
     def update(self, instance, validated_data):
         products_data = validated_data.pop('products', None)
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
 
         if products_data is not None:
-            instance.products.all().delete()
-            for product_data in products_data:
-                DocumentProduct.objects.create(document=instance, **product_data)
+            # faqat o‘zgargan qatorlar; zaxira mahsulot bo‘yicha bitta sof harakat
+            instance.sync_products(products_data)
 
-        # 💡 Balans yangilanishi uchun:
-        instance.debtuser.recalculate_balance()
+        # jamlar, kassa va balans — bitta save()
+        instance.save()
         return instance
 
 
@@ -0,0 +1,176 @@
+"""
+Debitor hisob-varag‘i (statement): davr boshidagi qoldiq, davrdagi hujjatlar va yig‘ma
+balans — loan_debt_ledger VIEW'dan. XLSX (openpyxl write_only) va PDF (sahifama-sahifa)
+ko‘rinishida vaqtinchalik faylga, xotiraga butun jadvalni yuklamasdan. ASGI'da sync
+generator StreamingHttpResponse to‘liq buferlanadi — shuning uchun ikkalasi ham FileResponse.
+"""
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+
+from openpyxl import Workbook
+
+from .models import DebtLedgerEntry
+
+COLUMNS = ("Sana", "Hujjat", "Turi", "Summa", "Valyuta", "Kurs", "Harakat", "Balans")
+METHOD_LABELS = {"transfer": "Qarz", "accept": "To‘lov"}
+PDF_LINES_PER_PAGE = 60
+
+
+def statement_entries(debtor, start, end):
+    """-> (davr boshidagi balans, [start, end) oralig‘idagi ledger qatorlari iteratori)."""
+    ledger = DebtLedgerEntry.objects.filter(debtuser=debtor)
+    opening = (
+        ledger.filter(date__lt=start)
+        .order_by("-date", "-document_id")
+        .values_list("balance", flat=True)
+        .first()
+    ) or Decimal("0")
+    entries = ledger.filter(date__gte=start, date__lt=end).order_by("date", "document_id")
+    return opening, entries.iterator(chunk_size=1000)
+
+
+def _period(start, end):
+    # end — eksklyuziv chegara, sarlavhada oxirgi kun ko‘rsatiladi
+    return f"{start:%Y-%m-%d} — {end - timedelta(seconds=1):%Y-%m-%d}"
+
+
+def _q(value):
+    return Decimal(value).quantize(Decimal("0.01"))
+
+
+def _row(entry):
+    return (
+        entry.date.strftime("%Y-%m-%d %H:%M"),
+        entry.document_id,
+        METHOD_LABELS.get(entry.method, entry.method),
+        _q(entry.total_amount),
+        entry.currency,
+        _q(entry.exchange_rate),
+        _q(entry.amount),
+        _q(entry.balance),
+    )
+
+
+def write_xlsx(debtor, start, end):
+    """Vaqtinchalik fayl (boshiga o‘ralgan) — FileResponse uni bo‘laklab uzatadi."""
+    opening, entries = statement_entries(debtor, start, end)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Statement")
+    ws.append((f"{debtor} — {debtor.currency}",))
+    ws.append((_period(start, end),))
+    ws.append(("Boshlang‘ich balans", _q(opening)))
+    ws.append(COLUMNS)
+    closing = opening
+    for entry in entries:
+        ws.append(_row(entry))
+        closing = entry.balance
+    ws.append(("Yakuniy balans", _q(closing)))
+
+    fh = tempfile.TemporaryFile()
+    wb.save(fh)
+    fh.seek(0)
+    return fh
+
+
+def write_pdf(debtor, start, end):
+    """Vaqtinchalik fayl (boshiga o‘ralgan) — write_xlsx kabi FileResponse uchun."""
+    fh = tempfile.TemporaryFile()
+    for chunk in pdf_stream(debtor, start, end):
+        fh.write(chunk)
+    fh.seek(0)
+    return fh
+
+
+def pdf_stream(debtor, start, end):
+    """PDF bytes generatori (sahifa-sahifa)."""
+    opening, entries = statement_entries(debtor, start, end)
+
+    def lines():
+        yield f"{debtor}"
+        yield f"Davr: {_period(start, end)}    Valyuta: {debtor.currency}"
+        yield f"Boshlang'ich balans: {_q(opening)}"
+        yield ""
+        yield _pdf_columns(COLUMNS)
+        closing = opening
+        for entry in entries:
+            yield _pdf_columns(_row(entry))
+            closing = entry.balance
+        yield ""
+        yield f"Yakuniy balans: {_q(closing)}"
+
+    return _PdfWriter().stream(lines())
+
+
+def _pdf_columns(values):
+    date, doc, method, total, currency, rate, amount, balance = (str(v) for v in values)
+    return (f"{date:<17}{doc:>8}  {method:<8}{total:>15} {currency:<4}"
+            f"{rate:>12}{amount:>16}{balance:>16}")
+
+
+class _PdfWriter:
+    """
+    Minimal PDF 1.4: Courier (WinAnsi), A4, har sahifa o‘z content stream'i bilan.
+    Obyektlar yozilishi bilan chiqariladi; Pages, Catalog va xref oxirida.
+    """
+    FONT_SIZE = 8
+    LEADING = 12
+    PAGES_ID, CATALOG_ID, FONT_ID = 1, 2, 3
+
+    def __init__(self):
+        self.offsets = {}
+        self.position = 0
+        self.next_id = 4
+        self.page_ids = []
+
+    def _emit(self, data):
+        self.position += len(data)
+        return data
+
+    def _object(self, obj_id, body):
+        self.offsets[obj_id] = self.position
+        return self._emit(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+
+    @staticmethod
+    def _text(line):
+        text = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        return text.encode("cp1252", errors="replace")
+
+    def _page(self, lines):
+        content = [b"BT /F1 %d Tf %d TL 36 806 Td" % (self.FONT_SIZE, self.LEADING)]
+        content += [b"(" + self._text(line) + b") Tj T*" for line in lines]
+        content.append(b"ET")
+        stream = b"\n".join(content)
+
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        self.page_ids.append(page_id)
+        yield self._object(content_id, b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        yield self._object(page_id, (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (self.PAGES_ID, content_id, self.FONT_ID)
+        ))
+
+    def stream(self, lines):
+        yield self._emit(b"%PDF-1.4\n")
+        yield self._object(self.FONT_ID, b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier "
+                                         b"/Encoding /WinAnsiEncoding >>")
+        page = []
+        for line in lines:
+            page.append(line)
+            if len(page) == PDF_LINES_PER_PAGE:
+                yield from self._page(page)
+                page = []
+        if page or not self.page_ids:
+            yield from self._page(page)
+
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self.page_ids)
+        yield self._object(self.PAGES_ID, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.page_ids)))
+        yield self._object(self.CATALOG_ID, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES_ID)
+
+        xref_at = self.position
+        size = self.next_id
+        xref = [b"xref\n0 %d\n0000000000 65535 f \n" % size]
+        xref += [b"%010d 00000 n \n" % self.offsets[obj_id] for obj_id in range(1, size)]
+        yield b"".join(xref)
+        yield b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, self.CATALOG_ID, xref_at)
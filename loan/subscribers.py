@@ -0,0 +1,81 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from accounts.utils import normalize_phone
+from events.models import EventType
+from events.registry import subscriber
+from notifications.utils import notify_user
+
+from .ageing import refresh_ageing
+from .models import DebtDocument, DebtUser
+
+User = get_user_model()
+
+
+def _resolve_debtuser_platform_user(du: DebtUser) -> User | None:
+    """
+    1) Prefer explicit FK: DebtUser.user (if you have it)
+    2) Fallback to CustomUser by phone_number
+    """
+    user = getattr(du, "user", None)
+    if user:
+        return user
+    try:
+        return User.objects.get(phone_number=normalize_phone(du.phone_number) or du.phone_number)
+    except User.DoesNotExist:
+        return None
+
+
+def _debt_payload(doc: DebtDocument) -> dict:
+    return {
+        "debtuser": str(doc.debtuser) if doc.debtuser else None,
+        "method": doc.method,  # "transfer" | "accept"
+        "currency": doc.currency,
+        "cash_amount": str(doc.cash_amount or Decimal("0")),
+        "product_amount": str(doc.product_amount or Decimal("0")),
+        "total_amount": str(doc.total_amount or Decimal("0")),
+        "date": doc.date.isoformat(),
+    }
+
+
+@subscriber(EventType.DEBT_DOCUMENT_CHANGED)
+def notify_debt_document_created(event):
+    # Only on create, skip mirror copies
+    if event.payload.get("change") != "created" or event.payload.get("is_mirror"):
+        return
+    doc = (DebtDocument.objects.select_related("owner", "debtuser")
+           .filter(pk=event.aggregate_id).first())
+    if doc is None:
+        return
+
+    payload = _debt_payload(doc)
+    owner = doc.owner  # might be None when created from Admin if you didn't set it
+    debtor_user = _resolve_debtuser_platform_user(doc.debtuser) if doc.debtuser_id else None
+
+    # 1) Notify the actor/owner if present
+    if owner:
+        if doc.method == "transfer":
+            verb_owner = f"Debt recorded for {doc.debtuser}"
+        else:
+            verb_owner = f"Payment accepted from {doc.debtuser}"
+        notify_user(owner, verb_owner, data=payload)
+
+    # 2) Notify the debtor
+    if debtor_user:
+        if doc.method == "transfer":
+            verb_debtor = f"Debt added from {owner}" if owner else "Debt recorded on your account"
+        else:
+            verb_debtor = "Your payment was recorded"
+        notify_user(debtor_user, verb_debtor, data=payload)
+
+
+@subscriber(EventType.DEBT_DOCUMENT_CHANGED)
+def refresh_debtor_ageing(event):
+    # balans delta'si hujjat bilan bir tranzaksiyada yozilgan — shu debitor yoshini yangilaymiz;
+    # hujjat boshqa debitorga o‘tkazilgan bo‘lsa, eskisiniki ham
+    debtuser_ids = [
+        pk for pk in (event.payload.get("debtuser_id"), event.payload.get("previous_debtuser_id")) if pk
+    ]
+    if debtuser_ids:
+        refresh_ageing(debtuser_ids=debtuser_ids)
@@ -0,0 +1,49 @@
+from celery import shared_task
+
+from notifications.utils import notify_users
+
+from .ageing import refresh_ageing
+from .models import DebtImportOffer, DebtUser
+
+OFFER_PENDING_VERB = "Dept import pending"
+
+
+@shared_task
+def recalculate_store_debtor_balances(store_id):
+    return DebtUser.recalculate_store_balances(store_id)
+
+
+@shared_task
+def reconcile_debtor_balances():
+    """Balanslar delta bilan yuritiladi; tunda hujjatlardan to‘liq qayta yig‘iladi (yaxlitlash, qo‘lda tahrir)."""
+    store_ids = list(DebtUser.objects.values_list('store_id', flat=True).distinct())
+    for store_id in store_ids:
+        recalculate_store_debtor_balances.delay(store_id)
+    return len(store_ids)
+
+
+@shared_task
+def refresh_debt_ageing(store_id=None):
+    """Kun almashganda bucket'lar siljiydi — har kecha barcha do‘konlar bo‘yicha qayta yoziladi."""
+    if store_id is not None:
+        return refresh_ageing(store_id=store_id)
+    store_ids = list(DebtUser.objects.values_list('store_id', flat=True).distinct())
+    for sid in store_ids:
+        refresh_debt_ageing.delay(sid)
+    return len(store_ids)
+
+
+@shared_task
+def notify_offers_created(offer_ids):
+    """Yangi takliflar haqida debitorlarga — bitta INSERT va bitta group_send tsikli."""
+    offers = DebtImportOffer.live_pending().filter(pk__in=offer_ids)
+    notifs = notify_users([
+        (offer.debtor_user_id, OFFER_PENDING_VERB, offer.notification_data())
+        for offer in offers
+    ])
+    return len(notifs)
+
+
+@shared_task
+def expire_debt_offers():
+    return DebtImportOffer.expire_overdue()
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from loan.ageing import age_balance
+from loan.statements import _PdfWriter
+
+NOW = datetime(2025, 6, 30, tzinfo=timezone.utc)
+
+
+def test_outstanding_balance_sits_in_newest_transfers():
+    transfers = [
+        (NOW - timedelta(days=10), Decimal('40')),
+        (NOW - timedelta(days=45), Decimal('50')),
+        (NOW - timedelta(days=120), Decimal('100')),
+    ]
+    buckets, oldest = age_balance(Decimal('70'), transfers, NOW)
+
+    assert buckets['bucket_0_30'] == Decimal('40')
+    assert buckets['bucket_31_60'] == Decimal('30')
+    assert buckets['bucket_90_plus'] == Decimal('0')
+    assert oldest == NOW - timedelta(days=45)
+
+
+def test_pdf_writer_produces_complete_document():
+    pdf = b"".join(_PdfWriter().stream(f"qator {i} (x)" for i in range(130)))
+
+    assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+    assert b"/Count 3" in pdf
+    xref_at = int(pdf.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+    assert pdf[xref_at:].startswith(b"xref")
+
+
+def test_moved_document_refreshes_previous_debtor(monkeypatch):
+    from types import SimpleNamespace
+
+    from loan import subscribers
+
+    calls = []
+    monkeypatch.setattr(subscribers, "refresh_ageing", lambda debtuser_ids: calls.append(debtuser_ids))
+    subscribers.refresh_debtor_ageing(SimpleNamespace(payload={"debtuser_id": 7, "previous_debtuser_id": 3}))
+
+    assert calls == [[7, 3]]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["start=2025-02-30", "end=2025-13-01", "start=2025-06-10&end=2025-06-01"])
+def test_statement_rejects_invalid_dates(store, query):
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from loan.models import DebtUser
+    from loan.views import DebtUserViewSet
+
+    debtor = DebtUser.objects.create(store=store, phone_number="998901112233", first_name="Ali", last_name="Valiyev")
+    request = APIRequestFactory().get(f"/platform/{store.pk}/debt/debtors/{debtor.pk}/statement/?{query}")
+    force_authenticate(request, user=store.owner.user)
+
+    response = DebtUserViewSet.as_view({"get": "statement"})(request, store_id=store.pk, pk=debtor.pk)
+
+    assert response.status_code == 400
@@ -0,0 +1,15 @@
+from decimal import Decimal
+
+from loan.models import DebtUser
+
+
+def test_balance_sums_converted_to_debtor_currency():
+    debtor = DebtUser(currency='USD', exchange_rate=Decimal('12500'))
+    debtor._apply_sums({
+        'transfer_usd': Decimal('100'), 'transfer_uzs': Decimal('250000'),
+        'accept_usd': Decimal('30'), 'accept_uzs': None,
+    })
+    assert (debtor.transferred, debtor.accepted, debtor.balance) == (Decimal('120'), Decimal('30'), Decimal('90'))
+
+    debtor = DebtUser(currency='UZS', exchange_rate=Decimal('12500'))
+    assert debtor.to_own_currency(Decimal('2'), 'USD') == Decimal('25000')
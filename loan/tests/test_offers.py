@@ -0,0 +1,71 @@
+import pytest
+from django.contrib.auth import get_user_model
+
+from loan.models import DebtImportOffer
+from loan.serializers import DebtImportOfferBulkCreateSerializer
+
+
+def test_bulk_offers_reject_duplicate_keys_within_batch():
+    s = DebtImportOfferBulkCreateSerializer(data={"offers": [
+        {"debtor_user": 1, "payload": {"amount": "10"}, "idempotency_key": "k-1"},
+        {"debtor_user": 2, "payload": {"amount": "20"}, "idempotency_key": "k-1"},
+    ]})
+
+    assert not s.is_valid()
+    assert "offers" in s.errors
+
+
+def test_bulk_offers_require_amount():
+    s = DebtImportOfferBulkCreateSerializer(data={"offers": [{"debtor_user": 1, "payload": {}}]})
+
+    assert not s.is_valid()
+
+
+@pytest.fixture
+def bulk(db):
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from loan.views_offers import DebtImportOfferViewSet
+
+    view = DebtImportOfferViewSet.as_view({"post": "bulk"})
+
+    def post(user, *offers):
+        request = APIRequestFactory().post("/platform/debt/offers/bulk/", {"offers": list(offers)}, format="json")
+        force_authenticate(request, user=user)
+        return view(request)
+
+    return post
+
+
+def _user(username, phone):
+    return get_user_model().objects.create_user(username=username, password="x", phone_number=phone)
+
+
+def test_bulk_replay_is_scoped_to_the_creator(bulk):
+    alice, bob, debtor = _user("alice", "+998900000011"), _user("bob", "+998900000012"), _user("d", "+998900000013")
+    item = {"debtor_user": debtor.pk, "payload": {"amount": "10"}, "idempotency_key": "k-1"}
+
+    first = bulk(alice, item)
+    assert first.status_code == 201
+    offer_id = first.data["results"][0]["id"]
+
+    replay = bulk(alice, item)
+    assert replay.status_code == 200
+    assert replay.data["results"] == [{"id": offer_id, "created": False}]
+
+    # boshqa yaratuvchi kalitni qayta ishlatsa — alice'ning taklif id'si qaytmaydi
+    foreign = bulk(bob, item)
+    assert foreign.status_code == 409
+    assert str(offer_id) not in str(foreign.data)
+
+
+def test_bulk_replay_with_different_payload_conflicts(bulk):
+    alice, debtor = _user("alice", "+998900000011"), _user("d", "+998900000013")
+    item = {"debtor_user": debtor.pk, "payload": {"amount": "10"}, "idempotency_key": "k-1"}
+    assert bulk(alice, item).status_code == 201
+
+    changed = bulk(alice, {**item, "payload": {"amount": "99"}})
+
+    assert changed.status_code == 409
+    assert changed.data["keys"] == ["k-1"]
+    assert DebtImportOffer.objects.count() == 1
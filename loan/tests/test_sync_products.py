@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+import pytest
+
+from config.unit_of_work import unit_of_work
+from events.models import EventType, OutboxEvent
+from loan.models import DebtDocument, DebtUser, DocumentProduct
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def products(make_product):
+    return [make_product(quantity=10, name=name) for name in ("Olma", "Nok", "Banan")]
+
+
+def _document(store, method, *lines):
+    debtor = DebtUser.objects.create(store=store, phone_number="998901112233", first_name="Ali", last_name="Valiyev")
+    document = DebtDocument.objects.create(store=store, debtuser=debtor, method=method, cash_amount=Decimal("0"))
+    for product, quantity in lines:
+        DocumentProduct.objects.create(document=document, product=product, quantity=quantity, price=Decimal("10"))
+    return document
+
+
+def _sync(document, *lines):
+    # serializer update() kabi: diff + bitta save() bir unit_of_work ichida
+    with unit_of_work():
+        document.sync_products([
+            {"product": product, "quantity": quantity, "price": Decimal("10")} for product, quantity in lines
+        ])
+        document.save()
+    document.refresh_from_db()
+
+
+def _stock(*products):
+    for product in products:
+        product.refresh_from_db()
+    return [product.count for product in products]
+
+
+def test_add_change_remove_diff(store, products):
+    apple, pear, banana = products
+    document = _document(store, "transfer", (apple, 3), (pear, 2))
+    apple_line = document.products.get(product=apple)
+    assert _stock(*products) == [7, 8, 10]
+
+    _sync(document, (apple, 5), (banana, 4))
+
+    lines = {line.product_id: line for line in document.products.all()}
+    assert {pk: line.quantity for pk, line in lines.items()} == {apple.pk: 5, banana.pk: 4}
+    assert lines[apple.pk].pk == apple_line.pk  # yangilandi, qayta yaratilmadi
+    assert lines[banana.pk].amount == Decimal("40")
+    assert _stock(*products) == [5, 10, 6]
+    assert (document.product_amount, document.total_amount) == (Decimal("90"), Decimal("90"))
+
+    moves = OutboxEvent.objects.filter(type=EventType.STOCK_MOVED, payload__document_id=document.pk)
+    synced = {event.aggregate_id: event.payload for event in moves.order_by("id")}
+    assert synced[apple.pk]["quantity"] == -2
+    assert synced[apple.pk]["document_product_id"] == apple_line.pk
+    assert synced[banana.pk]["document_product_id"] == lines[banana.pk].pk
+    assert synced[pear.pk]["quantity"] == 2
+
+
+def test_unchanged_lines_move_no_stock(store, products):
+    apple = products[0]
+    document = _document(store, "transfer", (apple, 3))
+    before = OutboxEvent.objects.filter(type=EventType.STOCK_MOVED).count()
+
+    _sync(document, (apple, 3))
+
+    assert _stock(apple) == [7]
+    assert OutboxEvent.objects.filter(type=EventType.STOCK_MOVED).count() == before
+
+
+def test_accept_document_moves_stock_the_other_way(store, products):
+    apple = products[0]
+    document = _document(store, "accept", (apple, 3))
+    assert _stock(apple) == [13]
+
+    _sync(document, (apple, 1))
+
+    assert _stock(apple) == [11]
+    assert document.products.get().quantity == 1
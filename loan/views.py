@@ -1,5 +1,9 @@
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 from django.db.models import Sum
+from django.http import FileResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from django.db import transaction
@@ -10,8 +14,12 @@ from rest_framework.exceptions import PermissionDenied, NotFound
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 
+from accounts.utils import normalize_phone
+from config.replicas import ReplicaReadMixin
+from config.unit_of_work import unit_of_work
 from notifications.utils import notify_user
 from .models import DebtUser, DebtDocument, DocumentProduct
+from .statements import write_pdf, write_xlsx
 from .serializers import (
     DebtUserSerializer,
     DebtDocumentSerializer,
@@ -34,7 +42,7 @@ def _resolve_debtuser_platform_user(du: DebtUser) -> User | None:
     if user:
         return user
     try:
-        return User.objects.get(phone_number=du.phone_number)
+        return User.objects.get(phone_number=normalize_phone(du.phone_number) or du.phone_number)
     except User.DoesNotExist:
         return None
 
@@ -69,7 +77,7 @@ class StoreScopedMixin:
 # ----------------------------------------------------------------------
 # ViewSets
 # ----------------------------------------------------------------------
-class DebtUserViewSet(StoreScopedMixin, viewsets.ModelViewSet):
+class DebtUserViewSet(ReplicaReadMixin, StoreScopedMixin, viewsets.ModelViewSet):
     """
     /platform/<store_id>/debt/debtors/
     """
@@ -96,6 +104,39 @@ class DebtUserViewSet(StoreScopedMixin, viewsets.ModelViewSet):
             obj.restore()
         return Response({"status": "restored"}, status=status.HTTP_200_OK)
 
+    @action(detail=True, methods=["get"])
+    def statement(self, request, store_id=None, pk=None):
+        """
+        ?start=YYYY-MM-DD&end=YYYY-MM-DD (ikkalasi ham kiradi, default — oxirgi 30 kun)
+        &export=xlsx|pdf — loan_debt_ledger'dan vaqtinchalik faylga, FileResponse bo‘laklab uzatadi.
+        """
+        obj = self.get_object()
+        self.ensure_same_store(obj.store_id)
+
+        params = request.query_params
+        today = timezone.localdate()
+        try:
+            start = parse_date(params.get("start") or "") or today - timedelta(days=30)
+            end = parse_date(params.get("end") or "") or today
+        except ValueError:
+            # format to‘g‘ri, sana mavjud emas (masalan 2025-02-30)
+            return Response({"detail": "start/end: noto‘g‘ri sana."}, status=status.HTTP_400_BAD_REQUEST)
+        if start > end:
+            return Response({"detail": "start end'dan keyin bo‘lishi mumkin emas."}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = params.get("export", "xlsx").lower()
+        if fmt not in ("xlsx", "pdf"):
+            return Response({"detail": "export: xlsx yoki pdf."}, status=status.HTTP_400_BAD_REQUEST)
+
+        tz = timezone.get_current_timezone()
+        start_dt = timezone.make_aware(datetime.combine(start, time.min), tz)
+        end_dt = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz)
+        filename = f"statement_{obj.pk}_{start:%Y%m%d}_{end:%Y%m%d}.{fmt}"
+
+        if fmt == "pdf":
+            return FileResponse(write_pdf(obj, start_dt, end_dt), as_attachment=True, filename=filename,
+                                content_type="application/pdf")
+        return FileResponse(write_xlsx(obj, start_dt, end_dt), as_attachment=True, filename=filename)
+
 
 class DebtDocumentViewSet(StoreScopedMixin, viewsets.ModelViewSet):
     """
@@ -111,7 +152,7 @@ class DebtDocumentViewSet(StoreScopedMixin, viewsets.ModelViewSet):
         return int(v) if v is not None else None
 
     def get_queryset(self):
-        qs = DebtDocument.objects.filter(store_id=self.get_store_id())
+        qs = DebtDocument.objects.filter(store_id=self.get_store_id()).prefetch_related("products")
         debtor_pk = self.get_debtor_id()
         if debtor_pk:
             qs = qs.filter(debtuser_id=debtor_pk)
@@ -122,6 +163,7 @@ class DebtDocumentViewSet(StoreScopedMixin, viewsets.ModelViewSet):
             return qs
         return qs.filter(is_deleted=False)
 
+    @unit_of_work()
     def perform_create(self, serializer):
         """
         Ensure store_id and owner are set, and send notifications after commit.
@@ -134,12 +176,9 @@ class DebtDocumentViewSet(StoreScopedMixin, viewsets.ModelViewSet):
         save_kwargs = {"store_id": store_id, "owner": owner}
         if debtor_id:
             save_kwargs["debtuser_id"] = debtor_id
+        # Debtor balance is updated by DebtDocument.save() (signed delta)
         document: DebtDocument = serializer.save(**save_kwargs)
 
-        # Immediately recompute debtor balance if this isn’t a mirror
-        if not document.is_mirror and document.debtuser:
-            document.debtuser.recalculate_balance()
-
         # Schedule notifications after the transaction commits
         def _send_notifications():
             debtor_user = _resolve_debtuser_platform_user(document.debtuser)
@@ -166,14 +205,13 @@ class DebtDocumentViewSet(StoreScopedMixin, viewsets.ModelViewSet):
 
         transaction.on_commit(_send_notifications)
 
+    @unit_of_work()
     def perform_update(self, serializer):
         inst = self.get_object()
         self.ensure_same_store(inst.store_id)
         if self.get_debtor_id() and inst.debtuser_id != self.get_debtor_id():
             raise PermissionDenied("Cannot move document to another debtor.")
-        doc: DebtDocument = serializer.save()
-        if not doc.is_mirror and doc.debtuser:
-            doc.debtuser.recalculate_balance()
+        serializer.save()
 
     def destroy(self, request, *args, **kwargs):
         doc = self.get_object()
@@ -216,9 +254,10 @@ class DebtDocumentViewSet(StoreScopedMixin, viewsets.ModelViewSet):
             is_deleted=True,
         )
         cnt = 0
-        for d in qs:
-            d.restore()
-            cnt += 1
+        with unit_of_work():
+            for d in qs:
+                d.restore()
+                cnt += 1
         return Response({"restored": cnt}, status=status.HTTP_200_OK)
 
 
@@ -245,12 +284,14 @@ class DocumentProductViewSet(StoreScopedMixin, viewsets.ModelViewSet):
     def _recompute_document_totals(self, doc: DebtDocument):
         total_products = doc.products.aggregate(s=Sum("amount"))["s"] or Decimal("0.00")
         new_total = (doc.cash_amount or Decimal("0.00")) + total_products
+        old_total = DebtDocument.objects.filter(pk=doc.pk).values_list("total_amount", flat=True).first()
         DebtDocument.objects.filter(pk=doc.pk).update(
             product_amount=total_products, total_amount=new_total
         )
-        if doc.debtuser_id and not doc.is_mirror and not doc.is_deleted:
-            doc.debtuser.recalculate_balance()
+        if doc.debtuser_id and not doc.is_deleted and old_total is not None:
+            doc.debtuser.apply_document_delta(doc.method, doc.currency, new_total - old_total)
 
+    @unit_of_work()
     def perform_create(self, serializer):
         doc = get_object_or_404(
             DebtDocument.objects.select_related("debtuser"),
@@ -263,6 +304,7 @@ class DocumentProductViewSet(StoreScopedMixin, viewsets.ModelViewSet):
         self._recompute_document_totals(doc)
         return obj
 
+    @unit_of_work()
     def perform_update(self, serializer):
         instance = self.get_object()
         self.ensure_same_store(instance.document.store_id)
@@ -270,6 +312,7 @@ class DocumentProductViewSet(StoreScopedMixin, viewsets.ModelViewSet):
         self._recompute_document_totals(instance.document)
         return obj
 
+    @unit_of_work()
     def perform_destroy(self, instance):
         doc = instance.document
         self.ensure_same_store(doc.store_id)
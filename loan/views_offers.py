@@ -1,5 +1,5 @@
 # loan/views_offers.py
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
@@ -9,7 +9,9 @@ from rest_framework.response import Response
 from store.models import Store  # adjust if different
 from notifications.utils import notify_user
 from .models import DebtImportOffer
+from .tasks import notify_offers_created
 from .serializers import (
+    DebtImportOfferBulkCreateSerializer,
     DebtImportOfferCreateSerializer,
     DebtImportOfferSerializer,
     DebtImportOfferAcceptSerializer,
@@ -26,6 +28,7 @@ class DebtImportOfferViewSet(viewsets.ModelViewSet):
     """
     Endpoints:
       POST   /platform/debt/offers/                  (create an offer; typically admin or system)
+      POST   /platform/debt/offers/bulk/             (create many offers; idempotent per item)
       GET    /platform/debt/offers/?status=pending   (list my offers)
       POST   /platform/debt/offers/{id}/accept/      (accept and choose store)
       POST   /platform/debt/offers/{id}/reject/      (reject)
@@ -36,12 +39,17 @@ class DebtImportOfferViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         if self.action == "create":
             return DebtImportOfferCreateSerializer
+        if self.action == "bulk":
+            return DebtImportOfferBulkCreateSerializer
         return DebtImportOfferSerializer
 
     def get_queryset(self):
         # Debtor sees their own offers; you can widen for admins if needed
-        qs = DebtImportOffer.objects.filter(debtor_user=self.request.user)
         status_q = self.request.query_params.get("status")
+        if status_q == DebtImportOffer.Status.PENDING:
+            # expired-but-not-yet-swept offers are hidden (served by debtoffer_pending_idx)
+            return DebtImportOffer.live_pending().filter(debtor_user=self.request.user)
+        qs = DebtImportOffer.objects.filter(debtor_user=self.request.user)
         if status_q:
             qs = qs.filter(status=status_q)
         return qs
@@ -50,6 +58,74 @@ class DebtImportOfferViewSet(viewsets.ModelViewSet):
         # Creator can be system/user — up to you
         offer = serializer.save(created_by=self.request.user)
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request, *args, **kwargs):
+        """
+        {"offers": [{debtor_user, payload, expires_at?, idempotency_key?}, ...]}
+        Items whose idempotency_key the caller already used are not created again; the
+        response lists every item in request order with its offer id and whether it was
+        created. A replayed key whose debtor or payload differs is a 409.
+        """
+        s = self.get_serializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        items = s.validated_data["offers"]
+        keys = [item["idempotency_key"] for item in items if item["idempotency_key"]]
+
+        try:
+            with transaction.atomic():
+                # only the caller's own offers — another creator's key must not leak its offer id
+                stored = {
+                    key: (offer_id, debtor_id, payload)
+                    for key, offer_id, debtor_id, payload in DebtImportOffer.objects.filter(
+                        created_by=request.user, idempotency_key__in=keys,
+                    ).values_list("idempotency_key", "id", "debtor_user_id", "payload")
+                }
+                mismatched = [
+                    item["idempotency_key"] for item in items
+                    if item["idempotency_key"] in stored
+                    and stored[item["idempotency_key"]][1:] != (item["debtor_user"], item["payload"])
+                ]
+                if mismatched:
+                    return Response(
+                        {"detail": "idempotency_key reused with a different debtor or payload.",
+                         "keys": mismatched},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+                existing = {key: offer_id for key, (offer_id, _, _) in stored.items()}
+                new = [
+                    DebtImportOffer(
+                        debtor_user_id=item["debtor_user"],
+                        created_by=request.user,
+                        payload=item["payload"],
+                        expires_at=item.get("expires_at"),
+                        idempotency_key=item["idempotency_key"],
+                    )
+                    for item in items
+                    if item["idempotency_key"] not in existing
+                ]
+                created = DebtImportOffer.objects.bulk_create(new, batch_size=500)
+                created_ids = [offer.id for offer in created]
+                if created_ids:
+                    # one task (one INSERT + one send loop) instead of a notification per offer
+                    transaction.on_commit(lambda: notify_offers_created.delay(created_ids))
+        except IntegrityError:
+            # a concurrent request inserted one of the keys first (replaying is safe),
+            # or the key is taken by another creator
+            return Response({"detail": "Duplicate idempotency_key, retry the request or use a new key."},
+                            status=status.HTTP_409_CONFLICT)
+
+        created_iter = iter(created_ids)
+        results = [
+            {"id": existing[item["idempotency_key"]], "created": False}
+            if item["idempotency_key"] in existing
+            else {"id": next(created_iter), "created": True}
+            for item in items
+        ]
+        return Response(
+            {"created": len(created_ids), "existing": len(items) - len(created_ids), "results": results},
+            status=status.HTTP_201_CREATED if created_ids else status.HTTP_200_OK,
+        )
+
     @action(detail=True, methods=["post"])
     def accept(self, request, pk=None):
         offer = self.get_object()
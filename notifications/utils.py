@@ -1,23 +1,54 @@
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
+from django.db import transaction
 from .models import Notification
 
-def notify_user(recipient, verb, data=None):
-    notif = Notification.objects.create(
-        recipient=recipient,
-        verb=verb,
-        data=data or {}
-    )
-    payload = {
+
+def _payload(notif):
+    return {
         'id':         notif.id,
         'verb':       notif.verb,
         'data':       notif.data,
         'created_at': notif.created_at.isoformat(),
         'read':       notif.read,
     }
+
+
+def notify_user(recipient, verb, data=None):
+    notif = Notification.objects.create(
+        recipient=recipient,
+        verb=verb,
+        data=data or {}
+    )
     channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
+    # tranzaksiya bekor qilinsa — yuborilmaydi (tranzaksiyadan tashqarida darhol)
+    transaction.on_commit(lambda: async_to_sync(channel_layer.group_send)(
         f"notifications_{recipient.id}",
-        { "type": "notification", "payload": payload }
-    )
+        { "type": "notification", "payload": _payload(notif) }
+    ))
     return notif
+
+
+def notify_users(items, batch_size=500):
+    """
+    items: [(recipient_id, verb, data), ...] — bitta INSERT va bitta event loop
+    ichida barcha group_send'lar (har biri uchun notify_user o‘rniga).
+    """
+    notifs = Notification.objects.bulk_create(
+        [Notification(recipient_id=rid, verb=verb, data=data or {}) for rid, verb, data in items],
+        batch_size=batch_size,
+    )
+    if not notifs:
+        return notifs
+
+    channel_layer = get_channel_layer()
+
+    async def _send_all():
+        for notif in notifs:
+            await channel_layer.group_send(
+                f"notifications_{notif.recipient_id}",
+                { "type": "notification", "payload": _payload(notif) }
+            )
+
+    transaction.on_commit(async_to_sync(_send_all))
+    return notifs
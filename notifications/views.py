@@ -7,6 +7,7 @@ from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 
 
+from config.async_views import AsyncViewMixin
 from .models import Notification
 from .serializers import NotificationSerializer
 
@@ -16,7 +17,7 @@ class NotificationFilter(filters.FilterSet):
         model  = Notification
         fields = ['read']
 
-class NotificationViewSet(viewsets.ModelViewSet):
+class NotificationViewSet(AsyncViewMixin, viewsets.ModelViewSet):
     serializer_class   = NotificationSerializer
     permission_classes = [IsAuthenticated]
     filterset_class    = NotificationFilter
@@ -40,8 +41,8 @@ class NotificationViewSet(viewsets.ModelViewSet):
 
 
     @action(detail=False, methods=['get'])
-    def unread_count(self, request):
-        count = self.get_queryset().filter(read=False).count()
+    async def unread_count(self, request):
+        count = await self.get_queryset().filter(read=False).acount()
         return Response({'unread_count': count})
 
     @action(detail=True, methods=['post'])
@@ -6,7 +6,6 @@ class OrderConfig(AppConfig):
     name = 'order'
 
     def ready(self):
-        import order.signals
         from auditlog.registry import auditlog
         from order.models import Order, ProductOrder
         auditlog.register(Order)
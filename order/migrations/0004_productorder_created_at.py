@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:49
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+CHUNK = 50_000
+
+
+def backfill_created_at(apps, schema_editor):
+    ProductOrder = apps.get_model('order', 'ProductOrder')
+    Order = apps.get_model('order', 'Order')
+    order_created = Subquery(Order.objects.filter(pk=OuterRef('order_id')).values('created_at')[:1])
+    last = ProductOrder.objects.aggregate(m=Max('id'))['m'] or 0
+    for start in range(0, last + 1, CHUNK):
+        ProductOrder.objects.filter(id__gte=start, id__lt=start + CHUNK).update(
+            created_at=Coalesce(order_created, F('created_at'))
+        )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('order', '0003_store_time_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productorder',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # order_order katta — unikal indeks CONCURRENTLY, jadval bloklanmaydi
+    atomic = False
+
+    dependencies = [
+        ('order', '0004_productorder_created_at'),
+        ('platform_user', '0002_rate_usd_history'),
+        ('store', '0001_initial'),
+        ('store_user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='client_created_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "order_store_idempotency_uniq" '
+                    'ON "order_order" ("store_id", "idempotency_key") WHERE "idempotency_key" IS NOT NULL',
+                    'DROP INDEX CONCURRENTLY IF EXISTS "order_store_idempotency_uniq"',
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='order',
+                    constraint=models.UniqueConstraint(condition=models.Q(('idempotency_key__isnull', False)), fields=('store', 'idempotency_key'), name='order_store_idempotency_uniq'),
+                ),
+            ],
+        ),
+    ]
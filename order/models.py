@@ -6,7 +6,10 @@ from django.utils import timezone
 from platform_user.exchange import get_default_exchange_rate
 from store_user.models import StoreUser
 from product.models import Product, StockEntry
-from systems.models import StockTransfer, ProductSale
+from systems.models import ProductSale, StockTransfer
+from events.models import EventType
+from events.outbox import publish
+from config.unit_of_work import flush_pending, mark_dirty, unit_of_work
 from django.core.validators import MinValueValidator, RegexValidator
 from django.core.exceptions import ValidationError
 
@@ -103,6 +106,9 @@ class Order(SoftDeleteMixin, models.Model):
     ])
 
     created_at = models.DateTimeField(auto_now_add=True, null=True)
+    # Oflayn kassa sinxronizatsiyasi (order.sync): takroriy yuborishda ikkinchi buyurtma yaratilmaydi
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
+    client_created_at = models.DateTimeField(null=True, blank=True)
 
     objects = OrderManager()
     all_objects = AllObjectsManager()
@@ -121,6 +127,14 @@ class Order(SoftDeleteMixin, models.Model):
         ordering = ['-created_at']
         verbose_name = "Buyurtma"
         verbose_name_plural = "Buyurtmalar"
+        indexes = [
+            models.Index(fields=['store', 'created_at'], name='order_store_created_live_idx',
+                         condition=models.Q(is_deleted=False)),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['store', 'idempotency_key'], name='order_store_idempotency_uniq',
+                                    condition=models.Q(idempotency_key__isnull=False)),
+        ]
 
     def __str__(self):
         return f"Order #{self.pk} — {self.phone_number}"
@@ -171,6 +185,7 @@ class Order(SoftDeleteMixin, models.Model):
 
         self.total_profit = income.quantize(Decimal("0.000001"), ROUND_HALF_UP)
     
+    @unit_of_work()
     def soft_delete(self):
         if not self.is_deleted:
             # Avval zaxiraga qaytarish
@@ -180,18 +195,19 @@ class Order(SoftDeleteMixin, models.Model):
             # Kassadagi bog‘liq yozuvlarni o‘chirish (CashTransaction orqali)
             if hasattr(self.store, 'cashbox'):
                 for tx in self.store.cashbox.transactions.filter(order=self):
-                    tx.delete()  # hook ishlaydi va balans refresh bo‘ladi
+                    tx.delete()  # balans delta'si commit oldidan bitta UPDATE
 
             self.is_deleted = True
             self.deleted_at = timezone.now()
             self.save(update_fields=['is_deleted', 'deleted_at'])
 
 
+    @unit_of_work()
     def restore(self):
         if self.is_deleted:
             # Zaxiradan chiqarish (ProductOrder.deduct_stock())
             for item in self.items.select_related('product'):
-                item.deduct_stock()
+                item.deduct_stock(reason="order_restore")
 
             # Kassaga qayta yozish
             if hasattr(self.store, 'cashbox') and self.paid_amount:
@@ -220,7 +236,7 @@ class Order(SoftDeleteMixin, models.Model):
         is_new = self._state.adding
 
         if not self.exchange_rate or self.exchange_rate <= 1:
-            from django_currentuser.middleware import get_current_authenticated_user
+            from config.current_user import get_current_authenticated_user
             user = get_current_authenticated_user()
             if user:
                 self.exchange_rate = get_default_exchange_rate(user)
@@ -252,6 +268,16 @@ class Order(SoftDeleteMixin, models.Model):
                         order=self
                     )
 
+            if is_new:
+                from config.current_user import get_current_authenticated_user
+                actor = get_current_authenticated_user()
+                publish(EventType.ORDER_PLACED, self.pk, store_id=self.store_id,
+                        actor_id=actor.pk if actor else None, synced=bool(self.idempotency_key))
+
+    def refresh_totals(self):
+        # save() jamlarni o‘zi qayta hisoblaydi
+        self.save(update_fields=['total_price', 'total_profit', 'change_amount'])
+
     @property
     def unreturned_income(self):
         try:
@@ -279,11 +305,14 @@ class ProductOrder(models.Model):
         MinValueValidator(Decimal('0.000001'), "Ayirboshlash kursi 0 dan katta bo'lishi kerak"),
         validate_finite
     ])
+    # Sotuv vaqti (ProductSale.created_at shundan); hisobotlar order__created_at bo‘yicha
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     def clean(self):
         super().clean()
 
         if self.product and self.quantity > 0:
+            flush_pending(self.product, "recalculate_average_cost")
             available = self.product.count + self.product.warehouse_count
             if available < self.quantity:
                 raise ValidationError(
@@ -307,6 +336,7 @@ class ProductOrder(models.Model):
 
     def return_to_stock(self):
         if self.product:
+            flush_pending(self.product, "recalculate_average_cost")
             StockEntry.objects.create(
                 product=self.product,
                 quantity=self.quantity,
@@ -314,9 +344,12 @@ class ProductOrder(models.Model):
                 currency="USD",
                 exchange_rate=self.exchange_rate,
             )
-            self.product.recalculate_average_cost()
+            mark_dirty(self.product, "recalculate_average_cost")
+            self.product.publish_stock_moved(
+                self.quantity, "order_return", order_id=self.order_id, product_order_id=self.pk,
+            )
 
-    def deduct_stock(self):
+    def deduct_stock(self, reason="sale"):
         if not self.product:
             return
 
@@ -358,11 +391,36 @@ class ProductOrder(models.Model):
         if total_needed > 0:
             raise ValueError(f"{self.product.name} mahsuloti uchun yetarli zahira yo‘q")
 
-        self.product.recalculate_average_cost()
+        mark_dirty(self.product, "recalculate_average_cost")
+
+        if reason == "sale":
+            self._record_sale()
+        self.product.publish_stock_moved(
+            -self.quantity, reason, order_id=self.order_id, product_order_id=self.pk,
+        )
+
+    def _record_sale(self):
+        # hisobotlar ProductSale'dan o‘qiydi — sotuv bilan bir tranzaksiyada, worker'ni kutmasdan
+        unit_price = self.get_price_usd()
+        # blok ichida enter_price hali qayta hisoblanmagan bo‘lishi mumkin
+        flush_pending(self.product, "recalculate_average_cost")
+        ProductSale.objects.create(
+            order_id=self.order_id,
+            product=self.product,
+            store_id=self.product.store_id,
+            quantity=self.quantity,
+            unit_price=unit_price,
+            total_price=unit_price * self.quantity,
+            profit=(unit_price - self.product.enter_price) * self.quantity,
+            currency="USD",
+            exchange_rate=self.exchange_rate,
+            # oflayn sotuv (order.sync) — kassadagi vaqt
+            created_at=self.created_at,
+        )
 
     def save(self, *args, **kwargs):
         if not self.exchange_rate or self.exchange_rate <= 1:
-            from django_currentuser.middleware import get_current_authenticated_user
+            from config.current_user import get_current_authenticated_user
             user = get_current_authenticated_user()
             if user:
                 self.exchange_rate = get_default_exchange_rate(user)
@@ -376,20 +434,8 @@ class ProductOrder(models.Model):
 
             if is_new and self.product:
                 self.deduct_stock()
-
-                ProductSale.objects.create(
-                    order=self.order,
-                    product=self.product,
-                    quantity=self.quantity,
-                    unit_price=self.get_price_usd(),
-                    total_price=self.get_price_usd() * self.quantity,
-                    profit=(self.get_price_usd() - self.product.enter_price) * self.quantity,
-                    currency="USD",
-                    exchange_rate=self.exchange_rate
-                )
             if self.order:
-                self.order.calculate_totals_and_change()
-                self.order.save(update_fields=['total_price', 'total_profit', 'change_amount'])
+                mark_dirty(self.order, "refresh_totals")
 
     def delete(self, *args, **kwargs):
         self.return_to_stock()
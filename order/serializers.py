@@ -1,6 +1,7 @@
 from decimal import Decimal
-from django.db import transaction
 from rest_framework import serializers
+
+from config.unit_of_work import mark_dirty, unit_of_work
 from order.models import Order, ProductOrder
 from product.models import Product
 from product.serializers import ProductListSerializer
@@ -67,7 +68,7 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Buyurtma uchun kamida 1 ta mahsulot kerak.")
         return value
 
-    @transaction.atomic
+    @unit_of_work()
     def create(self, validated_data):
         items_data = validated_data.pop('items')
         order = Order.objects.create(**validated_data)
@@ -75,6 +76,46 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         for item_data in items_data:
             ProductOrder.objects.create(order=order, **item_data)
 
-        order.calculate_totals_and_change()
-        order.save(update_fields=['total_price', 'total_profit', 'change_amount'])
+        # jamlar va mahsulot qoldiqlari commit oldidan bir marta hisoblanadi
+        mark_dirty(order, "refresh_totals")
         return order
+
+
+class OrderSyncItemSerializer(serializers.ModelSerializer):
+    # mahsulotlar order.sync'da do‘kon bo‘yicha bitta so‘rov bilan olinadi
+    product_id = serializers.IntegerField()
+
+    class Meta:
+        model = ProductOrder
+        fields = ['product_id', 'quantity', 'price', 'currency']
+
+
+class OrderSyncEntrySerializer(serializers.ModelSerializer):
+    idempotency_key = serializers.CharField(max_length=64)
+    client_created_at = serializers.DateTimeField()
+    items = OrderSyncItemSerializer(many=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            'idempotency_key', 'client_created_at', 'phone_number', 'first_name', 'last_name',
+            'currency', 'payment_type', 'paid_amount', 'change_given', 'currency_change',
+            'change_amount', 'items',
+        ]
+
+    def validate_items(self, value):
+        if not value:
+            raise serializers.ValidationError("Buyurtma uchun kamida 1 ta mahsulot kerak.")
+        return value
+
+
+class OrderSyncSerializer(serializers.Serializer):
+    MAX_ORDERS = 500
+
+    orders = OrderSyncEntrySerializer(many=True, allow_empty=False, max_length=MAX_ORDERS)
+
+    def validate_orders(self, value):
+        keys = [entry['idempotency_key'] for entry in value]
+        if len(keys) != len(set(keys)):
+            raise serializers.ValidationError("idempotency_key paket ichida takrorlanmasligi kerak.")
+        return value
@@ -0,0 +1,32 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+
+from events.models import EventType
+from events.registry import subscriber
+from notifications.utils import notify_user
+
+from .models import Order
+
+User = get_user_model()
+
+
+@subscriber(EventType.ORDER_PLACED)
+def notify_order_placed(event):
+    actor_id = event.payload.get("actor_id")
+    # oflayn kassadan kelgan paket — kassir natijani sync javobida oladi
+    if not actor_id or event.payload.get("synced"):
+        return
+    actor = User.objects.filter(pk=actor_id).first()
+    order = Order.all_objects.filter(pk=event.aggregate_id).first()
+    if not actor or not order:
+        return
+    notify_user(
+        recipient=actor,
+        verb=f"You placed Order #{order.pk}",
+        data={
+            "order_id":    order.pk,
+            "total_price": str(order.total_price or Decimal('0.00')),
+            "created_at":  order.created_at.isoformat(),
+        }
+    )
@@ -0,0 +1,100 @@
+"""
+Oflayn kassa (POS) buyurtmalarini paket bilan sinxronizatsiya qilish.
+
+Kassa internet yo‘qligida buyurtmalarni o‘zida saqlaydi va keyin bitta so‘rov bilan
+yuboradi. Har bir buyurtmada kassa yaratgan `idempotency_key` bor — paket qayta
+yuborilsa (javob yetib bormagan bo‘lsa), allaqachon yozilganlari "duplicate" bo‘ladi.
+
+Paket CHUNK_SIZE'lik bo‘laklarda, har bo‘lak bitta unit_of_work tranzaksiyasida
+yoziladi: mahsulot qoldiqlari, buyurtma jamlari va kassa balansi bo‘lak oxirida bir
+marta hisoblanadi. Har bir buyurtma o‘z savepoint'ida — bittasining xatosi (zaxira
+yetmasligi va h.k.) qolganlarini bekor qilmaydi.
+"""
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.utils import timezone
+
+from cashbox.models import CashTransaction
+from config.unit_of_work import mark_dirty, unit_of_work
+from product.models import Product
+
+from .models import Order, ProductOrder
+
+CHUNK_SIZE = 50
+
+CREATED, DUPLICATE, ERROR = "created", "duplicate", "error"
+
+
+def sync_orders(store_id, entries, chunk_size=CHUNK_SIZE):
+    """entries: OrderSyncEntrySerializer.validated_data. -> kiritish tartibida natijalar."""
+    results = []
+    for start in range(0, len(entries), chunk_size):
+        results += _sync_chunk(store_id, entries[start:start + chunk_size])
+    return results
+
+
+def _existing_ids(store_id, keys):
+    return dict(
+        Order.all_objects
+        .filter(store_id=store_id, idempotency_key__in=keys)
+        .values_list('idempotency_key', 'id')
+    )
+
+
+@unit_of_work()
+def _sync_chunk(store_id, entries):
+    existing = _existing_ids(store_id, [entry['idempotency_key'] for entry in entries])
+    product_ids = {item['product_id'] for entry in entries for item in entry['items']}
+    products = Product.objects.active().filter(store_id=store_id).in_bulk(product_ids)
+
+    results = []
+    for entry in entries:
+        key = entry['idempotency_key']
+        if key in existing:
+            results.append({'idempotency_key': key, 'status': DUPLICATE, 'order_id': existing[key]})
+            continue
+        try:
+            with unit_of_work():
+                order = _create_order(store_id, entry, products)
+        except IntegrityError:
+            # parallel so‘rov xuddi shu kalitni birinchi yozib ulgurdi
+            order_id = _existing_ids(store_id, [key]).get(key)
+            if order_id is None:
+                raise
+            results.append({'idempotency_key': key, 'status': DUPLICATE, 'order_id': order_id})
+            continue
+        except (ValidationError, ValueError) as exc:
+            detail = exc.messages if isinstance(exc, ValidationError) else [str(exc)]
+            results.append({'idempotency_key': key, 'status': ERROR, 'errors': detail})
+            continue
+        existing[key] = order.pk
+        results.append({'idempotency_key': key, 'status': CREATED, 'order_id': order.pk})
+    return results
+
+
+def _create_order(store_id, entry, products):
+    fields = {name: value for name, value in entry.items() if name != 'items'}
+    # kassa soati oldinda bo‘lishi mumkin — kelajakdagi sana yozilmaydi
+    sold_at = min(entry['client_created_at'], timezone.now())
+
+    order = Order.objects.create(store_id=store_id, **fields)
+    # created_at auto_now_add — sotuv vaqti kassadagi vaqt bo‘yicha
+    Order.all_objects.filter(pk=order.pk).update(created_at=sold_at)
+    CashTransaction.objects.filter(order=order).update(created_at=sold_at)
+    order.created_at = sold_at
+
+    for item in entry['items']:
+        product = products.get(item['product_id'])
+        if product is None:
+            raise ValidationError(f"Mahsulot #{item['product_id']} bu do‘konda topilmadi")
+        ProductOrder.objects.create(
+            order=order,
+            product=product,
+            quantity=item['quantity'],
+            price=item['price'],
+            currency=item.get('currency', 'USD'),
+            created_at=sold_at,
+        )
+
+    mark_dirty(order, "refresh_totals")
+    return order
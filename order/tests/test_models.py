@@ -5,3 +5,49 @@ pytestmark = pytest.mark.django_db
 
 def test_models_importable():
     assert apps.all_models
+
+
+def test_sale_recorded_in_the_same_transaction(store, make_product):
+    from decimal import Decimal
+
+    from events.models import OutboxEvent
+    from order.models import Order, ProductOrder
+    from systems.models import ProductSale
+
+    product = make_product(quantity=5, unit_price="4", out_price="10")
+    order = Order.objects.create(store=store, phone_number="998901234567", paid_amount=Decimal("20"))
+    item = ProductOrder.objects.create(order=order, product=product, quantity=2, price=Decimal("10"))
+
+    # outbox worker ishlamagan — sotuv baribir hisobotlarda
+    assert OutboxEvent.objects.filter(processed_at__isnull=True).exists()
+    sale = ProductSale.objects.get(order=order)
+    assert (sale.store_id, sale.quantity, sale.profit) == (store.pk, 2, Decimal("12"))
+    assert sale.created_at == item.created_at
+
+
+def test_unit_of_work_reads_fresh_stock(store, make_product):
+    from decimal import Decimal
+
+    from django.core.exceptions import ValidationError
+
+    from config.unit_of_work import unit_of_work
+    from order.models import Order, ProductOrder
+    from product.models import StockEntry
+    from systems.models import ProductSale
+
+    product = make_product(quantity=2, unit_price="4", out_price="10")
+    order = Order.objects.create(store=store, phone_number="998901234567", paid_amount=Decimal("0"))
+
+    with unit_of_work():
+        # kirim blok ichida: count va enter_price flush'gacha eski
+        StockEntry.objects.create(product=product, quantity=2, unit_price=Decimal("8"), exchange_rate=product.exchange_rate)
+        ProductOrder(order=order, product=product, quantity=4, price=Decimal("10")).clean()
+
+        ProductOrder.objects.create(order=order, product=product, quantity=1, price=Decimal("10"))
+        # qolgan 1x4 + 2x8 -> o‘rtacha 20/3, eski 4 emas
+        sale = ProductSale.objects.get(order=order)
+        assert sale.profit == Decimal("10") - product.enter_price
+        assert product.enter_price != Decimal("4")
+
+        with pytest.raises(ValidationError):
+            ProductOrder(order=order, product=product, quantity=4, price=Decimal("10")).clean()
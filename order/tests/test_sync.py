@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+import pytest
+from django.db.models import Sum
+from django.utils import timezone
+
+from order.models import Order
+from order.serializers import OrderSyncSerializer
+from order.sync import CREATED, DUPLICATE, ERROR, sync_orders
+from systems.models import ProductSale
+
+
+def _entry(key):
+    return {
+        "idempotency_key": key,
+        "client_created_at": "2026-10-01T09:30:00Z",
+        "phone_number": "998901234567",
+        "paid_amount": "10",
+        "items": [{"product_id": 1, "quantity": 1, "price": "10"}],
+    }
+
+
+def test_sync_rejects_repeated_keys_in_one_batch():
+    s = OrderSyncSerializer(data={"orders": [_entry("pos-1-0001"), _entry("pos-1-0001")]})
+
+    assert not s.is_valid()
+    assert "orders" in s.errors
+
+
+def test_sync_entry_requires_items():
+    entry = _entry("pos-1-0002")
+    entry["items"] = []
+    s = OrderSyncSerializer(data={"orders": [entry, _entry("pos-1-0003")]})
+
+    assert not s.is_valid()
+    assert s.errors["orders"][0]["items"] and s.errors["orders"][1] == {}
+
+
+def _sync(store, *entries, **kwargs):
+    s = OrderSyncSerializer(data={"orders": list(entries)})
+    s.is_valid(raise_exception=True)
+    return sync_orders(store.pk, s.validated_data["orders"], **kwargs)
+
+
+def _item_entry(key, product, quantity=1, sold_at="2026-10-01T09:30:00Z"):
+    return {**_entry(key), "client_created_at": sold_at,
+            "items": [{"product_id": product.pk, "quantity": quantity, "price": "10"}]}
+
+
+@pytest.mark.django_db
+def test_replayed_batch_returns_duplicates(store, make_product):
+    product = make_product(quantity=10)
+    batch = [_item_entry("pos-1-0001", product), _item_entry("pos-1-0002", product, quantity=2)]
+
+    first = _sync(store, *batch)
+    replay = _sync(store, *batch)
+
+    assert [r["status"] for r in first] == [CREATED, CREATED]
+    assert [r["status"] for r in replay] == [DUPLICATE, DUPLICATE]
+    assert [r["order_id"] for r in replay] == [r["order_id"] for r in first]
+    assert Order.all_objects.filter(store=store).count() == 2
+    product.refresh_from_db()
+    assert product.count == 7  # zaxira bir marta ayirildi
+
+
+@pytest.mark.django_db
+def test_failed_order_leaves_the_rest_of_the_chunk(store, make_product):
+    product = make_product(quantity=5)
+    results = _sync(
+        store,
+        _item_entry("pos-1-0001", product, quantity=2),
+        {**_entry("pos-1-0002"), "items": [{"product_id": 999999, "quantity": 1, "price": "10"}]},
+        _item_entry("pos-1-0003", product, quantity=50),  # zaxira yetmaydi
+        _item_entry("pos-1-0004", product, quantity=3),
+        chunk_size=10,
+    )
+
+    assert [r["status"] for r in results] == [CREATED, ERROR, ERROR, CREATED]
+    assert set(Order.all_objects.filter(store=store).values_list("idempotency_key", flat=True)) == {
+        "pos-1-0001", "pos-1-0004",
+    }
+    assert ProductSale.objects.filter(store=store).aggregate(total=Sum("quantity"))["total"] == 5
+    product.refresh_from_db()
+    assert product.count == 0
+
+
+@pytest.mark.django_db
+def test_sold_at_is_clamped_to_now(store, make_product):
+    product = make_product(quantity=5)
+    past, future = timezone.now() - timedelta(days=3), timezone.now() + timedelta(days=1)
+
+    results = _sync(
+        store,
+        _item_entry("pos-1-0001", product, sold_at=past.isoformat()),
+        _item_entry("pos-1-0002", product, sold_at=future.isoformat()),
+    )
+    older, clamped = (Order.all_objects.get(pk=r["order_id"]) for r in results)
+
+    assert older.created_at == past
+    assert clamped.created_at <= timezone.now()
+    for order in (older, clamped):
+        item = order.items.get()
+        assert item.created_at == order.created_at
+        assert ProductSale.objects.get(order=order).created_at == order.created_at
@@ -3,17 +3,26 @@ from rest_framework.response import Response
 from order.models import Order, ProductOrder
 from order.serializers import (
     OrderListSerializer, OrderDetailSerializer, OrderCreateSerializer,
-    ProductOrderSerializer
+    OrderSyncSerializer, ProductOrderSerializer
 )
+from order.sync import sync_orders
 from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, serializers
 
+from django.db.models import Prefetch
 from staffs.mixins import StoreIDMixin
+from config.replicas import ReplicaReadMixin
 from staffs.permissions import StoreStaffPermission
 
+# OrderDetailSerializer -> ProductOrderSerializer -> ProductListSerializer(images)
+ORDER_ITEMS_PREFETCH = Prefetch(
+    'items',
+    queryset=ProductOrder.objects.select_related('product').prefetch_related('product__images'),
+)
+
 
-class OrderViewSet(StoreIDMixin, viewsets.ModelViewSet):
+class OrderViewSet(ReplicaReadMixin, StoreIDMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, StoreStaffPermission]
     filter_backends = [filters.SearchFilter, DjangoFilterBackend]
     search_fields = ['phone_number', 'first_name', 'last_name']
@@ -23,7 +32,10 @@ class OrderViewSet(StoreIDMixin, viewsets.ModelViewSet):
         store_id = self.kwargs.get('store_id')
         if not store_id:
             return Order.objects.none()
-        return Order.objects.active().filter(store_id=store_id)
+        qs = Order.objects.active().filter(store_id=store_id)
+        if self.action not in ('list', 'create'):
+            qs = qs.prefetch_related(ORDER_ITEMS_PREFETCH)
+        return qs
 
     def get_serializer_class(self):
         match self.action:
@@ -45,25 +57,36 @@ class OrderViewSet(StoreIDMixin, viewsets.ModelViewSet):
     @action(detail=True, methods=['get'], url_path='items')
     def get_order_items(self, request, store_id=None, pk=None):
         order = self.get_object()
-        items = order.items.all()
+        items = order.items.select_related('product').prefetch_related('product__images')
         serializer = ProductOrderSerializer(items, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], url_path='sync')
+    def sync_orders(self, request, store_id=None):
+        """Oflayn kassa paketi: har bir buyurtma bo‘yicha created / duplicate / error."""
+        serializer = OrderSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = sync_orders(self.kwargs['store_id'], serializer.validated_data['orders'])
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
 
 class OrderItemsViewSet(StoreIDMixin, viewsets.ModelViewSet):
-    queryset = ProductOrder.objects.select_related('order')
+    queryset = ProductOrder.objects.select_related('order', 'product').prefetch_related('product__images')
     serializer_class = ProductOrderSerializer
     permission_classes = [permissions.IsAuthenticated, StoreStaffPermission]
 
 
-class OrderTrashViewSet(StoreIDMixin, viewsets.ReadOnlyModelViewSet):
+class OrderTrashViewSet(ReplicaReadMixin, StoreIDMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = OrderListSerializer
     permission_classes = [permissions.IsAuthenticated, StoreStaffPermission]
     lookup_field = 'pk'
 
     def get_queryset(self):
         store_id = self.kwargs.get('store_id')
-        return Order.all_objects.filter(store_id=store_id, is_deleted=True)
+        qs = Order.all_objects.filter(store_id=store_id, is_deleted=True)
+        if self.action != 'list':
+            qs = qs.prefetch_related(ORDER_ITEMS_PREFETCH)
+        return qs
 
     def get_serializer_class(self):
         match self.action:
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import PlatformUser, RateUsd
+from .models import PlatformUser, RateUsd, RateUsdHistory
 
 
 @admin.register(PlatformUser)
@@ -26,4 +26,13 @@ class RateUsdAdmin(admin.ModelAdmin):
 
     def user_display(self, obj):
         return f"{obj.user.user.username or obj.user.user.phone_number}"
-    user_display.short_description = "Foydalanuvchi"
\ No newline at end of file
+    user_display.short_description = "Foydalanuvchi"
+
+
+@admin.register(RateUsdHistory)
+class RateUsdHistoryAdmin(admin.ModelAdmin):
+    list_display = ('owner', 'rate', 'effective_at')
+    list_select_related = ('owner__user',)
+    search_fields = ('owner__user__username', 'owner__user__phone_number')
+    date_hierarchy = 'effective_at'
+    readonly_fields = ('owner', 'rate', 'effective_at')
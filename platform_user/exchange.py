@@ -1,19 +1,121 @@
+"""
+USD kursi: joriy kurs (foydalanuvchi bo‘yicha cache) va tarix bo‘yicha (time-travel).
+
+Kurs egasi — chief (bo‘lsa), aks holda foydalanuvchining o‘zi. Joriy kurs
+`usd_rate_user_<user_id>` kalitida, so‘rov ichida esa user obyektida eslab
+qolinadi — bitta so‘rovda bitta cache murojaati. RateUsd saqlanganda egasi va
+uning xodimlari kalitlari o‘chiriladi (platform_user.signals).
+"""
+from bisect import bisect_right
 from decimal import Decimal
-from platform_user.models import PlatformUser, RateUsd
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from platform_user.models import PlatformUser, RateUsd, RateUsdHistory
+
+DEFAULT_RATE = Decimal("1.0")
+RATE_CACHE_TIMEOUT = 60 * 60
+_MEMO_ATTR = "_usd_rate"
+
+
+def user_rate_key(user_id):
+    return f"usd_rate_user_{user_id}"
+
+
+def rate_history_key(owner_id):
+    return f"usd_rate_history_{owner_id}"
+
+
+def _resolve_rate(user_id):
+    """Chief kursi, bo‘lmasa o‘zining kursi — bitta so‘rov (LEFT JOIN)."""
+    row = (
+        PlatformUser.objects
+        .filter(user_id=user_id)
+        .values_list("chief_id", "chief__usd_rate__rate", "usd_rate__rate")
+        .first()
+    )
+    if row is None:
+        return DEFAULT_RATE
+    chief_id, chief_rate, own_rate = row
+    if chief_id and chief_rate is not None:
+        return chief_rate
+    return own_rate if own_rate is not None else DEFAULT_RATE
+
+
+def _cached_rate(user_id):
+    key = user_rate_key(user_id)
+    rate = cache.get(key)
+    if rate is None:
+        rate = _resolve_rate(user_id)
+        cache.set(key, rate, RATE_CACHE_TIMEOUT)
+    return rate
+
 
 def get_default_exchange_rate(user):
-    try:
-        platform_user = user.platform_profile
-    except PlatformUser.DoesNotExist:
-        return Decimal("1.0")
+    rate = getattr(user, _MEMO_ATTR, None)
+    if rate is None:
+        rate = _cached_rate(user.pk)
+        setattr(user, _MEMO_ATTR, rate)
+    return rate
+
+
+def get_platform_user_rate(platform_user):
+    """PlatformUser uchun (Expense.user, Store.owner) — o‘sha cache, CustomUser yuklanmaydi."""
+    return _cached_rate(platform_user.user_id)
+
+
+def rate_owner_id(platform_user):
+    return platform_user.chief_id or platform_user.pk
+
+
+def invalidate_rate(owner_id):
+    """Kurs egasi va uning xodimlari (chief=owner) uchun joriy kurs + tarix kalitlari."""
+    user_ids = (
+        PlatformUser.objects
+        .filter(Q(pk=owner_id) | Q(chief_id=owner_id))
+        .values_list("user_id", flat=True)
+    )
+    cache.delete_many([user_rate_key(uid) for uid in user_ids] + [rate_history_key(owner_id)])
+
+
+def invalidate_user_rate(user_id):
+    cache.delete(user_rate_key(user_id))
+
+
+# ---------- tarix (time-travel) ----------
+
+def rate_history(owner_id):
+    """([effective_at, ...], [rate, ...]) o‘sish tartibida; cache'da."""
+    key = rate_history_key(owner_id)
+    history = cache.get(key)
+    if history is None:
+        rows = list(
+            RateUsdHistory.objects
+            .filter(owner_id=owner_id)
+            .order_by("effective_at")
+            .values_list("effective_at", "rate")
+        )
+        history = ([at for at, _ in rows], [rate for _, rate in rows])
+        cache.set(key, history, RATE_CACHE_TIMEOUT)
+    return history
+
+
+def _rate_in(history, at):
+    moments, rates = history
+    if not rates:
+        return None
+    # `at` dan oldingi oxirgi o‘zgarish; tarixdan oldingi vaqt uchun — eng birinchi kurs
+    idx = bisect_right(moments, at) - 1
+    return rates[max(idx, 0)]
 
-    if platform_user.chief:
-        try:
-            return platform_user.chief.usd_rate.rate
-        except RateUsd.DoesNotExist:
-            pass
 
+def rate_at(owner_id, at):
+    """`at` paytida amal qilgan kurs. Tarix bo‘sh bo‘lsa — joriy RateUsd."""
+    rate = _rate_in(rate_history(owner_id), at)
+    if rate is not None:
+        return rate
     try:
-        return platform_user.usd_rate.rate
+        return RateUsd.objects.values_list("rate", flat=True).get(user_id=owner_id)
     except RateUsd.DoesNotExist:
-        return Decimal("1.0")
\ No newline at end of file
+        return DEFAULT_RATE
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:22
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_history(apps, schema_editor):
+    # hozirgi kurs — tarixning birinchi nuqtasi (RateUsd.date paytidan)
+    RateUsd = apps.get_model('platform_user', 'RateUsd')
+    RateUsdHistory = apps.get_model('platform_user', 'RateUsdHistory')
+    RateUsdHistory.objects.bulk_create(
+        [
+            RateUsdHistory(owner_id=user_id, rate=rate, effective_at=date)
+            for user_id, rate, date in RateUsd.objects.filter(rate__gt=0).values_list('user_id', 'rate', 'date').iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('platform_user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateUsdHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rate', models.DecimalField(decimal_places=10, max_digits=20)),
+                ('effective_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usd_rate_history', to='platform_user.platformuser')),
+            ],
+            options={
+                'verbose_name': 'USD kursi tarixi',
+                'verbose_name_plural': 'USD kurslari tarixi',
+                'ordering': ['-effective_at'],
+                'indexes': [models.Index(fields=['owner', '-effective_at'], name='rateusd_history_owner_idx')],
+            },
+        ),
+        migrations.RunPython(seed_history, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from accounts.models import CustomUser
 
 
@@ -43,4 +44,26 @@ class RateUsd(models.Model):
         verbose_name_plural = "USD Kurslari"
 
     def __str__(self):
-        return f"{self.user.user.username or self.user.user.phone_number} — {self.rate}"
\ No newline at end of file
+        return f"{self.user.user.username or self.user.user.phone_number} — {self.rate}"
+
+
+class RateUsdHistory(models.Model):
+    """
+    RateUsd o‘zgarishlari tarixi: qaysi vaqtdan boshlab qaysi kurs amal qilgan.
+    O‘tgan paytdagi kurs — platform_user.exchange.rate_at. Analitika undan foydalanmaydi:
+    buyurtma, sotuv, xarajat va qarz qatorlari yozilgandagi exchange_rate'ni o‘zida saqlaydi.
+    """
+    owner = models.ForeignKey(PlatformUser, on_delete=models.CASCADE, related_name='usd_rate_history')
+    rate = models.DecimalField(max_digits=20, decimal_places=10)
+    effective_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "USD kursi tarixi"
+        verbose_name_plural = "USD kurslari tarixi"
+        ordering = ['-effective_at']
+        indexes = [
+            models.Index(fields=['owner', '-effective_at'], name='rateusd_history_owner_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.owner_id} — {self.rate} ({self.effective_at:%Y-%m-%d %H:%M})"
@@ -1,4 +1,5 @@
 from accounts.models import CustomUser
+from accounts.utils import normalize_phone
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import PlatformUser, RateUsd
@@ -60,6 +61,8 @@ class PlatformUserCreateUpdateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user_data = validated_data.pop('user')
         phone_number = user_data.pop('phone_number')
+        # CustomUser.save raqamni normallashtiradi — qidiruv ham shu ko‘rinishda bo‘lishi kerak
+        phone_number = normalize_phone(phone_number) or phone_number
 
         user, created = CustomUser.objects.update_or_create(
             phone_number=phone_number,
@@ -1,9 +1,39 @@
-from .models import PlatformUser, RateUsd
+from .exchange import invalidate_rate, invalidate_user_rate
+from .models import PlatformUser, RateUsd, RateUsdHistory
 
-from django.db.models.signals import post_save
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from accounts.cache import invalidate_user
+from staffs.cache import bump_roles_version
+
 @receiver(post_save, sender=PlatformUser)
 def create_rate_usd_for_user(sender, instance, created, **kwargs):
     if created:
-        RateUsd.objects.get_or_create(user=instance)
\ No newline at end of file
+        RateUsd.objects.get_or_create(user=instance)
+
+@receiver([post_save, post_delete], sender=PlatformUser)
+def invalidate_platform_user_claims(sender, instance, **kwargs):
+    # Token ichidagi chief_id eskirishi mumkin — versiyani oshiramiz
+    invalidate_user(instance.user_id)
+    bump_roles_version(instance.pk)
+    # chief o‘zgargan bo‘lishi mumkin — kurs egasi ham o‘zgaradi. Commit'dan keyin:
+    # aks holda parallel so‘rov eski qiymatni o‘qib, yana bir soatga cache'laydi
+    transaction.on_commit(partial(invalidate_user_rate, instance.user_id))
+
+
+@receiver(post_save, sender=RateUsd)
+def record_rate_change(sender, instance, **kwargs):
+    last = (
+        RateUsdHistory.objects
+        .filter(owner_id=instance.pk)
+        .values_list('rate', flat=True)
+        .first()
+    )
+    # yangi profil uchun yaratiladigan 0 kurs tarixga yozilmaydi
+    if instance.rate and last != instance.rate:
+        RateUsdHistory.objects.create(owner_id=instance.pk, rate=instance.rate)
+    transaction.on_commit(partial(invalidate_rate, instance.pk))
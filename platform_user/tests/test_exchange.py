@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from platform_user.exchange import _rate_in
+
+
+def _at(day):
+    return datetime(2025, 1, day, tzinfo=timezone.utc)
+
+
+def test_rate_in_returns_rate_effective_at_moment():
+    history = ([_at(1), _at(10), _at(20)], [Decimal('12500'), Decimal('12700'), Decimal('12900')])
+
+    assert _rate_in(history, _at(15)) == Decimal('12700')
+    assert _rate_in(history, _at(20)) == Decimal('12900')
+    # tarixdan oldingi vaqt — eng birinchi ma'lum kurs
+    assert _rate_in(history, datetime(2024, 12, 1, tzinfo=timezone.utc)) == Decimal('12500')
+    assert _rate_in(([], []), _at(5)) is None
+
+
+def test_rate_cache_invalidated_only_after_commit(monkeypatch):
+    from types import SimpleNamespace
+
+    from django.db import transaction
+
+    from platform_user import signals
+
+    deferred, invalidated = [], []
+    monkeypatch.setattr(transaction, "on_commit", deferred.append)
+    monkeypatch.setattr(signals, "invalidate_rate", invalidated.append)
+    monkeypatch.setattr(signals.RateUsdHistory, "objects", SimpleNamespace(
+        filter=lambda **kw: SimpleNamespace(values_list=lambda *a, **k: SimpleNamespace(first=lambda: Decimal('1'))),
+    ))
+
+    signals.record_rate_change(sender=None, instance=SimpleNamespace(pk=4, rate=Decimal('1')))
+
+    assert invalidated == []
+    deferred[0]()
+    assert invalidated == [4]
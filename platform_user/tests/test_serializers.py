@@ -0,0 +1,26 @@
+import pytest
+from django.test import RequestFactory
+
+from accounts.models import CustomUser
+from platform_user.models import PlatformUser
+from platform_user.serializers import PlatformUserCreateUpdateSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+def test_create_matches_existing_user_by_normalized_phone():
+    chief = PlatformUser.objects.create(
+        user=CustomUser.objects.create_user(username="chief", password="x", phone_number="+998900000001")
+    )
+    existing = CustomUser.objects.create_user(username="seller", password="x", phone_number="+998901234567")
+    request = RequestFactory().post("/")
+    request.user = chief.user
+
+    serializer = PlatformUserCreateUpdateSerializer(
+        data={"phone_number": "+998 90 123-45-67", "first_name": "Ali", "last_name": "Valiyev"},
+        context={"request": request},
+    )
+    assert serializer.is_valid(), serializer.errors
+    platform_user = serializer.save()
+
+    assert platform_user.user_id == existing.pk
@@ -0,0 +1,67 @@
+"""
+POS kataloglari uchun delta-sync (o‘zgarishlar lentasi).
+
+Har bir mahsulot yozuvi (yaratish, tahrir, narx, qoldiq qayta hisobi, o‘chirish,
+tiklash) do‘kon hisoblagichidan (CatalogCursor) yangi `catalog_version` oladi;
+o‘chirishlar ProductTombstone'ga yoziladi. Kassa oxirgi olgan kursorini yuboradi
+va faqat undan keyingi o‘zgarishlarni oladi — narxi o‘zgarishlar soniga bog‘liq,
+katalog hajmiga emas. Kursor 0 — to‘liq yuklash (xuddi shu lenta, sahifalab).
+"""
+from heapq import merge
+from operator import itemgetter
+
+from .models import Product, ProductTombstone
+
+FEED_LIMIT = 500
+MAX_FEED_LIMIT = 2000
+
+# `products` qatorlari shu tartibdagi massivlar — kalitlar har qatorda takrorlanmaydi
+PRODUCT_FIELDS = (
+    "id", "catalog_version", "name", "sku", "barcode", "category_id", "count_type",
+    "out_price", "currency", "count", "warehouse_count", "in_stock",
+)
+
+
+def _product_row(row):
+    return [str(value) if field == "out_price" else value for field, value in zip(PRODUCT_FIELDS, row)]
+
+
+def catalog_changes(store_id, since=0, limit=FEED_LIMIT):
+    """
+    `since` dan keyingi o‘zgarishlar, versiya tartibida, `limit` tagacha.
+    Mahsulot o‘chirib tiklansa ikkalasi ham keladi — kassa ularni versiya tartibida qo‘llaydi.
+    """
+    products = list(
+        Product.objects.active()
+        .filter(store_id=store_id, catalog_version__gt=since)
+        .order_by("catalog_version")
+        .values_list(*PRODUCT_FIELDS)[:limit + 1]
+    )
+    tombstones = list(
+        ProductTombstone.objects
+        .filter(store_id=store_id, version__gt=since)
+        .order_by("version")
+        .values_list("version", "product_id")[:limit + 1]
+    )
+    return build_feed(products, tombstones, since, limit)
+
+
+def build_feed(products, tombstones, since, limit):
+    """products: PRODUCT_FIELDS qatorlari, tombstones: (version, product_id) — ikkalasi versiya tartibida."""
+    changes = list(merge(
+        ((row[1], "product", row) for row in products),
+        ((version, "deleted", product_id) for version, product_id in tombstones),
+        key=itemgetter(0),
+    ))
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    feed = {"fields": PRODUCT_FIELDS, "products": [], "deleted": []}
+    for version, kind, value in changes:
+        if kind == "product":
+            feed["products"].append(_product_row(value))
+        else:
+            feed["deleted"].append([value, version])
+    feed["cursor"] = changes[-1][0] if changes else since
+    feed["has_more"] = has_more
+    return feed
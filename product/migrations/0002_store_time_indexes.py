@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:45
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+CHUNK = 50_000
+
+
+def backfill_store(apps, schema_editor):
+    StockEntry = apps.get_model('product', 'StockEntry')
+    Product = apps.get_model('product', 'Product')
+    store = Subquery(Product.objects.filter(pk=OuterRef('product_id')).values('store_id')[:1])
+    last = StockEntry.objects.aggregate(m=Max('id'))['m'] or 0
+    for start in range(0, last + 1, CHUNK):
+        StockEntry.objects.filter(
+            id__gte=start, id__lt=start + CHUNK, store__isnull=True
+        ).update(store_id=store)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('product', '0001_initial'),
+        ('store', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockentry',
+            name='store',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stock_entries', to='store.store'),
+        ),
+        migrations.RunPython(backfill_store, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='stockentry',
+            index=models.Index(fields=['store', 'created_at'], name='stockentry_store_created_idx'),
+        ),
+    ]
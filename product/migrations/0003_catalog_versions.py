@@ -0,0 +1,68 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:29
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+# Mavjud mahsulotlar do‘kon ichida id tartibida 1..N versiya oladi, hisoblagich — N
+BACKFILL_VERSIONS = """
+UPDATE product_product p SET catalog_version = v.rn
+FROM (
+    SELECT id, row_number() OVER (PARTITION BY store_id ORDER BY id) AS rn
+    FROM product_product WHERE store_id IS NOT NULL
+) v
+WHERE p.id = v.id;
+
+INSERT INTO product_catalogcursor (store_id, version)
+SELECT store_id, max(catalog_version) FROM product_product
+WHERE store_id IS NOT NULL GROUP BY store_id
+ON CONFLICT (store_id) DO NOTHING;
+"""
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('category', '0001_initial'),
+        ('product', '0002_store_time_indexes'),
+        ('store', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogCursor',
+            fields=[
+                ('store', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catalog_cursor', serialize=False, to='store.store')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.BigIntegerField()),
+                ('version', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='catalog_version',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(BACKFILL_VERSIONS, migrations.RunSQL.noop),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(fields=['store', 'catalog_version'], name='product_store_version_idx'),
+        ),
+        migrations.AddField(
+            model_name='producttombstone',
+            name='store',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_tombstones', to='store.store'),
+        ),
+        migrations.AddIndex(
+            model_name='producttombstone',
+            index=models.Index(fields=['store', 'version'], name='producttomb_store_version_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:31
+
+import django.db.models.deletion
+import product.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0003_catalog_versions'),
+        ('store', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogSnapshot',
+            fields=[
+                ('store', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catalog_snapshot', serialize=False, to='store.store')),
+                ('version', models.BigIntegerField(default=0)),
+                ('file', models.FileField(blank=True, upload_to=product.models.catalog_snapshot_path)),
+                ('etag', models.CharField(blank=True, max_length=64)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('product_count', models.PositiveIntegerField(default=0)),
+                ('built_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -1,21 +1,23 @@
 # models.py
 from decimal import Decimal, ROUND_HALF_UP
 import math
-from django.db import models
+from django.db import connection, models
 from django.core.validators import MinValueValidator, FileExtensionValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
-from django.core.cache import cache
 from django.utils import timezone
 from django.utils.crypto import get_random_string
 from django.core.files.base import ContentFile
 from PIL import Image as PILImage
 from io import BytesIO
 import re
-from django_currentuser.middleware import get_current_authenticated_user
+from config.current_user import get_current_authenticated_user
 
 from accounts.models import CustomUser
 from category.models import Category
 from platform_user.exchange import get_default_exchange_rate
+from events.models import EventType
+from events.outbox import publish
+from config.unit_of_work import mark_dirty
 
 
 # validatorlar
@@ -168,6 +170,8 @@ class Product(SoftDeleteMixin, models.Model):
                                         validators=[MinValueValidator(Decimal('0.000000'))])
 
     in_stock = models.BooleanField(default=True)
+    # Do‘kon katalogidagi oxirgi o‘zgarish raqami (product.catalog) — POS delta-sync kursori
+    catalog_version = models.BigIntegerField(default=0, editable=False)
 
     objects = ProductManager()
     all_objects = AllObjectsManager()
@@ -186,17 +190,15 @@ class Product(SoftDeleteMixin, models.Model):
         indexes = [
             models.Index(fields=['name', 'sku', 'barcode']),
             models.Index(fields=['store', 'is_deleted']),
+            models.Index(fields=['store', 'catalog_version'], name='product_store_version_idx'),
         ]
 
     def set_default_exchange_rate(self):
         if not self.exchange_rate or self.exchange_rate <= 1:
-            cache_key = f'exchange_rate_{self.currency}'
-            self.exchange_rate = cache.get(cache_key)
-            if not self.exchange_rate:
-                user = get_current_authenticated_user()
-                if user:
-                    self.exchange_rate = get_default_exchange_rate(user)
-                    cache.set(cache_key, self.exchange_rate, 3600)
+            # egasi bo‘yicha cache (platform_user.exchange)
+            user = get_current_authenticated_user()
+            if user:
+                self.exchange_rate = get_default_exchange_rate(user)
 
     def generate_sku(self):
         if not self.sku:
@@ -223,8 +225,19 @@ class Product(SoftDeleteMixin, models.Model):
         self.generate_sku()
         self.generate_barcode()
 
+        if self.store_id:
+            self.catalog_version = CatalogCursor.next_version(self.store_id)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = [*kwargs['update_fields'], 'catalog_version']
+
         super().save(*args, **kwargs)
-        cache.set(f'product_{self.pk}', self, 3600)
+
+    def soft_delete(self):
+        if not self.is_deleted:
+            super().soft_delete()
+            ProductTombstone.objects.create(
+                store_id=self.store_id, product_id=self.pk, version=self.catalog_version,
+            )
 
     def recalculate_average_cost(self, update=True):
         from django.db.models import Sum, F, Q, Min
@@ -272,17 +285,96 @@ class Product(SoftDeleteMixin, models.Model):
         self.enter_price = avg_cost
 
         if update:
+            if self.store_id:
+                self.catalog_version = CatalogCursor.next_version(self.store_id)
             Product.objects.filter(pk=self.pk).update(
                 count=shelf_qty,
                 warehouse_count=warehouse_qty,
-                enter_price=avg_cost
+                enter_price=avg_cost,
+                catalog_version=self.catalog_version,
             )
-            cache.delete(f'product_{self.pk}')
+
+    def touch_catalog(self):
+        """Mahsulot qatoridan tashqaridagi o‘zgarish (rasm) — delta-sync va snapshot qayta oladi."""
+        if self.store_id:
+            self.catalog_version = CatalogCursor.next_version(self.store_id)
+            Product.all_objects.filter(pk=self.pk).update(catalog_version=self.catalog_version)
+
+    def publish_stock_moved(self, quantity, reason, **details):
+        """
+        StockMoved hodisasi: quantity ishorali (+ kirim, - chiqim). Qoldiqlar payload'da
+        yo‘q — unit_of_work ichida ular commit oldidan hisoblanadi, obunachi Product'dan o‘qiydi.
+        """
+        publish(
+            EventType.STOCK_MOVED, self.pk, store_id=self.store_id,
+            reason=reason, quantity=quantity, **details,
+        )
 
     def __str__(self):
         return f"#{self.pk} {self.name} - {self.count}"
 
 
+class CatalogCursor(models.Model):
+    """
+    Do‘kon bo‘yicha katalog o‘zgarishlari hisoblagichi. next_version() qatorni tranzaksiya
+    oxirigacha bloklaydi — bir do‘kon versiyalari commit tartibida, delta-sync o‘tkazib yubormaydi.
+    """
+    store = models.OneToOneField('store.Store', on_delete=models.CASCADE, primary_key=True,
+                                 related_name='catalog_cursor')
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.store_id}: {self.version}"
+
+    @classmethod
+    def next_version(cls, store_id):
+        table = connection.ops.quote_name(cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (store_id, version) VALUES (%s, 1) "
+                f"ON CONFLICT (store_id) DO UPDATE SET version = {table}.version + 1 "
+                f"RETURNING version",
+                [store_id],
+            )
+            return cursor.fetchone()[0]
+
+
+class ProductTombstone(models.Model):
+    """O‘chirilgan mahsulot izi — delta-sync uni `deleted` sifatida beradi (hard delete'dan keyin ham)."""
+    store = models.ForeignKey('store.Store', on_delete=models.CASCADE, related_name='product_tombstones')
+    product_id = models.BigIntegerField()
+    version = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['store', 'version'], name='producttomb_store_version_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.store_id}: -#{self.product_id} @{self.version}"
+
+
+def catalog_snapshot_path(instance, filename):
+    return f"catalog/store_{instance.store_id}/{filename}"
+
+
+class CatalogSnapshot(models.Model):
+    """POS bootstrap uchun do‘kon katalogining tayyor (gzip + msgpack) fayli — product.snapshot."""
+    store = models.OneToOneField('store.Store', on_delete=models.CASCADE, primary_key=True,
+                                 related_name='catalog_snapshot')
+    # fayl qaysi CatalogCursor versiyasigacha qurilgan — kassa shundan keyin delta-sync qiladi
+    version = models.BigIntegerField(default=0)
+    file = models.FileField(upload_to=catalog_snapshot_path, blank=True)
+    etag = models.CharField(max_length=64, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    product_count = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.store_id}: v{self.version}"
+
+
 class StockEntry(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_entries')
     quantity = models.PositiveIntegerField(validators=[MinValueValidator(1, "Kamida 1 dona ko'rsatilishi kerak")])
@@ -294,36 +386,38 @@ class StockEntry(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_warehouse = models.BooleanField(default=False)
     debt = models.ForeignKey("loan.DebtDocument", blank=True, null=True, on_delete=models.SET_NULL, related_name="stock_entries")
-    
+    # product.store_id nusxasi (analytics uchun)
+    store = models.ForeignKey('store.Store', on_delete=models.CASCADE, related_name='stock_entries',
+                              null=True, editable=False, db_index=False)
+
     class Meta:
         indexes = [
             models.Index(fields=['product']),
             models.Index(fields=['-created_at']),
+            models.Index(fields=['store', 'created_at'], name='stockentry_store_created_idx'),
         ]
         ordering = ['-created_at']
 
     def save(self, *args, **kwargs):
         if not self.exchange_rate or self.exchange_rate <= 1:
-            cache_key = f'exchange_rate_{self.currency}'
-            self.exchange_rate = cache.get(cache_key)
-            if not self.exchange_rate:
-                user = get_current_authenticated_user()
-                if user:
-                    self.exchange_rate = get_default_exchange_rate(user)
-                    cache.set(cache_key, self.exchange_rate, 3600)
+            user = get_current_authenticated_user()
+            if user:
+                self.exchange_rate = get_default_exchange_rate(user)
 
         if self.currency == "UZS":
             self.unit_price = (self.unit_price / self.exchange_rate).quantize(Decimal('0.000001'), ROUND_HALF_UP)
             self.currency = "USD"
 
-        is_new = self._state.adding
+        if self.store_id is None:
+            self.store_id = self.product.store_id
+
         super().save(*args, **kwargs)
 
-        self.product.recalculate_average_cost()
+        mark_dirty(self.product, "recalculate_average_cost")
 
     def delete(self, *args, **kwargs):
         super().delete(*args, **kwargs)
-        self.product.recalculate_average_cost()
+        mark_dirty(self.product, "recalculate_average_cost")
 
 
 class WasteEntry(models.Model):
@@ -373,6 +467,11 @@ class ProductImage(models.Model):
             self.generate_thumbnail()
 
         super().save(*args, **kwargs)
+        mark_dirty(self.product, "touch_catalog")
+
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        mark_dirty(self.product, "touch_catalog")
 
 
 class Properties(models.Model):
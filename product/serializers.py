@@ -1,5 +1,6 @@
-from django.db import transaction
 from rest_framework import serializers
+
+from config.unit_of_work import unit_of_work
 from .models import Product, ProductImage, Properties, StockEntry, ExportTaskLog
 from decimal import Decimal, ROUND_HALF_UP
 
@@ -100,7 +101,7 @@ class ProductCreateSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'date_added', 'store', 'exchange_rate', ]
 
-    @transaction.atomic
+    @unit_of_work()
     def create(self, validated_data):
         stock_data = validated_data.pop('stock')
         images_data = validated_data.pop('images', [])
@@ -120,11 +121,10 @@ class ProductCreateSerializer(serializers.ModelSerializer):
                 entry.full_clean()
                 entries.append(entry)
 
+            # har bir StockEntry.save() mahsulotni "iflos" qiladi — qayta hisob commit oldidan bir marta
             for entry in entries:
                 entry.save()
 
-            product.recalculate_average_cost()
-
         if images_data:
             for img in images_data:
                 ProductImage.objects.create(product=product, **img)
@@ -0,0 +1,138 @@
+"""
+POS bootstrap uchun do‘kon katalogi snapshot'i (CatalogSnapshot).
+
+Fayl — gzip ichida msgpack oqimi: avval sarlavha {"format", "store", "cursor",
+"fields"}, keyin har bir mahsulot uchun SNAPSHOT_FIELDS tartibidagi massiv. Yangi
+kassa uni bitta so‘rov bilan yuklaydi va `cursor` dan delta-sync'ni (product.catalog)
+davom ettiradi.
+
+Qayta qurish inkremental: oldingi fayl o‘qiladi va unga faqat `cursor` dan keyingi
+o‘zgarishlar qo‘llanadi — DB'dan o‘zgarishlar soniga mos qatorlar o‘qiladi.
+"""
+import gzip
+import hashlib
+import tempfile
+
+import msgpack
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .catalog import MAX_FEED_LIMIT, PRODUCT_FIELDS, catalog_changes
+from .models import CatalogCursor, CatalogSnapshot, ProductImage
+
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_FIELDS = (*PRODUCT_FIELDS, "thumbnail")
+CONTENT_TYPE = "application/gzip"
+# Eski fayl darhol o‘chirilmaydi: replica'dan o‘qilgan eski CatalogSnapshot qatori
+# (REPLICA_MAX_LAG_SECONDS) va davom etayotgan yuklashlar hali unga murojaat qiladi
+OLD_FILE_GRACE_SECONDS = 15 * 60
+# Snapshot hali yo‘q bo‘lsa, so‘rovlar har safar qurishni navbatga qo‘ymasligi uchun
+QUEUE_LOCK_SECONDS = 5 * 60
+
+
+def queued_key(store_id):
+    return f"catalog_snapshot_queued_{store_id}"
+
+
+def old_file_grace():
+    return max(OLD_FILE_GRACE_SECONDS, int(settings.REPLICA_MAX_LAG_SECONDS) * 10)
+
+
+def write_snapshot(fh, header, rows):
+    # mtime=0 — bir xil katalog bir xil bayt (va ETag) beradi
+    packer = msgpack.Packer()
+    with gzip.GzipFile(fileobj=fh, mode="wb", mtime=0) as gz:
+        gz.write(packer.pack(header))
+        for row in rows:
+            gz.write(packer.pack(row))
+
+
+def read_snapshot(fh):
+    """-> (sarlavha, {product_id: qator})"""
+    with gzip.GzipFile(fileobj=fh, mode="rb") as gz:
+        unpacker = msgpack.Unpacker(gz, raw=False)
+        header = next(unpacker)
+        return header, {row[0]: row for row in unpacker}
+
+
+def apply_changes(rows, feed, thumbnails):
+    for product in feed["products"]:
+        rows[product[0]] = [*product, thumbnails.get(product[0])]
+    for product_id, version in feed["deleted"]:
+        row = rows.get(product_id)
+        # o‘chirilib keyin tiklangan mahsulot — qatori tombstone'dan yangiroq
+        if row is not None and row[1] < version:
+            del rows[product_id]
+
+
+def _thumbnails(product_ids):
+    images = (
+        ProductImage.objects
+        .filter(product_id__in=product_ids)
+        .order_by("product_id", "id")
+        .distinct("product_id")
+        .values_list("product_id", "thumbnail", "image")
+    )
+    return {pk: default_storage.url(thumbnail or image) for pk, thumbnail, image in images}
+
+
+def _previous_rows(snapshot):
+    if not snapshot.file:
+        return 0, {}
+    try:
+        with snapshot.file.open("rb") as fh:
+            header, rows = read_snapshot(fh)
+    except (OSError, EOFError, StopIteration, ValueError, msgpack.UnpackException):
+        return 0, {}
+    if header.get("format") != SNAPSHOT_FORMAT or header.get("fields") != list(SNAPSHOT_FIELDS):
+        return 0, {}
+    return header["cursor"], rows
+
+
+def build_snapshot(store_id):
+    """Do‘kon snapshot'ini yangilaydi. O‘zgarish bo‘lmasa yoki boshqa worker qurayotgan bo‘lsa — None."""
+    current = CatalogCursor.objects.filter(store_id=store_id).values_list("version", flat=True).first() or 0
+    CatalogSnapshot.objects.get_or_create(store_id=store_id)
+
+    with transaction.atomic():
+        # parallel qurish yo‘q: qator band bo‘lsa boshqa worker ishlayapti
+        snapshot = CatalogSnapshot.objects.select_for_update(skip_locked=True).filter(store_id=store_id).first()
+        if snapshot is None or (snapshot.file and snapshot.version == current):
+            return None
+
+        cursor, rows = _previous_rows(snapshot)
+        while True:
+            feed = catalog_changes(store_id, cursor, limit=MAX_FEED_LIMIT)
+            apply_changes(rows, feed, _thumbnails([product[0] for product in feed["products"]]))
+            cursor = feed["cursor"]
+            if not feed["has_more"]:
+                break
+
+        header = {"format": SNAPSHOT_FORMAT, "store": store_id, "cursor": cursor, "fields": SNAPSHOT_FIELDS}
+        with tempfile.TemporaryFile() as fh:
+            write_snapshot(fh, header, (rows[pk] for pk in sorted(rows)))
+            size = fh.tell()
+            fh.seek(0)
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: fh.read(64 * 1024), b""):
+                digest.update(chunk)
+            etag = digest.hexdigest()
+            fh.seek(0)
+
+            old_name = snapshot.file.name
+            snapshot.file.save(f"catalog-{cursor}.msgpack.gz", File(fh), save=False)
+
+        snapshot.version = cursor
+        snapshot.etag = etag
+        snapshot.size = size
+        snapshot.product_count = len(rows)
+        snapshot.built_at = timezone.now()
+        snapshot.save()
+
+    if old_name and old_name != snapshot.file.name:
+        from .tasks import delete_catalog_snapshot_file
+        delete_catalog_snapshot_file.apply_async((old_name,), countdown=old_file_grace())
+    return snapshot
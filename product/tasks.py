@@ -9,8 +9,12 @@ import boto3
 from django.core.paginator import Paginator
 from django.utils import timezone
 from django.conf import settings
-from django.db.models import Prefetch
-from product.models import Product, ProductImage, ExportTaskLog
+from django.db.models import F, Prefetch, Q
+from product.models import CatalogCursor, Product, ProductImage, ExportTaskLog
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from product.snapshot import build_snapshot, queued_key
+from config.replicas import pick_replica
 
 _s3_client = None
 IMAGE_SIZE = (60, 60)  # Target image size
@@ -68,7 +72,8 @@ def export_products_excel(self, store_id, task_id=None, user_id=None):
             to_attr='first_image'
         )
 
-        base_qs = Product.objects.filter(
+        # Eksport — uzoq o‘qish, primary'ni band qilmaslik uchun replica'dan
+        base_qs = Product.objects.using(pick_replica()).filter(
             store_id=store_id,
             is_deleted=False
         ).prefetch_related(image_prefetch)
@@ -160,3 +165,30 @@ def export_products_excel(self, store_id, task_id=None, user_id=None):
         task_log.completed_at = timezone.now()
         task_log.save()
         raise
+
+
+@shared_task
+def build_catalog_snapshot(store_id):
+    try:
+        snapshot = build_snapshot(store_id)
+    finally:
+        cache.delete(queued_key(store_id))
+    return snapshot.version if snapshot else None
+
+
+@shared_task
+def delete_catalog_snapshot_file(name):
+    default_storage.delete(name)
+
+
+@shared_task
+def build_catalog_snapshots():
+    """Oxirgi qurilishdan keyin katalogi o‘zgargan do‘konlar — har biri alohida vazifa."""
+    store_ids = list(
+        CatalogCursor.objects
+        .filter(Q(store__catalog_snapshot__isnull=True) | Q(store__catalog_snapshot__version__lt=F('version')))
+        .values_list('store_id', flat=True)
+    )
+    for store_id in store_ids:
+        build_catalog_snapshot.delay(store_id)
+    return len(store_ids)
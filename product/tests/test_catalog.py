@@ -0,0 +1,21 @@
+from product.catalog import build_feed
+
+
+def _row(pk, version):
+    return (pk, version, f"P{pk}", None, None, None, "PCS", 10, "USD", 1, 0, True)
+
+
+def test_changes_are_merged_in_version_order_and_paged():
+    feed = build_feed([_row(7, 4), _row(8, 6), _row(9, 9)], [(5, 3), (12, 8)], since=3, limit=3)
+
+    assert [row[0] for row in feed["products"]] == [7, 8]
+    assert feed["products"][0][7] == "10"
+    assert feed["deleted"] == [[3, 5]]
+    assert feed["cursor"] == 6
+    assert feed["has_more"] is True
+
+
+def test_empty_feed_keeps_cursor():
+    feed = build_feed([], [], since=42, limit=500)
+
+    assert feed["cursor"] == 42 and feed["has_more"] is False
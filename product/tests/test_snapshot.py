@@ -0,0 +1,38 @@
+from io import BytesIO
+
+from product.snapshot import SNAPSHOT_FIELDS, apply_changes, read_snapshot, write_snapshot
+
+
+def _row(pk, version):
+    return [pk, version, f"P{pk}", None, None, None, "PCS", "10", "USD", 1, 0, True]
+
+
+def test_snapshot_round_trip_is_deterministic():
+    header = {"format": 1, "store": 1, "cursor": 5, "fields": SNAPSHOT_FIELDS}
+    rows = [[*_row(1, 2), None], [*_row(2, 5), "https://cdn/p2.png"]]
+    first, second = BytesIO(), BytesIO()
+    write_snapshot(first, header, rows)
+    write_snapshot(second, header, rows)
+
+    assert first.getvalue() == second.getvalue()
+    first.seek(0)
+    read_header, read_rows = read_snapshot(first)
+    assert read_header["cursor"] == 5
+    assert read_rows[2][-1] == "https://cdn/p2.png"
+
+
+def test_restored_product_survives_older_tombstone():
+    rows = {1: [*_row(1, 2), None], 2: [*_row(2, 3), None]}
+    feed = {"products": [_row(1, 7)], "deleted": [[1, 5], [2, 6]]}
+
+    apply_changes(rows, feed, {1: "https://cdn/p1.png"})
+
+    assert list(rows) == [1]
+    assert rows[1][1] == 7 and rows[1][-1] == "https://cdn/p1.png"
+
+
+def test_old_file_outlives_replica_lag(settings):
+    from product.snapshot import old_file_grace
+
+    settings.REPLICA_MAX_LAG_SECONDS = 600
+    assert old_file_grace() > 600
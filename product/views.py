@@ -5,14 +5,22 @@ from rest_framework.views import APIView
 from rest_framework.throttling import UserRateThrottle
 from django_filters.rest_framework import DjangoFilterBackend
 from staffs.mixins import StoreIDMixin
+from config.replicas import ReplicaReadMixin
 from staffs.permissions import StoreStaffPermission
-from .models import Product, Properties, StockEntry, ProductImage, COUNT_TYPE_CHOICES, ExportTaskLog
+from .models import (
+    CatalogSnapshot, Product, Properties, StockEntry, ProductImage, COUNT_TYPE_CHOICES, ExportTaskLog
+)
 from .serializers import (
     ProductDetailSerializer, ProductCreateSerializer, ProductListSerializer,
     StockEntrySerializer, ProductUpdateSerializer, PropertiesSerializer,
     ProductImageSerializer, ExportTaskLogSerializer
 )
 from product.tasks import export_products_excel
+from product.catalog import FEED_LIMIT, MAX_FEED_LIMIT, catalog_changes
+from product.snapshot import CONTENT_TYPE as SNAPSHOT_CONTENT_TYPE, QUEUE_LOCK_SECONDS, queued_key
+from django.core.cache import cache
+from product.tasks import build_catalog_snapshot
+from django.http import FileResponse, HttpResponseNotModified
 from rest_framework.permissions import IsAuthenticated
 import uuid, re
 
@@ -22,21 +30,23 @@ class ExportThrottle(UserRateThrottle):
         return request.user.is_staff or super().allow_request(request, view)
 
 
-class ProductViewSet(StoreIDMixin, viewsets.ModelViewSet):
+class ProductViewSet(ReplicaReadMixin, StoreIDMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, StoreStaffPermission]
     filter_backends = [filters.SearchFilter, DjangoFilterBackend, filters.OrderingFilter]
     search_fields = ['name', 'sku', 'barcode']
     filterset_fields = ['category', 'in_stock']
     ordering_fields = ['name', 'date_added', 'out_price']
     ordering = ['-date_added']
+    replica_actions = ('list', 'catalog_changes', 'catalog_snapshot')
 
     def get_queryset(self):
         store_id = self.get_store_id()
         if not store_id:
             return Product.objects.none()
-        return Product.objects.active().filter(store=store_id).prefetch_related(
-            'images', 'properties', 'stock_entries'
-        ).select_related('category')
+        qs = Product.objects.active().filter(store=store_id).select_related('category')
+        if self.action == 'list':
+            return qs.prefetch_related('images')
+        return qs.prefetch_related('images', 'properties', 'stock_entries')
 
     def get_serializer_class(self):
         match self.action:
@@ -100,6 +110,44 @@ class ProductViewSet(StoreIDMixin, viewsets.ModelViewSet):
         print(f"[BY USER] {request.user} (id={request.user.id})")
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['get'], url_path='changes')
+    def catalog_changes(self, request, store_id=None):
+        """POS delta-sync: ?since=<cursor>&limit=N — faqat o‘zgargan/o‘chirilgan mahsulotlar."""
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = int(request.query_params.get('limit', FEED_LIMIT))
+        except ValueError:
+            return Response({"detail": "since va limit butun son bo‘lishi kerak."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if since < 0 or limit < 1:
+            return Response({"detail": "since >= 0 va limit >= 1 bo‘lishi kerak."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(catalog_changes(self.get_store_id(), since, min(limit, MAX_FEED_LIMIT)))
+
+    @action(detail=False, methods=['get'], url_path='snapshot')
+    def catalog_snapshot(self, request, store_id=None):
+        """Yangi kassa uchun butun katalog bitta faylda; X-Catalog-Cursor dan keyin delta-sync."""
+        store_id = self.get_store_id()
+        snapshot = CatalogSnapshot.objects.filter(store_id=store_id).exclude(file='').first()
+        if snapshot is None:
+            # so‘rovlar takrorlansa ham do‘kon uchun bitta qurish navbatda
+            if cache.add(queued_key(store_id), 1, QUEUE_LOCK_SECONDS):
+                build_catalog_snapshot.delay(int(store_id))
+            return Response({"detail": "Katalog snapshot'i tayyorlanmoqda, keyinroq qayta so‘rang."},
+                            status=status.HTTP_202_ACCEPTED)
+
+        etag = f'"{snapshot.etag}"'
+        headers = {'ETag': etag, 'X-Catalog-Cursor': str(snapshot.version)}
+        if etag in request.headers.get('If-None-Match', ''):
+            return HttpResponseNotModified(headers=headers)
+        response = FileResponse(
+            snapshot.file.open('rb'), content_type=SNAPSHOT_CONTENT_TYPE, as_attachment=True,
+            filename=f"catalog-{store_id}-{snapshot.version}.msgpack.gz",
+        )
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
     @action(detail=True, methods=['get'])
     def stock(self, request, store_id=None, pk=None):
         entries = self.get_object().stock_entries.order_by('-created_at')
@@ -145,7 +193,7 @@ class StockEntryViewSet(StoreIDMixin, viewsets.ModelViewSet):
     serializer_class = StockEntrySerializer
 
     def get_queryset(self):
-        return StockEntry.objects.filter(product__store_id=self.get_store_id()).select_related('product')
+        return StockEntry.objects.filter(store_id=self.get_store_id()).select_related('product')
 
 
 class PropertiesViewSet(StoreIDMixin, viewsets.ModelViewSet):
@@ -176,7 +224,10 @@ class ProductTrashViewSet(StoreIDMixin, viewsets.ModelViewSet):
     lookup_field = 'pk'
 
     def get_queryset(self):
-        return Product.all_objects.filter(store=self.get_store_id(), is_deleted=True)
+        qs = Product.all_objects.filter(store=self.get_store_id(), is_deleted=True)
+        if self.action == 'list':
+            return qs.prefetch_related('images')
+        return qs.prefetch_related('images', 'properties', 'stock_entries')
 
     def get_serializer_class(self):
         return ProductListSerializer if self.action == 'list' else ProductDetailSerializer
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:46
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+CHUNK = 50_000
+
+
+def backfill_store(apps, schema_editor):
+    Refund = apps.get_model('refund', 'Refund')
+    ProductOrder = apps.get_model('order', 'ProductOrder')
+    DocumentProduct = apps.get_model('loan', 'DocumentProduct')
+    store = Coalesce(
+        Subquery(ProductOrder.objects.filter(pk=OuterRef('product_order_id')).values('order__store_id')[:1]),
+        Subquery(DocumentProduct.objects.filter(pk=OuterRef('document_product_id')).values('document__store_id')[:1]),
+    )
+    last = Refund.objects.aggregate(m=Max('id'))['m'] or 0
+    for start in range(0, last + 1, CHUNK):
+        Refund.objects.filter(
+            id__gte=start, id__lt=start + CHUNK, store__isnull=True
+        ).update(store_id=store)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('loan', '0003_debtimportoffer'),
+        ('order', '0002_initial'),
+        ('refund', '0001_initial'),
+        ('store', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='refund',
+            name='store',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='refunds', to='store.store'),
+        ),
+        migrations.RunPython(backfill_store, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='refund',
+            index=models.Index(fields=['store', 'created_at'], name='refund_store_created_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models, transaction
+from collections import defaultdict
+from django.db import models
 from django.core.exceptions import ValidationError
 from decimal import Decimal
 from product.models import StockEntry, WasteEntry
@@ -8,6 +9,8 @@ from loan.models import DocumentProduct, DebtDocument, DebtUser
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from config.unit_of_work import mark_dirty, unit_of_work
+
 REASON_TYPES = [
     ("UNUSABLE", "Yaroqsiz"),
     ("DISLIKED", "Yoqmagan"),
@@ -34,6 +37,21 @@ class Refund(models.Model):
             MinValueValidator(1, "Kamida 1 dona mahsulotni qaytarish kerak")
         ])
     created_at = models.DateTimeField(auto_now_add=True, null=True)
+    # order yoki qarz hujjatining store_id nusxasi — OR + ikki JOIN o‘rniga
+    store = models.ForeignKey('store.Store', on_delete=models.CASCADE, related_name='refunds',
+                              null=True, editable=False, db_index=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['store', 'created_at'], name='refund_store_created_idx'),
+        ]
+
+    def resolve_store_id(self):
+        if self.product_order_id:
+            return self.product_order.order.store_id
+        if self.document_product_id:
+            return self.document_product.document.store_id
+        return None
 
     def clean(self):
         # 1) Bitta atigi one of them bo'lsin
@@ -68,8 +86,10 @@ class Refund(models.Model):
     def save(self, *args, **kwargs):
         self.full_clean()
         is_new = self._state.adding
+        if self.store_id is None:
+            self.store_id = self.resolve_store_id()
 
-        with transaction.atomic():
+        with unit_of_work():
             # 1) Avval parentni saqlab pk olamiz
             super().save(*args, **kwargs)
 
@@ -86,7 +106,8 @@ class Refund(models.Model):
                         currency="USD",
                         exchange_rate=self.product_order.exchange_rate,
                     )
-                    product.recalculate_average_cost()
+                    mark_dirty(product, "recalculate_average_cost")
+                    product.publish_stock_moved(self.quantity, "refund", refund_id=self.pk)
                 else:  # UNUSABLE -> Waste
                     WasteEntry.objects.create(
                         product=product,
@@ -99,21 +120,23 @@ class Refund(models.Model):
             if self.document_product and is_new:
                 dp = self.document_product
 
-                # 3.1) miqdorni kamaytirish
+                # 3.1) miqdorni kamaytirish (amount = quantity * price save() da)
                 dp.quantity -= self.quantity
-                dp.save(update_fields=['quantity'])
+                dp.save(update_fields=['quantity', 'amount'])
 
                 # 3.2) zaxiraga qaytarish / waste
                 if self.reason_type in ("DISLIKED", "OTHER"):
                     StockEntry.objects.create(
                         product=dp.product,
                         quantity=self.quantity,
+                        # enter_price allaqachon USD — qayta konvertatsiya qilinmaydi (create_batch kabi)
                         unit_price=dp.product.enter_price,
-                        currency=dp.currency,
+                        currency="USD",
                         exchange_rate=dp.exchange_rate,
                         debt=dp.document,
                     )
-                    dp.product.recalculate_average_cost()
+                    mark_dirty(dp.product, "recalculate_average_cost")
+                    dp.product.publish_stock_moved(self.quantity, "refund", refund_id=self.pk)
                 else:  # UNUSABLE -> Waste
                     WasteEntry.objects.create(
                         product=dp.product,
@@ -126,11 +149,134 @@ class Refund(models.Model):
                 doc: DebtDocument = dp.document
                 doc.product_amount = doc.products.aggregate(s=models.Sum('amount'))['s'] or Decimal('0.00')
                 doc.total_amount = (doc.cash_amount or Decimal('0.00')) + doc.product_amount
+                # balans DebtDocument.save() ichida delta bilan yangilanadi
                 doc.save(update_fields=['product_amount', 'total_amount'])
 
-                # 3.4) balansni yangilash
-                if doc.debtuser_id:
-                    doc.debtuser.recalculate_balance()
+    @classmethod
+    def create_batch(cls, lines):
+        """
+        Bir nechta qaytarish bitta tranzaksiyada: qoldiqlar bitta guruhlangan SUM bilan
+        tekshiriladi, Refund/StockEntry/WasteEntry bulk_create, har bir mahsulot, hujjat
+        va debitor bir marta qayta hisoblanadi.
+
+        lines: [{'product_order': id | None, 'document_product': id | None,
+                 'reason_type', 'custom_reason', 'quantity'}, ...]
+        """
+        po_ids = {line['product_order'] for line in lines if line.get('product_order')}
+        dp_ids = {line['document_product'] for line in lines if line.get('document_product')}
+
+        with unit_of_work():
+            orders = {
+                po.pk: po for po in
+                ProductOrder.objects.select_for_update(of=('self',))
+                .select_related('order', 'product').filter(pk__in=po_ids)
+            }
+            doc_products = {
+                dp.pk: dp for dp in
+                DocumentProduct.objects.select_for_update(of=('self',))
+                .select_related('document', 'product').filter(pk__in=dp_ids)
+            }
+            refunded = {
+                (po_id, dp_id): total
+                for po_id, dp_id, total in
+                cls.objects.filter(
+                    models.Q(product_order_id__in=po_ids) | models.Q(document_product_id__in=dp_ids)
+                )
+                .values_list('product_order_id', 'document_product_id')
+                .annotate(total=models.Sum('quantity'))
+            }
+
+            # 1) tekshiruv — clean() bilan bir xil qoida, partiyadagi takrorlar jamlanadi
+            requested = defaultdict(int)
+            for line in lines:
+                requested[(line.get('product_order'), line.get('document_product'))] += line['quantity']
+
+            errors = {}
+            for index, line in enumerate(lines):
+                key = (line.get('product_order'), line.get('document_product'))
+                target = orders.get(key[0]) if key[0] else doc_products.get(key[1])
+                if target is None or target.product_id is None:
+                    errors[str(index)] = "Order yoki debt mahsuloti topilmadi"
+                    continue
+                available = target.quantity - refunded.get(key, 0)
+                if requested[key] > available:
+                    kind = "Order refund" if key[0] else "Debt hujjat"
+                    errors[str(index)] = f"{kind} uchun qaytarishga {available} dona qoldi"
+            if errors:
+                raise ValidationError(errors)
+
+            # 2) Refund qatorlari
+            refunds = []
+            for line in lines:
+                po = orders.get(line.get('product_order'))
+                dp = doc_products.get(line.get('document_product'))
+                refund = cls(
+                    product_order=po,
+                    document_product=dp,
+                    reason_type=line['reason_type'],
+                    custom_reason=line.get('custom_reason'),
+                    quantity=line['quantity'],
+                    store_id=po.order.store_id if po else dp.document.store_id,
+                )
+                refunds.append(refund)
+            cls.objects.bulk_create(refunds)
+
+            # 3) zaxiraga qaytarish / waste
+            stock_entries, waste_entries = [], []
+            restocked = defaultdict(list)  # product -> [(refund, quantity)]
+            for refund in refunds:
+                source = refund.product_order or refund.document_product
+                product = source.product
+                if refund.reason_type in ("DISLIKED", "OTHER"):
+                    stock_entries.append(StockEntry(
+                        product=product,
+                        store_id=product.store_id,
+                        quantity=refund.quantity,
+                        unit_price=product.enter_price,
+                        currency="USD",
+                        exchange_rate=source.exchange_rate,
+                        debt=refund.document_product.document if refund.document_product else None,
+                    ))
+                    restocked[product].append(refund)
+                else:  # UNUSABLE -> Waste
+                    waste_entries.append(WasteEntry(
+                        product=product,
+                        quantity=refund.quantity,
+                        refund=refund,
+                        reason=f"{refund.get_reason_type_display()} {refund.custom_reason or ''}",
+                    ))
+            StockEntry.objects.bulk_create(stock_entries)
+            WasteEntry.objects.bulk_create(waste_entries)
+
+            for product, product_refunds in restocked.items():
+                mark_dirty(product, "recalculate_average_cost")
+                product.publish_stock_moved(
+                    sum(r.quantity for r in product_refunds), "refund",
+                    refund_ids=[r.pk for r in product_refunds],
+                )
+
+            # 4) qarz hujjatlari: miqdorlar bitta UPDATE, har hujjat summasi bir marta
+            changed = {}
+            for refund in refunds:
+                dp = refund.document_product
+                if dp is not None:
+                    dp.quantity -= refund.quantity
+                    dp.amount = dp.quantity * dp.price
+                    changed[dp.pk] = dp
+            if changed:
+                DocumentProduct.objects.bulk_update(changed.values(), ['quantity', 'amount'])
+                documents = {dp.document_id: dp.document for dp in changed.values()}
+                totals = dict(
+                    DocumentProduct.objects.filter(document_id__in=documents)
+                    .values_list('document_id').annotate(s=models.Sum('amount'))
+                )
+                for doc_id, doc in documents.items():
+                    doc.product_amount = totals.get(doc_id) or Decimal('0.00')
+                    doc.total_amount = (doc.cash_amount or Decimal('0.00')) + doc.product_amount
+                    # balans DebtDocument.save() ichida delta bilan (unit_of_work debitor bo‘yicha jamlaydi)
+                    doc.save(update_fields=['product_amount', 'total_amount'])
+
+        return refunds
 
     def refund_price(self):
         return self.product_order.get_price_usd() * self.quantity if self.product_order else Decimal("0.00")
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Refund
+from .models import Refund, REASON_TYPES
 
 class RefundSerializer(serializers.ModelSerializer):
     # Yordamchi maydon: buyurtma yoki qarz hujjatini o‘qish uchun
@@ -57,4 +57,30 @@ class RefundSerializer(serializers.ModelSerializer):
                 "Custom reason is required for reason_type='OTHER'."
             )
         return data
-# 
\ No newline at end of file
+# 
+
+
+class RefundLineSerializer(serializers.Serializer):
+    # id'lar — obyektlar Refund.create_batch ichida bitta so‘rovda (qulf bilan) olinadi
+    product_order = serializers.IntegerField(required=False, allow_null=True)
+    document_product = serializers.IntegerField(required=False, allow_null=True)
+    reason_type = serializers.ChoiceField(choices=REASON_TYPES)
+    custom_reason = serializers.CharField(max_length=200, min_length=5, required=False, allow_null=True)
+    quantity = serializers.IntegerField(min_value=1, max_value=32767)
+
+    def validate(self, data):
+        if bool(data.get('product_order')) == bool(data.get('document_product')):
+            raise serializers.ValidationError(
+                "Faqat bitta: product_order yoki document_product to‘ldirilishi kerak."
+            )
+        if data.get('reason_type') == 'OTHER' and not data.get('custom_reason'):
+            raise serializers.ValidationError(
+                "Custom reason is required for reason_type='OTHER'."
+            )
+        return data
+
+
+class RefundBatchSerializer(serializers.Serializer):
+    MAX_ITEMS = 200
+
+    items = RefundLineSerializer(many=True, allow_empty=False, max_length=MAX_ITEMS)
@@ -0,0 +1,92 @@
+from decimal import Decimal
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+
+from product.models import WasteEntry
+from refund.models import Refund
+from refund.serializers import RefundBatchSerializer
+
+
+def test_batch_lines_need_exactly_one_target():
+    s = RefundBatchSerializer(data={"items": [
+        {"product_order": 1, "reason_type": "DISLIKED", "quantity": 1},
+        {"product_order": 2, "document_product": 3, "reason_type": "DISLIKED", "quantity": 1},
+        {"document_product": 4, "reason_type": "OTHER", "quantity": 2},
+    ]})
+
+    assert not s.is_valid()
+    errors = s.errors["items"]
+    assert errors[0] == {}
+    assert errors[1] and errors[2]
+
+
+@pytest.fixture
+def sale(store, make_product):
+    from order.models import Order, ProductOrder
+
+    product = make_product(quantity=10)
+    order = Order.objects.create(store=store, phone_number="998901234567", paid_amount=Decimal("30"))
+    return ProductOrder.objects.create(order=order, product=product, quantity=3, price=Decimal("10"))
+
+
+def _line(reason="DISLIKED", quantity=1, **target):
+    return {"reason_type": reason, "quantity": quantity, **target}
+
+
+@pytest.mark.django_db
+def test_duplicate_lines_are_checked_against_one_grouped_balance(sale):
+    Refund.create_batch([_line(product_order=sale.pk)])
+
+    with pytest.raises(ValidationError) as error:
+        # 1 qaytarilgan, 2 qoldi — alohida har biri sig‘adi, jami 3 sig‘maydi
+        Refund.create_batch([_line(product_order=sale.pk), _line(quantity=2, product_order=sale.pk)])
+    assert set(error.value.message_dict) == {"0", "1"}
+    assert Refund.objects.filter(product_order=sale).count() == 1
+
+    Refund.create_batch([_line(product_order=sale.pk), _line(product_order=sale.pk)])
+    sale.product.refresh_from_db()
+    assert Refund.objects.filter(product_order=sale).aggregate(total=Sum("quantity"))["total"] == 3
+    assert sale.product.count == 10  # 3 sotildi, 3 qaytdi
+
+
+@pytest.mark.django_db
+def test_debt_lines_updated_in_bulk_and_document_recomputed_once(store, make_product):
+    from events.models import EventType, OutboxEvent
+    from loan.models import DebtDocument, DebtUser, DocumentProduct
+
+    apple, pear = make_product(name="Olma"), make_product(name="Nok")
+    debtor = DebtUser.objects.create(store=store, phone_number="998901112233", first_name="Ali", last_name="Valiyev")
+    document = DebtDocument.objects.create(store=store, debtuser=debtor, method="transfer", cash_amount=Decimal("0"))
+    apple_line = DocumentProduct.objects.create(document=document, product=apple, quantity=4, price=Decimal("10"))
+    pear_line = DocumentProduct.objects.create(document=document, product=pear, quantity=2, price=Decimal("10"))
+    document.save()
+    changes = OutboxEvent.objects.filter(type=EventType.DEBT_DOCUMENT_CHANGED, aggregate_id=document.pk)
+    before = changes.count()
+
+    with CaptureQueriesContext(connection) as queries:
+        Refund.create_batch([
+            _line(document_product=apple_line.pk),
+            _line("UNUSABLE", 2, document_product=pear_line.pk),
+        ])
+
+    line_updates = [q for q in queries if q["sql"].startswith('UPDATE "loan_documentproduct"')]
+    assert len(line_updates) == 1
+    assert changes.count() == before + 1
+
+    apple_line.refresh_from_db()
+    pear_line.refresh_from_db()
+    assert (apple_line.quantity, apple_line.amount) == (3, Decimal("30"))
+    assert (pear_line.quantity, pear_line.amount) == (0, Decimal("0"))
+    document.refresh_from_db()
+    debtor.refresh_from_db()
+    assert (document.product_amount, document.total_amount) == (Decimal("30"), Decimal("30"))
+    assert (debtor.transferred, debtor.balance) == (Decimal("30"), Decimal("30"))
+
+    apple.refresh_from_db()
+    pear.refresh_from_db()
+    assert (apple.count, pear.count) == (7, 8)  # yaroqsiz nok zaxiraga qaytmaydi
+    assert WasteEntry.objects.filter(product=pear, quantity=2).exists()
@@ -1,8 +1,28 @@
-from rest_framework import viewsets
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
 from .models import Refund
-from .serializers import RefundSerializer
+from .serializers import RefundBatchSerializer, RefundSerializer
+from config.replicas import ReplicaReadMixin
 
 
-class RefundViewSet(viewsets.ModelViewSet):
-    queryset = Refund.objects.all()
+class RefundViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
+    # get_related_object va refund_price uchun FK zanjirlari bitta so‘rovda
+    queryset = Refund.objects.select_related(
+        'product_order__order', 'product_order__product',
+        'document_product__document', 'document_product__product',
+    )
     serializer_class = RefundSerializer
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request, *args, **kwargs):
+        """Savatni bir so‘rovda qaytarish: {"items": [{product_order | document_product, reason_type, custom_reason, quantity}, ...]}"""
+        s = RefundBatchSerializer(data=request.data)
+        s.is_valid(raise_exception=True)
+        try:
+            refunds = Refund.create_batch(s.validated_data['items'])
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({'items': exc.message_dict if hasattr(exc, 'error_dict') else exc.messages})
+        return Response(RefundSerializer(refunds, many=True).data, status=status.HTTP_201_CREATED)
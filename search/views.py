@@ -1,5 +1,6 @@
 # views.py
-from rest_framework import mixins, viewsets, permissions
+from rest_framework import viewsets, permissions
+from rest_framework.response import Response
 from django.db.models import Q, Case, When, Value, IntegerField, Subquery, OuterRef
 from staffs.mixins import StoreIDMixin
 from staffs.permissions import StoreStaffPermission
@@ -9,10 +10,11 @@ from rest_framework import generics, filters
 from rest_framework.permissions import IsAuthenticated
 from category.models import Category
 from category.serializers import CategorySerializer
+from config.async_views import AsyncViewMixin
 
 
-class ProductSearchViewSet(StoreIDMixin,
-                           mixins.ListModelMixin,
+class ProductSearchViewSet(AsyncViewMixin,
+                           StoreIDMixin,
                            viewsets.GenericViewSet):
     permission_classes = [permissions.IsAuthenticated, StoreStaffPermission]
     serializer_class = ProductSearchSerializer
@@ -59,6 +61,12 @@ class ProductSearchViewSet(StoreIDMixin,
         )
         return qs[:500]
 
+    async def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        products = [product async for product in queryset]
+        serializer = self.get_serializer(products, many=True)
+        return Response(serializer.data)
+
 
 class CategorySearchView(generics.ListAPIView):
     queryset = Category.objects.all()
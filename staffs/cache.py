@@ -0,0 +1,149 @@
+from django.core.cache import cache
+
+from .models import StoreStaff
+from .role_permissions import ROLE_PERMISSIONS
+
+ROLE_CACHE_TIMEOUT = 60 * 15
+_REQUEST_ATTR = '_store_roles'
+_MODEL_NAMES = {}
+
+
+def store_role_key(platform_user_id, store_id):
+    return f"store_role_{platform_user_id}_{store_id}"
+
+
+def user_roles_key(platform_user_id):
+    return f"store_roles_{platform_user_id}"
+
+
+def roles_version_key(platform_user_id):
+    return f"store_roles_version_{platform_user_id}"
+
+
+def get_roles_version(platform_user_id):
+    """Token ichidagi claim'lar eskirganini aniqlash uchun versiya (JWT'da ham saqlanadi)."""
+    return cache.get(roles_version_key(platform_user_id), 0)
+
+
+def bump_roles_version(platform_user_id):
+    key = roles_version_key(platform_user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def _request_memo(request):
+    memo = getattr(request, _REQUEST_ATTR, None)
+    if memo is None:
+        memo = {}
+        setattr(request, _REQUEST_ATTR, memo)
+    return memo
+
+
+def resolve_store_role(request, platform_user, store_id):
+    """
+    Xodimning do‘kondagi roli va ruxsat etilgan amallari.
+    Avval so‘rov ichidan, keyin cache'dan, oxirida DB'dan olinadi.
+    Xodim bo‘lmasa {'role': None, 'actions': {}} qaytadi.
+    """
+    memo = _request_memo(request)
+    memo_key = (platform_user.pk, int(store_id))
+    if memo_key in memo:
+        return memo[memo_key]
+
+    key = store_role_key(platform_user.pk, store_id)
+    resolved = cache.get(key)
+    if resolved is None:
+        role = (
+            StoreStaff.objects
+            .filter(user=platform_user, store_id=store_id, is_active=True)
+            .values_list('role', flat=True)
+            .first()
+        )
+        resolved = _resolved(role)
+        cache.set(key, resolved, ROLE_CACHE_TIMEOUT)
+
+    memo[memo_key] = resolved
+    return resolved
+
+
+def _resolved(role):
+    return {'role': role, 'actions': ROLE_PERMISSIONS.get(role, {})}
+
+
+def prime_store_roles(request, platform_user, store_ids):
+    """
+    Do‘konlar ro‘yxati uchun resolve_store_role'ni oldindan to‘ldiradi: bitta cache.get_many
+    va cache'da yo‘qlari uchun bitta so‘rov — keyingi resolve_store_role chaqiruvlari so‘rov ichidan.
+    """
+    memo = _request_memo(request)
+    keys = {
+        store_role_key(platform_user.pk, store_id): int(store_id)
+        for store_id in store_ids
+        if (platform_user.pk, int(store_id)) not in memo
+    }
+    if not keys:
+        return
+
+    found = cache.get_many(list(keys))
+    missing = [store_id for key, store_id in keys.items() if key not in found]
+    if missing:
+        roles = dict(
+            StoreStaff.objects
+            .filter(user=platform_user, store_id__in=missing, is_active=True)
+            .values_list('store_id', 'role')
+        )
+        fresh = {store_role_key(platform_user.pk, store_id): _resolved(roles.get(store_id)) for store_id in missing}
+        cache.set_many(fresh, ROLE_CACHE_TIMEOUT)
+        found.update(fresh)
+
+    for key, store_id in keys.items():
+        memo[(platform_user.pk, store_id)] = found[key]
+
+
+def resolve_user_roles(request, platform_user):
+    """Xodimning barcha aktiv do‘konlardagi rollari (store_id yo‘q so‘rovlar uchun)."""
+    memo = _request_memo(request)
+    memo_key = (platform_user.pk, None)
+    if memo_key in memo:
+        return memo[memo_key]
+
+    key = user_roles_key(platform_user.pk)
+    roles = cache.get(key)
+    if roles is None:
+        roles = sorted(set(
+            StoreStaff.objects
+            .filter(user=platform_user, is_active=True)
+            .values_list('role', flat=True)
+        ))
+        cache.set(key, roles, ROLE_CACHE_TIMEOUT)
+
+    memo[memo_key] = roles
+    return roles
+
+
+def invalidate_store_role(platform_user_id, store_id):
+    cache.delete_many([
+        store_role_key(platform_user_id, store_id),
+        user_roles_key(platform_user_id),
+    ])
+    bump_roles_version(platform_user_id)
+
+
+def resolve_model_name(view):
+    """View klassi bo‘yicha model nomi — har bir klass uchun bir marta aniqlanadi."""
+    view_cls = type(view)
+    if view_cls in _MODEL_NAMES:
+        return _MODEL_NAMES[view_cls]
+
+    model = None
+    queryset = getattr(view, 'queryset', None)
+    if queryset is not None:
+        model = queryset.model
+    elif hasattr(view, 'get_queryset'):
+        model = getattr(view.get_queryset(), 'model', None)
+
+    name = model._meta.model_name.lower() if model is not None else ''
+    _MODEL_NAMES[view_cls] = name
+    return name
@@ -66,9 +66,12 @@ ACTION_MAP = {
     "add_property": "create",
     "get_images": "retrieve",
     "add_images": "create",
+    "catalog_changes": "list",
+    "catalog_snapshot": "list",
 
     # order actions
     "get_order_items": "retrieve",
+    "sync_orders": "create",
 
     # trash actions
     "restore": "update",
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import invalidate_store_role
+from .models import StoreStaff
+
+
+@receiver(pre_save, sender=StoreStaff)
+def remember_staff_binding(sender, instance, **kwargs):
+    # xodim boshqa do‘kon/foydalanuvchiga ko‘chirilsa eski kalit ham o‘chirilishi kerak
+    instance._previous_binding = None
+    if instance.pk:
+        instance._previous_binding = (
+            StoreStaff.objects.filter(pk=instance.pk).values_list('user_id', 'store_id').first()
+        )
+
+
+@receiver([post_save, post_delete], sender=StoreStaff)
+def invalidate_staff_role_cache(sender, instance, **kwargs):
+    invalidate_store_role(instance.user_id, instance.store_id)
+    previous = getattr(instance, '_previous_binding', None)
+    if previous and previous != (instance.user_id, instance.store_id):
+        invalidate_store_role(*previous)
@@ -0,0 +1,69 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory
+
+from platform_user.models import PlatformUser
+from staffs.cache import resolve_store_role
+from staffs.models import StoreStaff
+from store.models import Store
+
+pytestmark = pytest.mark.django_db
+
+User = get_user_model()
+
+
+@pytest.fixture
+def staff():
+    cache.clear()
+    chief = PlatformUser.objects.create(
+        user=User.objects.create_user(username="chief", password="x", phone_number="+998900000001")
+    )
+    seller = PlatformUser.objects.create(
+        user=User.objects.create_user(username="seller", password="x", phone_number="+998900000002"),
+        chief=chief,
+    )
+    store = Store.objects.create(name="Do‘kon", owner=chief)
+    return StoreStaff.objects.create(store=store, user=seller, role="seller")
+
+
+def test_role_resolved_from_cache_on_warm_request(staff, django_assert_num_queries):
+    factory = RequestFactory()
+    resolved = resolve_store_role(factory.get("/"), staff.user, staff.store_id)
+    assert resolved["role"] == "seller"
+
+    with django_assert_num_queries(0):
+        assert resolve_store_role(factory.get("/"), staff.user, staff.store_id)["role"] == "seller"
+
+
+def test_role_cache_invalidated_on_staff_save(staff):
+    factory = RequestFactory()
+    resolve_store_role(factory.get("/"), staff.user, staff.store_id)
+
+    staff.is_active = False
+    staff.save()
+
+    assert resolve_store_role(factory.get("/"), staff.user, staff.store_id)["role"] is None
+
+
+def test_role_cache_invalidated_for_previous_store(staff):
+    factory = RequestFactory()
+    old_store_id = staff.store_id
+    resolve_store_role(factory.get("/"), staff.user, old_store_id)
+
+    staff.store = Store.objects.create(name="Filial", owner=staff.store.owner)
+    staff.save()
+
+    assert resolve_store_role(factory.get("/"), staff.user, old_store_id)["role"] is None
+
+
+def test_prime_store_roles_uses_one_query(staff, django_assert_num_queries):
+    from staffs.cache import prime_store_roles
+
+    other = Store.objects.create(name="Filial", owner=staff.store.owner)
+    request = RequestFactory().get("/")
+    with django_assert_num_queries(1):
+        prime_store_roles(request, staff.user, [staff.store_id, other.pk])
+    with django_assert_num_queries(0):
+        assert resolve_store_role(request, staff.user, staff.store_id)["role"] == "seller"
+        assert resolve_store_role(request, staff.user, other.pk)["role"] is None
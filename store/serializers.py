@@ -1,15 +1,27 @@
 from rest_framework import serializers
 
-from staffs.models import StoreStaff
+from staffs.cache import prime_store_roles, resolve_store_role
 from store.models import Store
 
 
+class StoreListRoleSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        stores = list(data.all() if hasattr(data, 'all') else data)
+        request = self.context.get('request')
+        platform_user = getattr(getattr(request, 'user', None), 'platform_profile', None)
+        if platform_user is not None:
+            # har bir do‘kon uchun alohida StoreStaff so‘rovi o‘rniga
+            prime_store_roles(request, platform_user, [store.pk for store in stores])
+        return super().to_representation(stores)
+
+
 class StoreListSerializer(serializers.ModelSerializer):
     role = serializers.SerializerMethodField()
 
     class Meta:
         model = Store
         fields = ['id', 'name', 'phone_number', 'address', 'logo', 'role']
+        list_serializer_class = StoreListRoleSerializer
 
     def get_role(self, store):
         request = self.context.get('request')
@@ -18,14 +30,10 @@ class StoreListSerializer(serializers.ModelSerializer):
 
         platform_user = request.user.platform_profile
 
-        if store.owner == platform_user:
+        if store.owner_id == platform_user.pk:
             return 'admin'
 
-        try:
-            staff = StoreStaff.objects.get(store=store, user=platform_user, is_active=True)
-            return staff.role
-        except StoreStaff.DoesNotExist:
-            return None
+        return resolve_store_role(request, platform_user, store.pk)['role']
 
 
 class StoreDetailSerializer(serializers.ModelSerializer):
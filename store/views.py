@@ -1,6 +1,7 @@
 from rest_framework import viewsets, permissions, status
 
 from platform_user.models import PlatformUser
+from staffs.cache import resolve_store_role
 from staffs.permissions import StoreStaffPermission
 from store.models import Store
 from store.serializers import (
@@ -54,12 +55,12 @@ class StoreViewSet(viewsets.ModelViewSet):
         except Store.DoesNotExist:
             return Response({"detail": "Store not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        if store.owner == platform_user:
+        if store.owner_id == platform_user.pk:
             return Response({"has_access": True, "role": "admin"})
 
-        staff = store.staff_members.filter(user=platform_user, is_active=True).first()
-        if staff:
-            return Response({"has_access": True, "role": staff.role})
+        role = resolve_store_role(request, platform_user, store.pk)['role']
+        if role:
+            return Response({"has_access": True, "role": role})
 
         return Response({"has_access": False}, status=status.HTTP_403_FORBIDDEN)
 
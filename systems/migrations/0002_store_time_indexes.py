@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:45
+
+import django.db.models.deletion
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+CHUNK = 50_000
+
+
+def backfill_store(apps, schema_editor):
+    ProductSale = apps.get_model('systems', 'ProductSale')
+    Order = apps.get_model('order', 'Order')
+    store = Subquery(Order.objects.filter(pk=OuterRef('order_id')).values('store_id')[:1])
+    last = ProductSale.objects.aggregate(m=Max('id'))['m'] or 0
+    # atomic=False: har bir bo‘lak alohida commit bo‘ladi, jadval uzoq qulflanmaydi
+    for start in range(0, last + 1, CHUNK):
+        ProductSale.objects.filter(
+            id__gte=start, id__lt=start + CHUNK, store__isnull=True
+        ).update(store_id=store)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('order', '0002_initial'),
+        ('store', '0001_initial'),
+        ('systems', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productsale',
+            name='store',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='product_sales', to='store.store'),
+        ),
+        migrations.RunPython(backfill_store, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='productsale',
+            index=models.Index(fields=['store', 'created_at'], name='productsale_store_created_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:03
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('systems', '0002_store_time_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='productsale',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
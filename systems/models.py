@@ -1,6 +1,7 @@
 from decimal import Decimal, ROUND_HALF_UP
 
-from django.db import models, transaction
+from django.db import models
+from django.utils import timezone
 
 from cashbox.service import CashboxService
 from platform_user.exchange import get_default_exchange_rate
@@ -8,6 +9,7 @@ from product.models import Product, StockEntry
 from django.core.exceptions import ValidationError
 
 from store.models import Store
+from config.unit_of_work import mark_dirty, unit_of_work
 
 
 class StockTransfer(models.Model):
@@ -41,7 +43,7 @@ class StockTransfer(models.Model):
         quantity_to_restore = self.quantity
         shelf_entries = self.product.stock_entries.filter(is_warehouse=False).order_by('created_at')
 
-        with transaction.atomic():
+        with unit_of_work():
             for entry in shelf_entries:
                 if quantity_to_restore <= 0:
                     break
@@ -67,7 +69,9 @@ class StockTransfer(models.Model):
                     is_warehouse=True
                 )
 
-            self.product.recalculate_average_cost()
+            mark_dirty(self.product, "recalculate_average_cost")
+            # umumiy qoldiq o‘zgarmaydi — rasta -> ombor
+            self.product.publish_stock_moved(0, "transfer_reverse", transfer_id=self.pk, moved=self.quantity)
 
     def perform_transfer(self):
         if self.quantity <= 0:
@@ -80,7 +84,7 @@ class StockTransfer(models.Model):
         if total_available < self.quantity:
             raise ValidationError(f"Omborda {self.product.name} uchun yetarli mahsulot yo‘q.")
 
-        with transaction.atomic():
+        with unit_of_work():
             for entry in warehouse_entries:
                 if quantity_to_transfer <= 0:
                     break
@@ -103,7 +107,9 @@ class StockTransfer(models.Model):
 
                 quantity_to_transfer -= deduct_qty
 
-            self.product.recalculate_average_cost()
+            mark_dirty(self.product, "recalculate_average_cost")
+            # perform_transfer save'dan oldin chaqiriladi — transfer_id hali yo‘q
+            self.product.publish_stock_moved(0, "transfer", moved=self.quantity, auto=self.auto)
 
     def delete(self, *args, **kwargs):
         self.reverse_transfer()
@@ -114,6 +120,11 @@ class StockTransfer(models.Model):
 class ProductSale(models.Model):
     order = models.ForeignKey("order.Order", on_delete=models.CASCADE, related_name='sales')
     product = models.ForeignKey("product.Product", on_delete=models.CASCADE, null=True)
+    # order.store_id nusxasi — analytics JOIN'siz (store, created_at) indeks bo‘yicha o‘qiydi
+    store = models.ForeignKey(
+        'store.Store', on_delete=models.CASCADE, related_name='product_sales',
+        null=True, editable=False, db_index=False,
+    )
     quantity = models.PositiveIntegerField()
     unit_price = models.DecimalField(max_digits=20, decimal_places=6)
     total_price = models.DecimalField(max_digits=20, decimal_places=6)
@@ -122,16 +133,25 @@ class ProductSale(models.Model):
     currency = models.CharField(max_length=3, choices=[('USD', 'USD'), ('UZS', 'UZS')], default='USD')
     exchange_rate = models.DecimalField(max_digits=20, decimal_places=6, default=Decimal('1'))
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Sotuv vaqti: ProductOrder.created_at (oflayn sotuvda kassadagi vaqt)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         verbose_name = "Mahsulot sotuvi"
         verbose_name_plural = "Mahsulot sotuvlari"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['store', 'created_at'], name='productsale_store_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.product} × {self.quantity} ({self.unit_price} USD)"
 
+    def save(self, *args, **kwargs):
+        if self.store_id is None and self.order_id:
+            self.store_id = self.order.store_id
+        super().save(*args, **kwargs)
+
 
 class ProductEntrySystem(models.Model):
     date = models.DateTimeField(auto_now_add=True)
@@ -152,7 +172,7 @@ class ProductEntrySystem(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.exchange_rate or self.exchange_rate <= 1:
-            from django_currentuser.middleware import get_current_authenticated_user
+            from config.current_user import get_current_authenticated_user
             user = get_current_authenticated_user()
             if user:
                 self.exchange_rate = get_default_exchange_rate(user)
@@ -194,7 +214,8 @@ class ProductEntrySystem(models.Model):
                 is_warehouse=self.is_warehouse
             )
 
-        self.product.recalculate_average_cost()
+        mark_dirty(self.product, "recalculate_average_cost")
+        self.product.publish_stock_moved(self.count, "import", entry_system_id=self.pk)
 
     def delete(self, *args, **kwargs):
         quantity_to_deduct = self.count
@@ -206,7 +227,7 @@ class ProductEntrySystem(models.Model):
             currency="USD"
         ).order_by('created_at')
 
-        with transaction.atomic():
+        with unit_of_work():
             for entry in stock_entries:
                 if quantity_to_deduct <= 0:
                     break
@@ -220,7 +241,8 @@ class ProductEntrySystem(models.Model):
                 else:
                     entry.save(update_fields=['quantity'])
 
-            self.product.recalculate_average_cost()
+            mark_dirty(self.product, "recalculate_average_cost")
+            self.product.publish_stock_moved(-self.count, "import_cancel", entry_system_id=self.pk)
 
         super().delete(*args, **kwargs)
 
@@ -1,4 +1,5 @@
 from staffs.mixins import StoreIDMixin
+from config.replicas import ReplicaReadMixin
 from staffs.permissions import StoreStaffPermission
 from .models import StockTransfer, ProductSale, ProductEntrySystem
 from .serializers import (
@@ -9,7 +10,7 @@ from rest_framework import viewsets, permissions, status, serializers
 from rest_framework.response import Response
 
 
-class StockTransferViewSet(StoreIDMixin, viewsets.ModelViewSet):
+class StockTransferViewSet(ReplicaReadMixin, StoreIDMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, StoreStaffPermission]
     http_method_names = ['get', 'post', 'delete']
     serializer_class = StockTransferSerializer
@@ -18,7 +19,7 @@ class StockTransferViewSet(StoreIDMixin, viewsets.ModelViewSet):
         store_id = self.kwargs.get('store_id')
         if not store_id:
             return StockTransfer.objects.none()
-        return StockTransfer.objects.filter(product__store_id=store_id)
+        return StockTransfer.objects.filter(product__store_id=store_id).select_related('product')
 
     def perform_create(self, serializer):
         product = serializer.validated_data.get('product')
@@ -33,7 +34,7 @@ class StockTransferViewSet(StoreIDMixin, viewsets.ModelViewSet):
         serializer.save(auto=False)
 
 
-class ProductSaleViewSet(StoreIDMixin, viewsets.ReadOnlyModelViewSet):
+class ProductSaleViewSet(ReplicaReadMixin, StoreIDMixin, viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.IsAuthenticated, StoreStaffPermission]
     serializer_class = ProductSaleSerializer
 
@@ -41,7 +42,7 @@ class ProductSaleViewSet(StoreIDMixin, viewsets.ReadOnlyModelViewSet):
         store_id = self.kwargs.get('store_id')
         if not store_id:
             return ProductSale.objects.none()
-        return ProductSale.objects.filter(product__store_id=store_id)
+        return ProductSale.objects.filter(store_id=store_id).select_related('order', 'product')
 
 
 class ProductEntrySystemViewSet(StoreIDMixin, viewsets.ModelViewSet):
@@ -51,7 +52,8 @@ class ProductEntrySystemViewSet(StoreIDMixin, viewsets.ModelViewSet):
         store_id = self.get_store_id()
         return (ProductEntrySystem.objects
                 .filter(store_id=store_id)
-                .select_related('product', 'store'))
+                .select_related('product', 'store')
+                .prefetch_related('product__images'))
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()